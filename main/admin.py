@@ -1,6 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Tag, Task
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from .models import OutboxMessage, RequestProfile, SlowQuery, User, Tag, Task
+from .services.profiling import make_token
+from .services.slow_queries import top_offenders
 
 
 class TaskManagerAdminSite(admin.AdminSite):
@@ -20,6 +27,137 @@ class TaskAdmin(admin.ModelAdmin):
     pass
 
 
+@admin.register(OutboxMessage, site=task_manager_admin_site)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "kind",
+        "task",
+        "recipient",
+        "status",
+        "attempts",
+        "available_at",
+    )
+    list_filter = ("status", "kind")
+    raw_id_fields = ("task", "recipient")
+
+
+@admin.register(SlowQuery, site=task_manager_admin_site)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """The changelist shows the top offenders rather than single rows."""
+
+    list_display = ("id", "view", "duration_ms", "recorded_at")
+    readonly_fields = (
+        "fingerprint",
+        "sql",
+        "duration_ms",
+        "view",
+        "plan",
+        "recorded_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_or_change_permission(request):
+            return super().changelist_view(request, extra_context)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Slow queries by total time",
+            "offenders": top_offenders(),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(
+            request, "admin/main/slowquery/top_offenders.html", context
+        )
+
+
+@admin.register(RequestProfile, site=task_manager_admin_site)
+class RequestProfileAdmin(admin.ModelAdmin):
+    change_list_template = "admin/main/requestprofile/change_list.html"
+    list_display = (
+        "id",
+        "view",
+        "method",
+        "status",
+        "duration_ms",
+        "trigger",
+        "recorded_at",
+    )
+    list_filter = ("trigger", "view")
+    readonly_fields = (
+        "view",
+        "method",
+        "path",
+        "status",
+        "duration_ms",
+        "trigger",
+        "recorded_at",
+        "hotspot_table",
+        "stacks_link",
+    )
+    exclude = ("hotspots", "stacks")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:object_id>/stacks/",
+                self.admin_site.admin_view(self.stacks_view),
+                name="main_requestprofile_stacks",
+            ),
+            *super().get_urls(),
+        ]
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            "profile_token": make_token(request.user),
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context)
+
+    def stacks_view(self, request, object_id):
+        if not self.has_view_or_change_permission(request):
+            return HttpResponse(status=403)
+        profile = get_object_or_404(RequestProfile, pk=object_id)
+        response = HttpResponse(profile.stacks, content_type="text/plain")
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="profile-{profile.pk}.collapsed"'
+        return response
+
+    @admin.display(description="Hotspots")
+    def hotspot_table(self, obj):
+        rows = format_html_join(
+            "",
+            "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>",
+            (
+                (row["total_s"], row["cumulative_s"], row["calls"], row["function"])
+                for row in obj.hotspots
+            ),
+        )
+        return format_html(
+            "<table><tr><th>Total, s</th><th>Cumulative, s</th><th>Calls</th>"
+            "<th>Function</th></tr>{}</table>",
+            rows,
+        )
+
+    @admin.display(description="Collapsed stacks")
+    def stacks_link(self, obj):
+        url = reverse("admin:main_requestprofile_stacks", args=[obj.pk])
+        return format_html('<a href="{}">Download for flame graph tools</a>', url)
+
+
 @admin.register(User, site=task_manager_admin_site)
 class UserAdmin(admin.ModelAdmin):
     list_display = (
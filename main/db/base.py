@@ -0,0 +1,83 @@
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+
+if TYPE_CHECKING:
+    from main.services.db_pool import ConnectionPool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name: str, verbosity: int) -> None:
+        # Idle pooled connections would keep the database from being dropped.
+        self.connection.close_pool()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """The PostgreSQL backend, with Django 5.1's ``OPTIONS["pool"]``.
+
+    ``True`` or a dict of :class:`ConnectionPool` options lends connections
+    from a pool in each process instead of opening one per connect; closing
+    returns it. The pool checks connections before lending them when
+    ``CONN_HEALTH_CHECKS`` is on.
+    """
+
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.connection_pool: Optional["ConnectionPool"] = None
+
+    @property
+    def pool_options(self) -> Optional[Dict[str, Any]]:
+        options = self.settings_dict["OPTIONS"].get("pool")
+        if not options or self.alias == NO_DB_ALIAS:
+            return None
+        if self.settings_dict["CONN_MAX_AGE"] != 0:
+            raise ImproperlyConfigured(
+                "Pooling doesn't support persistent connections."
+            )
+        return {} if options is True else options
+
+    def get_connection_params(self) -> Dict[str, Any]:
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_unpooled_connection(self, conn_params: Dict[str, Any]) -> Any:
+        return super().get_new_connection(conn_params)
+
+    def get_new_connection(self, conn_params: Dict[str, Any]) -> Any:
+        # Backends load with the first model, before the metrics can import.
+        from main.services.db_pool import ConnectionPool, get_pool
+
+        options = self.pool_options
+        if options is None:
+            return self.get_unpooled_connection(conn_params)
+        if self.settings_dict["CONN_HEALTH_CHECKS"]:
+            options = {"check": ConnectionPool.check_connection, **options}
+        pool = get_pool(
+            self.alias,
+            conn_params,
+            lambda: self.get_unpooled_connection(conn_params),
+            **options,
+        )
+        connection = pool.getconn()
+        self.connection_pool = pool
+        return connection
+
+    def _close(self) -> None:
+        if self.connection is None or self.connection_pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.connection_pool.putconn(self.connection)
+        # The pool may lend it to another thread already.
+        self.connection = None
+        self.connection_pool = None
+
+    def close_pool(self) -> None:
+        from main.services.db_pool import close_pools
+
+        close_pools(self.alias)
@@ -0,0 +1,96 @@
+import gc
+import json
+from dataclasses import asdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from main.models import Task
+from main.services.benchmark import ConcurrencyBenchmark, Sample
+from main.services.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve one path to many concurrent slow clients through the WSGI "
+        "application on a thread pool and through the ASGI application, "
+        "against a seeded test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--tags", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=20000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--clients", type=int, default=1000)
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=1.0,
+            help="Mean seconds a client takes to send its request.",
+        )
+        parser.add_argument(
+            "--threads", type=int, default=32, help="WSGI worker threads."
+        )
+        parser.add_argument("--path", help="Defaults to the task list.")
+        parser.add_argument("--output", default="benchmark_concurrency.json")
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the seeded test database between runs.",
+        )
+
+    def handle(self, *args, **options):
+        from task_manager.asgi import application as asgi_application
+        from task_manager.wsgi import application as wsgi_application
+
+        path = options["path"] or reverse("tasks-list")
+        setup_test_environment(debug=False)
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        try:
+            if not Task.objects.exists():
+                seed(
+                    users=options["users"],
+                    tags=options["tags"],
+                    tasks=options["tasks"],
+                    seed=options["seed"],
+                )
+            benchmark = ConcurrencyBenchmark(
+                Sample.pick().user,
+                options["clients"],
+                options["delay"],
+                options["threads"],
+                seed=options["seed"],
+            )
+            # The runs open their own connections.
+            connection.close()
+            results = [
+                benchmark.wsgi(wsgi_application, path),
+                benchmark.asgi(asgi_application, path),
+            ]
+        finally:
+            # Failed requests can leave connections in dead worker threads.
+            gc.collect()
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        for result in results:
+            self.stdout.write(
+                f"{result.server:4} {result.clients} clients in "
+                f"{result.seconds:8.2f}s {result.requests_per_second:8.1f} req/s "
+                f"p50 {result.p50_ms:9.2f}ms p95 {result.p95_ms:9.2f}ms "
+                f"p99 {result.p99_ms:9.2f}ms {result.errors} errors"
+            )
+        with open(options["output"], "w") as file:
+            json.dump(
+                {"path": path, "results": [asdict(result) for result in results]},
+                file,
+                indent=2,
+            )
+        self.stdout.write(f"Results written to {options['output']}.")
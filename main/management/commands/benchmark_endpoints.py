@@ -0,0 +1,120 @@
+import json
+import platform
+from dataclasses import asdict
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from main.models import Task
+from main.services.benchmark import (
+    EndpointBenchmark,
+    Sample,
+    compare,
+    get_cases,
+    load_results,
+    select_cases,
+)
+from main.services.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every GET route of the API router against a seeded test "
+        "database and optionally compare with a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--tags", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=20000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--routes", nargs="*", help="Glob patterns of case names to run."
+        )
+        parser.add_argument("--output", default="benchmark.json")
+        parser.add_argument("--baseline", help="Results file to compare against.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed p95 and memory growth over the baseline, as a fraction.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the seeded test database between runs.",
+        )
+
+    def handle(self, *args, **options):
+        from task_manager.urls import router
+
+        setup_test_environment(debug=False)
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        try:
+            if not Task.objects.exists():
+                seed(
+                    users=options["users"],
+                    tags=options["tags"],
+                    tasks=options["tasks"],
+                    seed=options["seed"],
+                )
+            sample = Sample.pick()
+            cases = select_cases(get_cases(router.urls, sample), options["routes"])
+            results = {}
+            with EndpointBenchmark(
+                sample.user, options["requests"], options["concurrency"]
+            ) as benchmark:
+                for case in cases:
+                    result = benchmark.run(case)
+                    results[case.name] = asdict(result)
+                    self.stdout.write(
+                        f"{case.name:32} p50 {result.p50_ms:8.2f}ms "
+                        f"p95 {result.p95_ms:8.2f}ms p99 {result.p99_ms:8.2f}ms "
+                        f"{result.queries:3} queries {result.peak_memory_kb:9.1f}KiB"
+                    )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        with open(options["output"], "w") as file:
+            json.dump(
+                {
+                    "meta": {
+                        "created_at": timezone.now().isoformat(),
+                        "python": platform.python_version(),
+                        "django": django.get_version(),
+                        **{
+                            name: options[name]
+                            for name in (
+                                "users",
+                                "tags",
+                                "tasks",
+                                "seed",
+                                "requests",
+                                "concurrency",
+                            )
+                        },
+                    },
+                    "routes": results,
+                },
+                file,
+                indent=2,
+            )
+        self.stdout.write(f"Results written to {options['output']}.")
+
+        if options["baseline"]:
+            regressions = compare(
+                results, load_results(options["baseline"]), options["threshold"]
+            )
+            if regressions:
+                raise CommandError("Regressions:\n" + "\n".join(regressions))
+            self.stdout.write("No regressions against the baseline.")
@@ -0,0 +1,63 @@
+import time
+from typing import Callable, List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import QuerySet
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ModelSerializer
+
+from main.services.values import ValuesRepresentation
+from main.views import TaskViewSet, UserViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows/second of the serializer and values() read paths "
+        "for task and user lists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        for viewset in (TaskViewSet, UserViewSet):
+            queryset = viewset.queryset[: options["rows"]]
+            self.compare(viewset.serializer_class, queryset, options["repeat"])
+
+    def compare(
+        self, serializer_class: type[ModelSerializer], queryset: QuerySet, repeat: int
+    ) -> None:
+        def serializer() -> List[dict]:
+            return serializer_class(queryset.all(), many=True).data
+
+        def values() -> List[dict]:
+            representation = ValuesRepresentation(serializer_class())
+            return representation.to_representation(
+                representation.values(queryset.all())
+            )
+
+        renderer = JSONRenderer()
+        expected = renderer.render(serializer())
+        if renderer.render(values()) != expected:
+            raise CommandError(f"{serializer_class.__name__}: outputs differ.")
+
+        rows = queryset.count()
+        name = serializer_class.__name__
+        before = self.rows_per_second(serializer, rows, repeat)
+        after = self.rows_per_second(values, rows, repeat)
+        self.stdout.write(
+            f"{name}: {rows} rows, serializer {before:,.0f} rows/s, "
+            f"values {after:,.0f} rows/s ({after / before:.1f}x)"
+        )
+
+    @staticmethod
+    def rows_per_second(read: Callable[[], list], rows: int, repeat: int) -> float:
+        best = min(timed(read) for _ in range(repeat))
+        return rows / best
+
+
+def timed(read: Callable[[], list]) -> float:
+    started = time.perf_counter()
+    read()
+    return time.perf_counter() - started
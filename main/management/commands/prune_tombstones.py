@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main.models import TaskTombstone
+
+
+class Command(BaseCommand):
+    help = "Drop task deletions older than the change feed keeps cursors for."
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() - timedelta(
+            days=settings.TASK_TOMBSTONE_RETENTION_DAYS
+        )
+        deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=horizon).delete()
+        self.stdout.write(f"Pruned {deleted} tombstones.")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from main.services.seed import seed
+
+
+class Command(BaseCommand):
+    help = "Generate a repeatable synthetic dataset of users, tags and tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--tasks", type=int, default=100000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Username and tag name prefix; change it to seed the same database twice.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent for executor load and tag popularity.",
+        )
+
+    def handle(self, *args, **options):
+        result = seed(
+            users=options["users"],
+            tags=options["tags"],
+            tasks=options["tasks"],
+            seed=options["seed"],
+            prefix=options["prefix"],
+            batch_size=options["batch_size"],
+            skew=options["skew"],
+        )
+        self.stdout.write(
+            f"Seeded {result.users} users, {result.tags} tags, {result.tasks} tasks "
+            f"and {result.links} tag links in {result.seconds:.2f}s "
+            f"({result.rows_per_second:,.0f} rows/s)."
+        )
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from main.services.mail import send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox notifications with a pool of workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the outbox is drained instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        workers = options["workers"]
+        drain_args = (options["batch_size"], options["poll_interval"], options["once"])
+        if workers == 1:
+            processed = self.drain(*drain_args)
+        else:
+            with ThreadPoolExecutor(workers, thread_name_prefix="outbox") as pool:
+                futures = [
+                    pool.submit(self.drain_in_thread, *drain_args)
+                    for _ in range(workers)
+                ]
+                try:
+                    processed = sum(future.result() for future in futures)
+                except KeyboardInterrupt:
+                    self.stop.set()
+                    processed = sum(future.result() for future in futures)
+        self.stdout.write(f"Processed {processed} outbox messages.")
+
+    def drain(self, batch_size: int, poll_interval: float, once: bool) -> int:
+        processed = 0
+        while not self.stop.is_set():
+            count = send_outbox_batch(batch_size)
+            processed += count
+            if not count:
+                if once:
+                    break
+                self.stop.wait(poll_interval)
+        return processed
+
+    def drain_in_thread(self, *args) -> int:
+        try:
+            return self.drain(*args)
+        finally:
+            # Each worker thread owns a database connection.
+            connection.close()
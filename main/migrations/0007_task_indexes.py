@@ -0,0 +1,69 @@
+# Generated by Django 4.2 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+from main.models import Task
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0006_user_avatar_picture"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tag",
+            name="name",
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["executor", "state", "priority"], name="task_executor_state_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["executor", "id"], name="task_executor_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["state", "deadline", "id"], name="task_state_deadline_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["deadline", "id"], name="task_deadline_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["priority", "id"], name="task_priority_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["updated_at", "id"], name="task_updated_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("state__in", list(Task.CLOSED_STATES)), _negated=True
+                ),
+                fields=["executor", "priority"],
+                name="task_active_executor_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("state__in", list(Task.CLOSED_STATES)), _negated=True
+                ),
+                fields=["deadline", "id"],
+                name="task_active_deadline_idx",
+            ),
+        ),
+    ]
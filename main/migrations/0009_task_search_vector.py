@@ -0,0 +1,53 @@
+# Generated by Django 4.2 on 2026-10-18 17:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}name, '')), 'A')
+    || setweight(to_tsvector('english', coalesce({row}description, '')), 'B')
+"""
+
+CREATE_TRIGGER = f"""
+CREATE FUNCTION main_task_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER main_task_search_vector
+    BEFORE INSERT OR UPDATE OF name, description ON main_task
+    FOR EACH ROW EXECUTE FUNCTION main_task_search_vector_update();
+
+UPDATE main_task SET search_vector = {SEARCH_VECTOR.format(row="")};
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER main_task_search_vector ON main_task;
+DROP FUNCTION main_task_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0008_user_username_trgm"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.AddIndex(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="task_search_vector_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2 on 2026-10-18 18:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0010_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="tag",
+            options={"ordering": ("id",)},
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-18 18:24
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0011_tag_ordering"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=32)),
+                ("sql", models.TextField()),
+                ("duration_ms", models.FloatField()),
+                ("view", models.CharField(max_length=255)),
+                ("plan", models.TextField(blank=True)),
+                (
+                    "recorded_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="slowquery",
+            index=models.Index(
+                fields=["fingerprint"], name="slow_query_fingerprint_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-18 18:27
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0012_slowquery"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("view", models.CharField(max_length=255)),
+                ("method", models.CharField(max_length=10)),
+                ("path", models.TextField()),
+                ("status", models.PositiveSmallIntegerField()),
+                ("duration_ms", models.FloatField()),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[("token", "Token"), ("sample", "Sample")],
+                        max_length=10,
+                    ),
+                ),
+                ("hotspots", models.JSONField(default=list)),
+                ("stacks", models.TextField(blank=True)),
+                (
+                    "recorded_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+CREATE_TRIGGER = """
+CREATE FUNCTION main_task_tombstone_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO main_tasktombstone (task_id, deleted_at)
+    SELECT id, statement_timestamp() FROM deleted_tasks;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER main_task_tombstone
+    AFTER DELETE ON main_task
+    REFERENCING OLD TABLE AS deleted_tasks
+    FOR EACH STATEMENT EXECUTE FUNCTION main_task_tombstone_insert();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER main_task_tombstone ON main_task;
+DROP FUNCTION main_task_tombstone_insert();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0014_user_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="tasktombstone",
+            index=models.Index(
+                fields=["deleted_at", "task_id"], name="task_tombstone_deleted_idx"
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
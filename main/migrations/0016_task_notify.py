@@ -0,0 +1,101 @@
+# Generated by Django 4.2 on 2026-10-18 19:05
+
+from django.db import migrations
+
+# Task changes are announced when their transaction commits, so the payload
+# carries the final row and tag list however many statements made it.
+CREATE_TRIGGERS = """
+CREATE FUNCTION main_task_notify() RETURNS trigger AS $$
+DECLARE
+    changed_id bigint;
+    kind text := 'updated';
+    previous jsonb;
+    payload text;
+BEGIN
+    IF current_setting('main.quiet_task_events', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_TABLE_NAME = 'main_task' THEN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify(
+                'task_events', json_build_object('event', 'deleted', 'id', OLD.id)::text
+            );
+            RETURN NULL;
+        END IF;
+        changed_id := NEW.id;
+        IF TG_OP = 'INSERT' THEN
+            kind := 'created';
+        ELSE
+            previous := jsonb_build_object(
+                'executor', OLD.executor_id, 'state', OLD.state
+            );
+        END IF;
+    ELSIF TG_OP = 'DELETE' THEN
+        changed_id := OLD.task_id;
+        previous := jsonb_build_object('tags', jsonb_build_array(OLD.tag_id));
+    ELSE
+        changed_id := NEW.task_id;
+    END IF;
+
+    SELECT json_build_object(
+        'event', kind,
+        'id', task.id,
+        'before', previous,
+        'task', json_build_object(
+            'id', task.id,
+            'name', task.name,
+            'author', task.author_id,
+            'executor', task.executor_id,
+            'description', task.description,
+            'created_at', task.created_at,
+            'updated_at', task.updated_at,
+            'deadline', task.deadline,
+            'state', task.state,
+            'priority', task.priority,
+            'tags', ARRAY(
+                SELECT link.tag_id FROM main_task_tags link
+                WHERE link.task_id = task.id ORDER BY link.tag_id
+            )
+        )
+    )::text INTO payload
+    FROM main_task task WHERE task.id = changed_id;
+
+    IF payload IS NULL THEN
+        -- Deleted later in the same transaction.
+        RETURN NULL;
+    END IF;
+    IF octet_length(payload) >= 8000 THEN
+        -- Over the NOTIFY limit: listeners pass the bare id to everyone.
+        payload := json_build_object('event', kind, 'id', changed_id)::text;
+    END IF;
+    PERFORM pg_notify('task_events', payload);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER main_task_notify
+    AFTER INSERT OR UPDATE OR DELETE ON main_task
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION main_task_notify();
+
+CREATE CONSTRAINT TRIGGER main_task_tags_notify
+    AFTER INSERT OR DELETE ON main_task_tags
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION main_task_notify();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER main_task_tags_notify ON main_task_tags;
+DROP TRIGGER main_task_notify ON main_task;
+DROP FUNCTION main_task_notify();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0015_tasktombstone"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
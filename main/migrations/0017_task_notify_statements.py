@@ -0,0 +1,211 @@
+# Generated by Django 4.2 on 2026-10-18 20:20
+
+from importlib import import_module
+
+from django.db import migrations
+
+previous = import_module("main.migrations.0016_task_notify")
+
+# Statement triggers queue the changed task ids; the first one in a
+# transaction also inserts a flush row, whose deferred trigger turns the
+# queue into events when the transaction commits. So a statement costs one
+# trigger call however many rows it writes, each task is announced once per
+# transaction with its final row, and events go out in arrays just under the
+# NOTIFY limit.
+CREATE_TRIGGERS = """
+DROP TRIGGER main_task_tags_notify ON main_task_tags;
+DROP TRIGGER main_task_notify ON main_task;
+DROP FUNCTION main_task_notify();
+
+CREATE UNLOGGED TABLE main_task_event_queue (
+    id bigserial PRIMARY KEY,
+    task_id bigint NOT NULL,
+    kind text NOT NULL,
+    -- What an update or tag removal changed, for the event's "before".
+    executor_id bigint,
+    state varchar(255),
+    tag_id bigint
+);
+
+CREATE UNLOGGED TABLE main_task_event_flush (
+    xid bigint PRIMARY KEY DEFAULT txid_current()
+);
+
+CREATE FUNCTION main_task_queue_events() RETURNS trigger AS $$
+DECLARE
+    queued bigint;
+BEGIN
+    IF current_setting('main.quiet_task_events', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_TABLE_NAME = 'main_task' THEN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO main_task_event_queue (task_id, kind)
+            SELECT id, 'created' FROM new_rows;
+        ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO main_task_event_queue (task_id, kind, executor_id, state)
+            SELECT id, 'updated', executor_id, state FROM old_rows;
+        ELSE
+            INSERT INTO main_task_event_queue (task_id, kind)
+            SELECT id, 'deleted' FROM old_rows;
+        END IF;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO main_task_event_queue (task_id, kind)
+        SELECT DISTINCT task_id, 'updated' FROM new_rows;
+    ELSE
+        INSERT INTO main_task_event_queue (task_id, kind, tag_id)
+        SELECT task_id, 'updated', tag_id FROM old_rows;
+    END IF;
+    GET DIAGNOSTICS queued = ROW_COUNT;
+
+    IF queued > 0
+        AND current_setting('main.task_events_queued', true) IS DISTINCT FROM 'on'
+    THEN
+        PERFORM set_config('main.task_events_queued', 'on', true);
+        INSERT INTO main_task_event_flush DEFAULT VALUES;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION main_task_flush_events() RETURNS trigger AS $$
+DECLARE
+    event record;
+    payload text;
+    batch text := '';
+BEGIN
+    PERFORM set_config('main.task_events_queued', 'off', true);
+    DELETE FROM main_task_event_flush WHERE xid = NEW.xid;
+    IF current_setting('main.quiet_task_events', true) = 'on' THEN
+        DELETE FROM main_task_event_queue;
+        RETURN NULL;
+    END IF;
+
+    -- Other transactions' queued rows are invisible here until they commit,
+    -- and each deletes its own before it does.
+    FOR event IN
+        WITH queued AS (
+            DELETE FROM main_task_event_queue RETURNING *
+        ), changed AS (
+            SELECT
+                task_id,
+                bool_or(kind = 'created') AS created,
+                (array_agg(executor_id ORDER BY id)
+                    FILTER (WHERE state IS NOT NULL))[1] AS executor_id,
+                (array_agg(state ORDER BY id)
+                    FILTER (WHERE state IS NOT NULL))[1] AS state,
+                array_agg(DISTINCT tag_id) FILTER (WHERE tag_id IS NOT NULL) AS tags
+            FROM queued
+            GROUP BY task_id
+        )
+        SELECT
+            changed.task_id AS id,
+            CASE
+                WHEN task.id IS NULL THEN 'deleted'
+                WHEN changed.created THEN 'created'
+                ELSE 'updated'
+            END AS kind,
+            task,
+            nullif(jsonb_strip_nulls(jsonb_build_object(
+                'executor', changed.executor_id,
+                'state', changed.state,
+                'tags', to_jsonb(changed.tags)
+            )), '{}'::jsonb) AS before
+        FROM changed
+        LEFT JOIN main_task task ON task.id = changed.task_id
+        -- Created and deleted before anyone could see it.
+        WHERE NOT (changed.created AND task.id IS NULL)
+        ORDER BY changed.task_id
+    LOOP
+        IF event.kind = 'deleted' THEN
+            payload := json_build_object('event', 'deleted', 'id', event.id)::text;
+        ELSE
+            payload := json_build_object(
+                'event', event.kind,
+                'id', event.id,
+                'before', event.before,
+                'task', json_build_object(
+                    'id', (event.task).id,
+                    'name', (event.task).name,
+                    'author', (event.task).author_id,
+                    'executor', (event.task).executor_id,
+                    'description', (event.task).description,
+                    'created_at', (event.task).created_at,
+                    'updated_at', (event.task).updated_at,
+                    'deadline', (event.task).deadline,
+                    'state', (event.task).state,
+                    'priority', (event.task).priority,
+                    'tags', ARRAY(
+                        SELECT link.tag_id FROM main_task_tags link
+                        WHERE link.task_id = event.id ORDER BY link.tag_id
+                    )
+                )
+            )::text;
+        END IF;
+        IF octet_length(payload) >= 7990 THEN
+            -- Over the NOTIFY limit: listeners pass the bare id to everyone.
+            payload := json_build_object('event', event.kind, 'id', event.id)::text;
+        END IF;
+        IF batch <> '' AND octet_length(batch) + octet_length(payload) >= 7990 THEN
+            PERFORM pg_notify('task_events', '[' || batch || ']');
+            batch := '';
+        END IF;
+        batch := batch || CASE WHEN batch = '' THEN '' ELSE ',' END || payload;
+    END LOOP;
+    IF batch <> '' THEN
+        PERFORM pg_notify('task_events', '[' || batch || ']');
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER main_task_insert_events
+    AFTER INSERT ON main_task REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION main_task_queue_events();
+
+CREATE TRIGGER main_task_update_events
+    AFTER UPDATE ON main_task REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION main_task_queue_events();
+
+CREATE TRIGGER main_task_delete_events
+    AFTER DELETE ON main_task REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION main_task_queue_events();
+
+CREATE TRIGGER main_task_tags_insert_events
+    AFTER INSERT ON main_task_tags REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION main_task_queue_events();
+
+CREATE TRIGGER main_task_tags_delete_events
+    AFTER DELETE ON main_task_tags REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION main_task_queue_events();
+
+CREATE CONSTRAINT TRIGGER main_task_flush_events
+    AFTER INSERT ON main_task_event_flush
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION main_task_flush_events();
+"""
+
+DROP_TRIGGERS = (
+    """
+DROP TRIGGER main_task_tags_delete_events ON main_task_tags;
+DROP TRIGGER main_task_tags_insert_events ON main_task_tags;
+DROP TRIGGER main_task_delete_events ON main_task;
+DROP TRIGGER main_task_update_events ON main_task;
+DROP TRIGGER main_task_insert_events ON main_task;
+DROP TABLE main_task_event_flush;
+DROP TABLE main_task_event_queue;
+DROP FUNCTION main_task_flush_events();
+DROP FUNCTION main_task_queue_events();
+"""
+    + previous.CREATE_TRIGGERS
+)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0016_task_notify"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -1,6 +1,18 @@
 from .user import User
 from .task import Task
 from .tag import Tag
+from .outbox import OutboxMessage
+from .slow_query import SlowQuery
+from .request_profile import RequestProfile
+from .task_tombstone import TaskTombstone
 
 
-__all__ = ["User", "Task", "Tag"]
+__all__ = [
+    "User",
+    "Task",
+    "Tag",
+    "OutboxMessage",
+    "SlowQuery",
+    "RequestProfile",
+    "TaskTombstone",
+]
@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+from .task import Task
+from .user import User
+
+
+class OutboxMessageQuerySet(models.QuerySet):
+    def due(self) -> "OutboxMessageQuerySet":
+        return self.filter(
+            status=OutboxMessage.Status.PENDING, available_at__lte=timezone.now()
+        )
+
+
+class OutboxMessage(models.Model):
+    """A notification to deliver, written in the same transaction as its task."""
+
+    class Kind(models.TextChoices):
+        ASSIGN = "assign"
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    kind = models.CharField(max_length=50, choices=Kind.choices)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="+")
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    status = models.CharField(
+        max_length=20, default=Status.PENDING, choices=Status.choices
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboxMessageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                name="outbox_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.task_id} to {self.recipient_id}"
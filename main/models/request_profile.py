@@ -0,0 +1,29 @@
+from django.db import models
+from django.utils import timezone
+
+
+class RequestProfile(models.Model):
+    """``cProfile`` results of one request.
+
+    Like ``SlowQuery`` this is a ring buffer of the latest
+    ``PROFILE_LOG_SIZE`` rows.
+    """
+
+    class Trigger(models.TextChoices):
+        TOKEN = "token"
+        SAMPLE = "sample"
+
+    view = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.TextField()
+    status = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    trigger = models.CharField(max_length=10, choices=Trigger.choices)
+    # Rows of function, calls, total and cumulative seconds by total time.
+    hotspots = models.JSONField(default=list)
+    # Collapsed stacks ("a;b;c microseconds" per line) for flame graph tools.
+    stacks = models.TextField(blank=True)
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.method} {self.path}: {self.duration_ms:.0f} ms"
@@ -0,0 +1,25 @@
+from django.db import models
+from django.utils import timezone
+
+
+class SlowQuery(models.Model):
+    """A statement that ran over ``SLOW_QUERY_THRESHOLD_MS``, with its plan.
+
+    The table is a ring buffer: only the latest ``SLOW_QUERY_LOG_SIZE`` rows
+    are kept.
+    """
+
+    fingerprint = models.CharField(max_length=32)
+    sql = models.TextField()
+    duration_ms = models.FloatField()
+    view = models.CharField(max_length=255)
+    plan = models.TextField(blank=True)
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["fingerprint"], name="slow_query_fingerprint_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.view}: {self.duration_ms:.0f} ms"
@@ -2,7 +2,11 @@ from django.db import models
 
 
 class Tag(models.Model):
-    name = models.CharField(max_length=50)
+    name = models.CharField(max_length=50, db_index=True)
+
+    class Meta:
+        # Keeps a task's tag list stable across prefetches and aggregates.
+        ordering = ("id",)
 
     def __str__(self):
         return self.name
@@ -1,9 +1,19 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from .user import User
 from .tag import Tag
 
 
+class TaskQuerySet(models.QuerySet):
+    def active(self) -> "TaskQuerySet":
+        return self.exclude(state__in=Task.CLOSED_STATES)
+
+    def closed(self) -> "TaskQuerySet":
+        return self.filter(state__in=Task.CLOSED_STATES)
+
+
 class Task(models.Model):
     class State(models.TextChoices):
         NEW = "new_task"
@@ -14,6 +24,9 @@ class Task(models.Model):
         RELEASED = "released"
         ARCHIVED = "archived"
 
+    CLOSED_STATES = (State.RELEASED, State.ARCHIVED)
+    SEARCH_CONFIG = "english"
+
     name = models.CharField(max_length=100)
     author = models.ForeignKey(User, on_delete=models.PROTECT, related_name="tasks_by")
     executor = models.ForeignKey(
@@ -26,6 +39,37 @@ class Task(models.Model):
     state = models.CharField(max_length=255, default=State.NEW, choices=State.choices)
     priority = models.PositiveIntegerField(blank=True, null=True)
     tags = models.ManyToManyField(Tag, blank=True)
+    # Maintained by the main_task_search_vector trigger: name weighted A,
+    # description weighted B.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["executor", "state", "priority"],
+                name="task_executor_state_idx",
+            ),
+            models.Index(fields=["executor", "id"], name="task_executor_id_idx"),
+            models.Index(
+                fields=["state", "deadline", "id"], name="task_state_deadline_idx"
+            ),
+            models.Index(fields=["deadline", "id"], name="task_deadline_id_idx"),
+            models.Index(fields=["priority", "id"], name="task_priority_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="task_updated_at_id_idx"),
+            models.Index(
+                fields=["executor", "priority"],
+                name="task_active_executor_idx",
+                condition=~models.Q(state__in=["released", "archived"]),
+            ),
+            models.Index(
+                fields=["deadline", "id"],
+                name="task_active_deadline_idx",
+                condition=~models.Q(state__in=["released", "archived"]),
+            ),
+            GinIndex(fields=["search_vector"], name="task_search_vector_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class TaskTombstone(models.Model):
+    """A deleted task, kept for the change feed.
+
+    Rows are written by the ``main_task_tombstone`` trigger, so every way of
+    deleting tasks leaves one; ``prune_tombstones`` drops those older than
+    ``TASK_TOMBSTONE_RETENTION_DAYS``.
+    """
+
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["deleted_at", "task_id"], name="task_tombstone_deleted_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} deleted at {self.deleted_at}"
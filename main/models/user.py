@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from main.services.storage_backends import public_storage
 
@@ -16,3 +18,14 @@ class User(AbstractUser):
     date_of_birth = models.DateField(null=True, blank=True)
     phone = models.CharField(max_length=20, null=True, blank=True)
     avatar_picture = models.ImageField(null=True, storage=public_storage)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Serves both ``icontains`` (UPPER(username) LIKE ...) and the
+            # trigram similarity lookups used for typeahead.
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                name="user_username_trgm_idx",
+            ),
+        ]
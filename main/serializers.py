@@ -1,11 +1,16 @@
 from django.conf import settings
 from django.core.files.base import File
 from django.core.validators import FileExtensionValidator
+from django.db import transaction
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from main.models import User, Task, Tag
+from main.services.bulk import BulkListSerializer, BulkPrimaryKeyRelatedField
+from main.services.mail import enqueue_assign_notifications
+from main.services.server_timing import TimedSerializerMixin
+from main.services.sparse_fields import SparseFieldsSerializerMixin
 
 
 class FileMaxSizeValidator:
@@ -17,7 +22,9 @@ class FileMaxSizeValidator:
             raise ValidationError(f"Maximum size {self.max_size} exceeded.")
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(
+    SparseFieldsSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer
+):
     avatar_picture = serializers.FileField(
         required=False,
         validators=[
@@ -40,15 +47,48 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ("id", "name")
 
 
-class TaskSerializer(serializers.ModelSerializer):
+def is_reassigned(task: Task, attrs: dict) -> bool:
+    return "executor" in attrs and attrs["executor"].pk != task.executor_id
+
+
+class TaskListSerializer(BulkListSerializer):
+    def create(self, validated_data: list) -> list:
+        with transaction.atomic():
+            tasks = super().create(validated_data)
+            enqueue_assign_notifications(tasks)
+        return tasks
+
+    def update(self, instances: list, validated_data: list) -> list:
+        reassigned = [
+            task
+            for task, attrs in zip(instances, validated_data)
+            if is_reassigned(task, attrs)
+        ]
+        with transaction.atomic():
+            tasks = super().update(instances, validated_data)
+            enqueue_assign_notifications(reassigned)
+        return tasks
+
+
+class TaskSerializer(
+    SparseFieldsSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer
+):
+    serializer_related_field = BulkPrimaryKeyRelatedField
+    expandable_fields = {
+        "author": UserSerializer,
+        "executor": UserSerializer,
+        "tags": TagSerializer,
+    }
+
     class Meta:
         model = Task
+        list_serializer_class = TaskListSerializer
         fields = (
             "id",
             "name",
@@ -62,3 +102,36 @@ class TaskSerializer(serializers.ModelSerializer):
             "priority",
             "tags",
         )
+
+    def create(self, validated_data: dict) -> Task:
+        with transaction.atomic():
+            task = super().create(validated_data)
+            enqueue_assign_notifications([task])
+        return task
+
+    def update(self, instance: Task, validated_data: dict) -> Task:
+        reassigned = is_reassigned(instance, validated_data)
+        with transaction.atomic():
+            task = super().update(instance, validated_data)
+            if reassigned:
+                enqueue_assign_notifications([task])
+        return task
+
+
+class TaskChangeSerializer(serializers.Serializer):
+    state = serializers.ChoiceField(choices=Task.State.choices, required=False)
+    executor = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(), required=False
+    )
+    priority = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+    add_tags = serializers.PrimaryKeyRelatedField(
+        queryset=Tag.objects.all(), many=True, required=False
+    )
+    remove_tags = serializers.PrimaryKeyRelatedField(
+        queryset=Tag.objects.all(), many=True, required=False
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        if not attrs:
+            raise ValidationError("No changes given.")
+        return attrs
@@ -0,0 +1,171 @@
+import asyncio
+import weakref
+from functools import update_wrapper
+from typing import Any, Callable, List, Optional, TYPE_CHECKING
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpRequest, HttpResponse
+from rest_framework import exceptions, viewsets
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+if TYPE_CHECKING:
+    BaseViewMixinBaseClass = viewsets.GenericViewSet
+else:
+    BaseViewMixinBaseClass = object
+
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _slots:
+        _slots[loop] = asyncio.Semaphore(settings.ASYNC_VIEW_CONCURRENCY)
+    return _slots[loop]
+
+
+def release_connections() -> None:
+    # Otherwise the request's connection is closed once its response is sent,
+    # after the slot went to the next view.
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
+
+
+class AsyncReadMixin(BaseViewMixinBaseClass):
+    """Serves ``async_actions`` as native coroutines under ASGI.
+
+    Each action ``name`` is handled by ``a<name>``; mixins that wrap the
+    sync action wrap its async twin the same way. Other methods of the
+    route still run the sync view. List this mixin last, where DRF's model
+    mixins would go.
+
+    Django 4.2's async ORM still runs each query through ``sync_to_async``,
+    in the thread ``ASGIHandler`` gives the request, which opens its own
+    connection. So at most ``ASYNC_VIEW_CONCURRENCY`` views of a worker run
+    at once, each closing or returning its connection when it is done; the
+    others wait on the event loop, holding neither a thread nor a
+    connection.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions: Optional[dict] = None, **initkwargs: Any) -> Callable:
+        sync_view = super().as_view(actions, **initkwargs)
+        actions = sync_view.actions
+        if not set(actions.values()) & set(cls.async_actions):
+            return sync_view
+        run_sync_view = sync_to_async(sync_view)
+
+        async def view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            method = "get" if request.method == "HEAD" else request.method.lower()
+            async with get_slots():
+                try:
+                    # A profiled request's sync view runs in the profiled thread.
+                    if actions.get(method) not in cls.async_actions or hasattr(
+                        request, "profile_run"
+                    ):
+                        return await run_sync_view(request, *args, **kwargs)
+
+                    self = cls(**sync_view.initkwargs)
+                    self.action_map = actions
+                    for name, action in actions.items():
+                        setattr(self, name, getattr(self, action))
+                    if hasattr(self, "get") and not hasattr(self, "head"):
+                        self.head = self.get
+                    return await self.adispatch(request, *args, **kwargs)
+                finally:
+                    await sync_to_async(release_connections)()
+
+        update_wrapper(view, cls, updated=())
+        update_wrapper(view, cls.dispatch, assigned=())
+        view.cls = cls
+        view.initkwargs = sync_view.initkwargs
+        view.actions = actions
+        view.sync_view = sync_view
+        # csrf_exempt() would hide that the view is a coroutine function.
+        view.csrf_exempt = True
+        return view
+
+    async def adispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> Response:
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # initial() then finds the user already authenticated.
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aperform_authentication(self, request: Request) -> None:
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(
+                        request
+                    )
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def aget_object(self) -> Model:
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def apaginate_queryset(self, queryset: QuerySet) -> Optional[List[Any]]:
+        if self.paginator is None:
+            return None
+        if not hasattr(self.paginator, "apaginate_queryset"):
+            return await sync_to_async(self.paginate_queryset)(queryset)
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    async def alist(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer([item async for item in queryset], many=True)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
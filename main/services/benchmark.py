@@ -0,0 +1,387 @@
+import asyncio
+import fnmatch
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from main.models import Tag, Task, User
+
+# Query values for filter benchmarks, by filter name; unlisted filters are skipped.
+FILTER_SAMPLES = {
+    "state": lambda sample: Task.State.IN_QA,
+    "active": lambda sample: "true",
+    "search": lambda sample: sample.task.name.split()[0],
+    "tags": lambda sample: sample.tag.name,
+    "executor": lambda sample: sample.user.username,
+    "author": lambda sample: sample.task.author.username,
+    "username": lambda sample: sample.user.username[:-2],
+    "username_similar": lambda sample: sample.user.username,
+}
+
+
+@dataclass
+class Sample:
+    """Rows that fill URL kwargs: the busiest executor, one of their tagged
+    tasks and one of its tags."""
+
+    user: User
+    task: Task
+    tag: Tag
+
+    @classmethod
+    def pick(cls) -> "Sample":
+        user = (
+            User.objects.annotate(load=Count("tasks_to_do"))
+            .order_by("-load", "id")
+            .first()
+        )
+        task = (
+            Task.objects.filter(executor=user, tags__isnull=False)
+            .select_related("author")
+            .order_by("id")
+            .first()
+        ) or Task.objects.filter(executor=user).select_related("author").first()
+        tag = (task.tags.first() if task else None) or Tag.objects.first()
+        return cls(user=user, task=task, tag=tag)
+
+    def pk(self, model: type) -> int:
+        return {User: self.user, Task: self.task, Tag: self.tag}[model].pk
+
+    def url_kwargs(self, pattern: URLPattern, model: type) -> dict:
+        values = {
+            "pk": self.pk(model),
+            "parent_lookup_executor_id": self.user.pk,
+            "parent_lookup_task_id": self.task.pk,
+        }
+        return {name: values[name] for name in pattern.pattern.regex.groupindex}
+
+
+@dataclass
+class Case:
+    name: str
+    path: str
+
+
+@dataclass
+class Result:
+    path: str
+    requests: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    queries: int
+    peak_memory_kb: float
+    errors: int
+
+
+@dataclass
+class ConcurrencyResult:
+    server: str
+    clients: int
+    seconds: float
+    requests_per_second: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    errors: int
+
+
+def get_percentiles(latencies: List[float]) -> List[float]:
+    return statistics.quantiles(latencies, n=100, method="inclusive")
+
+
+def get_cases(patterns: List[URLPattern], sample: Sample) -> Iterator[Case]:
+    """Every GET route, plus one case per filter of its filterset."""
+    for pattern in patterns:
+        actions = getattr(pattern.callback, "actions", {})
+        if "get" not in actions:
+            continue
+        viewset = pattern.callback.cls
+        model = viewset.serializer_class.Meta.model
+        path = reverse(pattern.name, kwargs=sample.url_kwargs(pattern, model))
+        yield Case(pattern.name, path)
+
+        filterset = getattr(viewset, "filterset_class", None)
+        if filterset and actions["get"] == "list":
+            for name in filterset.base_filters:
+                if name in FILTER_SAMPLES:
+                    value = FILTER_SAMPLES[name](sample)
+                    yield Case(f"{pattern.name}?{name}", f"{path}?{name}={value}")
+
+
+def select_cases(cases: Iterator[Case], patterns: Optional[List[str]]) -> List[Case]:
+    return [
+        case
+        for case in cases
+        if not patterns
+        or any(fnmatch.fnmatch(case.name, pattern) for pattern in patterns)
+    ]
+
+
+class EndpointBenchmark:
+    """Drives cases in-process with a JWT-authenticated client per thread.
+
+    Latency comes from ``requests`` calls spread over ``concurrency`` threads
+    after ``warmup`` calls; queries and peak memory from one separate request,
+    so tracing does not skew the timings. Use as a context manager: leaving
+    it closes the worker threads' database connections.
+    """
+
+    def __init__(
+        self, user: User, requests: int, concurrency: int, warmup: int = 3
+    ) -> None:
+        self.token = str(AccessToken.for_user(user))
+        self.requests = requests
+        self.concurrency = concurrency
+        self.warmup = warmup
+        self.local = threading.local()
+        self.pool = ThreadPoolExecutor(concurrency, thread_name_prefix="benchmark")
+
+    def __enter__(self) -> "EndpointBenchmark":
+        return self
+
+    def __exit__(self, *args) -> None:
+        # Park every worker on the barrier so each one closes its connection.
+        barrier = threading.Barrier(self.concurrency)
+
+        def close() -> None:
+            barrier.wait()
+            connection.close()
+
+        list(self.pool.map(lambda _: close(), range(self.concurrency)))
+        self.pool.shutdown()
+
+    def client(self) -> Client:
+        if not hasattr(self.local, "client"):
+            self.local.client = Client(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        return self.local.client
+
+    def get(self, path: str) -> int:
+        response = self.client().get(path)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        response.close()
+        return response.status_code
+
+    def timed(self, path: str, count: int) -> List[tuple]:
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            status = self.get(path)
+            timings.append((time.perf_counter() - started, status))
+        return timings
+
+    def profile(self, path: str) -> tuple:
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                self.get(path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return len(queries), peak / 1024
+
+    def run(self, case: Case) -> Result:
+        self.timed(case.path, self.warmup)
+        queries, peak = self.profile(case.path)
+        shares = [
+            self.requests // self.concurrency
+            + (index < self.requests % self.concurrency)
+            for index in range(self.concurrency)
+        ]
+        chunks = self.pool.map(lambda count: self.timed(case.path, count), shares)
+        timings = [timing for chunk in chunks for timing in chunk]
+        latencies = [seconds * 1000 for seconds, _ in timings]
+        percentiles = get_percentiles(latencies)
+        return Result(
+            path=case.path,
+            requests=len(latencies),
+            p50_ms=round(percentiles[49], 3),
+            p95_ms=round(percentiles[94], 3),
+            p99_ms=round(percentiles[98], 3),
+            mean_ms=round(statistics.fmean(latencies), 3),
+            queries=queries,
+            peak_memory_kb=round(peak, 1),
+            errors=sum(status >= 400 for _, status in timings),
+        )
+
+
+class ConcurrencyBenchmark:
+    """Serves one path to ``clients`` concurrent slow clients, once through
+    the WSGI application on ``threads`` worker threads and once through the
+    ASGI application on one event loop.
+
+    Every client connects at the start and finishes sending its request
+    after a random delay of up to twice ``delay`` seconds, the same delays in
+    both runs. A WSGI worker waits for the request it picked, holding its
+    thread; the ASGI application awaits it. Latency runs from the start to
+    the client's last response byte, so it includes the client's own delay.
+    """
+
+    def __init__(
+        self,
+        user: User,
+        clients: int,
+        delay: float,
+        threads: int,
+        seed: int = 0,
+    ) -> None:
+        self.token = str(AccessToken.for_user(user))
+        self.threads = threads
+        generator = random.Random(seed)
+        self.delays = [generator.uniform(0, 2 * delay) for _ in range(clients)]
+
+    def environ(self, path: str) -> dict:
+        url = urlsplit(path)
+        return {
+            "REQUEST_METHOD": "GET",
+            "SCRIPT_NAME": "",
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": "testserver",
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": BytesIO(),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+
+    def scope(self, path: str) -> dict:
+        url = urlsplit(path)
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Bearer {self.token}".encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+
+    def wsgi(self, application: Callable, path: str) -> ConcurrencyResult:
+        started = time.perf_counter()
+
+        def exchange(delay: float) -> Tuple[float, int]:
+            time.sleep(max(0.0, started + delay - time.perf_counter()))
+            statuses = []
+            body = application(
+                self.environ(path),
+                lambda status, headers, exc_info=None: statuses.append(status),
+            )
+            try:
+                for _ in body:
+                    pass
+            finally:
+                body.close()
+            return time.perf_counter() - started, int(statuses[0].split()[0])
+
+        with ThreadPoolExecutor(self.threads, thread_name_prefix="wsgi") as pool:
+            timings = list(pool.map(exchange, self.delays))
+        return self.summarize("wsgi", timings, time.perf_counter() - started)
+
+    def asgi(self, application: Callable, path: str) -> ConcurrencyResult:
+        async def exchange(started: float, delay: float) -> Tuple[float, int]:
+            received = False
+            statuses = []
+
+            async def receive() -> dict:
+                nonlocal received
+                if received:
+                    # No disconnect: the client stays until the response ends.
+                    await asyncio.get_running_loop().create_future()
+                received = True
+                await asyncio.sleep(max(0.0, started + delay - time.perf_counter()))
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message: dict) -> None:
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            await application(self.scope(path), receive, send)
+            return time.perf_counter() - started, statuses[0]
+
+        async def run() -> List[Tuple[float, int]]:
+            started = time.perf_counter()
+            return await asyncio.gather(
+                *(exchange(started, delay) for delay in self.delays)
+            )
+
+        started = time.perf_counter()
+        timings = asyncio.run(run())
+        return self.summarize("asgi", timings, time.perf_counter() - started)
+
+    def summarize(
+        self, server: str, timings: List[Tuple[float, int]], seconds: float
+    ) -> ConcurrencyResult:
+        percentiles = get_percentiles([latency * 1000 for latency, _ in timings])
+        return ConcurrencyResult(
+            server=server,
+            clients=len(timings),
+            seconds=round(seconds, 3),
+            requests_per_second=round(len(timings) / seconds, 1),
+            p50_ms=round(percentiles[49], 3),
+            p95_ms=round(percentiles[94], 3),
+            p99_ms=round(percentiles[98], 3),
+            errors=sum(status >= 400 for _, status in timings),
+        )
+
+
+def compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], threshold: float
+) -> List[str]:
+    """Regressions against ``baseline``: slower p95 or more memory beyond
+    ``threshold`` (a fraction), any extra query, or any failed request."""
+    regressions = []
+    for name, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests")
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        if result["queries"] > before["queries"]:
+            regressions.append(
+                f"{name}: queries {before['queries']} -> {result['queries']}"
+            )
+        for metric in ("p95_ms", "peak_memory_kb"):
+            if result[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {before[metric]} -> {result[metric]}"
+                )
+    return regressions
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    with open(path) as file:
+        return json.load(file)["routes"]
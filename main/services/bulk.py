@@ -0,0 +1,235 @@
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
+from rest_framework import serializers, status, viewsets
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+if TYPE_CHECKING:
+    BaseViewMixinBaseClass = viewsets.GenericViewSet
+else:
+    BaseViewMixinBaseClass = object
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Looks related objects up in a map filled once per bulk request."""
+
+    prefetched: Optional[Dict[Any, models.Model]] = None
+
+    def to_internal_value(self, data: Any) -> models.Model:
+        if self.prefetched is not None and not isinstance(data, bool):
+            try:
+                return self.prefetched[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    batch_size = 1000
+
+    @property
+    def model(self) -> type[models.Model]:
+        return self.child.Meta.model
+
+    def many_to_many_fields(self) -> List[str]:
+        return [field.name for field in self.model._meta.many_to_many]
+
+    def to_internal_value(self, data: Any) -> List[dict]:
+        if isinstance(data, list):
+            self.prefetch_related_values(data)
+        return super().to_internal_value(data)
+
+    def prefetch_related_values(self, data: List[Any]) -> None:
+        # One query per relation instead of one per related value per item.
+        for name, field in self.child.fields.items():
+            relation = getattr(field, "child_relation", field)
+            if field.read_only or not isinstance(relation, BulkPrimaryKeyRelatedField):
+                continue
+            pks = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                values = value if isinstance(value, list) else [value]
+                pks.update(pk for pk in values if isinstance(pk, int))
+            relation.prefetched = relation.get_queryset().in_bulk(pks)
+
+    def create(self, validated_data: List[dict]) -> List[models.Model]:
+        many_to_many = self.many_to_many_fields()
+        instances, relations = [], []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            relations.append(
+                {name: attrs.pop(name) for name in many_to_many if name in attrs}
+            )
+            instances.append(self.model(**attrs))
+
+        with transaction.atomic():
+            self.model.objects.bulk_create(instances, batch_size=self.batch_size)
+            self.add_relations(instances, relations)
+        prefetch_related_objects(instances, *many_to_many)
+        return instances
+
+    def update(
+        self, instances: List[models.Model], validated_data: List[dict]
+    ) -> List[models.Model]:
+        many_to_many = self.many_to_many_fields()
+        fields, relations = set(), []
+        for instance, attrs in zip(instances, validated_data):
+            attrs = dict(attrs)
+            relations.append(
+                {name: attrs.pop(name) for name in many_to_many if name in attrs}
+            )
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            fields.update(attrs)
+
+        # bulk_update() skips pre_save(), so auto_now fields are set here.
+        now = timezone.now()
+        for field in self.model._meta.concrete_fields:
+            if getattr(field, "auto_now", False):
+                for instance in instances:
+                    setattr(instance, field.attname, now)
+                fields.add(field.name)
+
+        with transaction.atomic():
+            self.model.objects.bulk_update(
+                instances, sorted(fields), batch_size=self.batch_size
+            )
+            self.clear_relations(instances, relations)
+            self.add_relations(instances, relations)
+        for instance in instances:
+            getattr(instance, "_prefetched_objects_cache", {}).clear()
+        prefetch_related_objects(instances, *many_to_many)
+        return instances
+
+    def clear_relations(
+        self, instances: List[models.Model], relations: List[dict]
+    ) -> None:
+        for name in self.many_to_many_fields():
+            changed = [
+                instance.pk
+                for instance, values in zip(instances, relations)
+                if name in values
+            ]
+            if changed:
+                field = self.model._meta.get_field(name)
+                field.remote_field.through.objects.filter(
+                    **{f"{field.m2m_field_name()}__in": changed}
+                ).delete()
+                for instance, values in zip(instances, relations):
+                    if name in values:
+                        self.send_m2m_changed(field, instance, "post_clear", None)
+
+    def add_relations(
+        self, instances: List[models.Model], relations: List[dict]
+    ) -> None:
+        for name in self.many_to_many_fields():
+            field = self.model._meta.get_field(name)
+            through = field.remote_field.through
+            source, target = field.m2m_column_name(), field.m2m_reverse_name()
+            links = [
+                through(**{source: instance.pk, target: related.pk})
+                for instance, values in zip(instances, relations)
+                for related in values.get(name, ())
+            ]
+            through.objects.bulk_create(
+                links, batch_size=self.batch_size, ignore_conflicts=True
+            )
+            for instance, values in zip(instances, relations):
+                if values.get(name):
+                    pk_set = {related.pk for related in values[name]}
+                    self.send_m2m_changed(field, instance, "post_add", pk_set)
+
+    def send_m2m_changed(
+        self, field: models.ManyToManyField, instance: models.Model, action, pk_set
+    ) -> None:
+        # Through rows are written directly, so announce the change the way
+        # the related manager would for receivers such as cache invalidation.
+        m2m_changed.send(
+            sender=field.remote_field.through,
+            instance=instance,
+            action=action,
+            reverse=False,
+            model=field.related_model,
+            pk_set=pk_set,
+            using=instance._state.db,
+        )
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+
+class BulkModelMixin(BaseViewMixinBaseClass):
+    """Array payloads on the list route, applied in one transaction.
+
+    ``POST`` creates, ``PUT``/``PATCH`` update items identified by ``id`` and
+    ``DELETE`` removes the listed ids. A single object on ``POST`` falls back
+    to the regular ``create``.
+    """
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request: Request, *_: Any, **kwargs: Any) -> Response:
+        partial = kwargs.pop("partial", False)
+        if not isinstance(request.data, list):
+            raise serializers.ValidationError(
+                {"non_field_errors": ["Expected a list of items."]}
+            )
+        ids = self.get_bulk_ids(request.data)
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError(
+                {"non_field_errors": ["Each item may appear only once."]}
+            )
+        instances = self.get_bulk_objects(ids)
+        serializer = self.get_serializer(
+            instances, data=request.data, many=True, partial=partial
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+    def partial_bulk_update(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        kwargs["partial"] = True
+        return self.bulk_update(request, *args, **kwargs)
+
+    def bulk_destroy(self, request: Request, *_: Any, **__: Any) -> Response:
+        ids = self.get_bulk_ids(request.data)
+        with transaction.atomic():
+            self.get_bulk_queryset(ids).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def get_bulk_ids(data: Any) -> List[int]:
+        # Items are either bare ids or objects carrying an "id" key.
+        if isinstance(data, list):
+            data = {
+                "ids": [
+                    item.get("id") if isinstance(item, dict) else item for item in data
+                ]
+            }
+        serializer = BulkIdsSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data["ids"]
+
+    def get_bulk_queryset(self, ids: List[int]) -> models.QuerySet:
+        return self.filter_queryset(self.get_queryset()).filter(pk__in=ids)
+
+    def get_bulk_objects(self, ids: List[int]) -> List[models.Model]:
+        objects = self.get_bulk_queryset(ids).in_bulk(ids)
+        missing = [pk for pk in ids if pk not in objects]
+        if missing:
+            raise NotFound(f"Not found: {missing}.")
+        return [objects[pk] for pk in ids]
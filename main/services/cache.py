@@ -0,0 +1,130 @@
+import hashlib
+from typing import Any, Iterable, List, TYPE_CHECKING
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status, viewsets
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+if TYPE_CHECKING:
+    BaseViewMixinBaseClass = viewsets.GenericViewSet
+else:
+    BaseViewMixinBaseClass = object
+
+TAGS_SCOPE = "tags"
+
+
+def task_tags_scope(task_id: Any) -> str:
+    return f"task:{task_id}:tags"
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def generation_key(scope: str) -> str:
+    return f"response-cache:generation:{scope}"
+
+
+def get_generations(scopes: List[str]) -> List[str]:
+    cache = get_cache()
+    keys = [generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in generations}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+async def aget_generations(scopes: List[str]) -> List[str]:
+    cache = get_cache()
+    keys = [generation_key(scope) for scope in scopes]
+    generations = await cache.aget_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in generations}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def make_cache_key(generations: List[str], request: Request) -> str:
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"response-cache:{':'.join(generations)}:{path}"
+
+
+def invalidate(scopes: Iterable[str]) -> None:
+    """Retire every cached response that depends on one of ``scopes``.
+
+    Generations are random, so an evicted generation can never bring an old
+    response back. The bump is repeated on commit so that a response cached
+    by a concurrent request before the commit does not outlive it.
+    """
+    scopes = list(scopes)
+    if not scopes:
+        return
+
+    def bump() -> None:
+        get_cache().set_many(
+            {generation_key(scope): uuid4().hex for scope in scopes}, timeout=None
+        )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class CachedResponseMixin(BaseViewMixinBaseClass):
+    """Serve ``list``/``retrieve`` from the response cache.
+
+    Entries are keyed by the full URL and the generations of the scopes the
+    view depends on; signal handlers bump those generations on writes.
+    """
+
+    def get_cache_scopes(self) -> List[str]:
+        return [TAGS_SCOPE]
+
+    def get_cache_key(self, request: Request) -> str:
+        return make_cache_key(get_generations(self.get_cache_scopes()), request)
+
+    async def aget_cache_key(self, request: Request) -> str:
+        generations = await aget_generations(self.get_cache_scopes())
+        return make_cache_key(generations, request)
+
+    def cached(self, action: Any, request: Request, *args: Any, **kwargs: Any):
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = action(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    async def acached(
+        self, action: Any, request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        cache = get_cache()
+        key = await self.aget_cache_key(request)
+        data = await cache.aget(key)
+        if data is not None:
+            return Response(data)
+        response = await action(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return await self.acached(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return await self.acached(super().aretrieve, request, *args, **kwargs)
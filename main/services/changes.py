@@ -0,0 +1,132 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from main.models import TaskTombstone
+
+Position = Tuple[datetime, int]
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Cursor expired, download the tasks again."
+    default_code = "cursor_expired"
+
+
+def encode_cursor(position: Position) -> str:
+    moment, pk = position
+    payload = {"t": moment.isoformat(), "id": pk}
+    return urlsafe_b64encode(
+        json.dumps(payload, separators=(",", ":")).encode()
+    ).decode()
+
+
+def decode_cursor(token: str) -> Position:
+    try:
+        payload = json.loads(urlsafe_b64decode(token.encode()))
+        moment = parse_datetime(payload["t"])
+        pk = int(payload["id"])
+    except (binascii.Error, KeyError, TypeError, ValueError):
+        raise NotFound("Invalid cursor")
+    if moment is None or timezone.is_naive(moment):
+        raise NotFound("Invalid cursor")
+    return moment, pk
+
+
+def after(field: str, key: str, position: Position) -> Q:
+    moment, pk = position
+    # The redundant lower bound starts the (field, key) index scan at the cursor.
+    return Q(**{f"{field}__gte": moment}) & (
+        Q(**{f"{field}__gt": moment}) | Q(**{f"{key}__gt": pk})
+    )
+
+
+def oldest_write_start(using: str) -> Optional[datetime]:
+    """When the oldest other transaction that has written and is still open began.
+
+    Its rows may carry any ``updated_at`` after that and become visible only
+    when it commits. Other roles' sessions are hidden from pg_stat_activity,
+    so every writer of tasks must use the application's role.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT min(xact_start) FROM pg_stat_activity
+            WHERE datname = current_database()
+                AND backend_xid IS NOT NULL
+                AND pid <> pg_backend_pid()
+            """
+        )
+        return cursor.fetchone()[0]
+
+
+@dataclass
+class ChangePage:
+    rows: List[dict]
+    deleted: List[int]
+    cursor: Optional[str]
+    has_more: bool
+
+
+def get_changes(rows: QuerySet, cursor: Optional[str], page_size: int) -> ChangePage:
+    """Task ``values()`` rows changed and ids deleted after ``cursor``.
+
+    Updates and deletions are read in ``(updated_at, id)`` and
+    ``(deleted_at, task_id)`` order, each a range scan of its index, and
+    merged; the cursor is the position of the last change on the page.
+    Changes younger than ``TASK_CHANGES_DELAY`` are left for a later poll,
+    and so are those after the start of a write transaction still open,
+    however long it has run.
+    """
+    now = timezone.now()
+    position = decode_cursor(cursor) if cursor else None
+    retention = timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+    if position and position[0] < now - retention:
+        raise CursorExpired()
+
+    until = min(now, oldest_write_start(rows.db) or now) - timedelta(
+        seconds=settings.TASK_CHANGES_DELAY
+    )
+    if "updated_at" not in rows._fields:
+        rows = rows.values(*rows._fields, "updated_at")
+    rows = rows.filter(updated_at__lt=until).order_by("updated_at", "id")
+    tombstones = TaskTombstone.objects.filter(deleted_at__lt=until).order_by(
+        "deleted_at", "task_id"
+    )
+    if position:
+        rows = rows.filter(after("updated_at", "id", position))
+        tombstones = tombstones.filter(after("deleted_at", "task_id", position))
+
+    changes = sorted(
+        [
+            *((row["updated_at"], row["id"], row) for row in rows[: page_size + 1]),
+            *(
+                (deleted_at, pk, None)
+                for deleted_at, pk in tombstones.values_list("deleted_at", "task_id")[
+                    : page_size + 1
+                ]
+            ),
+        ],
+        key=lambda change: change[:2],
+    )
+    has_more = len(changes) > page_size
+    changes = changes[:page_size]
+    if changes:
+        cursor = encode_cursor(changes[-1][:2])
+    return ChangePage(
+        rows=[row for *_, row in changes if row is not None],
+        deleted=[pk for _, pk, row in changes if row is None],
+        cursor=cursor,
+        has_more=has_more,
+    )
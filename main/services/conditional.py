@@ -0,0 +1,154 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Tuple, TYPE_CHECKING
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status, viewsets
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+if TYPE_CHECKING:
+    BaseViewMixinBaseClass = viewsets.GenericViewSet
+else:
+    BaseViewMixinBaseClass = object
+
+Validators = Tuple[str, Optional[datetime]]
+
+
+def get_timestamp(last_modified: Optional[datetime]) -> Optional[int]:
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def make_etag(*parts: Any) -> str:
+    return quote_etag(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest())
+
+
+class ConditionalGetMixin(BaseViewMixinBaseClass):
+    """Answers ``list`` and ``retrieve`` with 304 while the client's
+    ``If-None-Match`` or ``If-Modified-Since`` still holds.
+
+    The validators come from ``updated_field``: a detail probes one row, a
+    list aggregates its maximum and the row count over the filtered
+    queryset. Either way nothing is serialized for a 304.
+    """
+
+    updated_field = "updated_at"
+    conditional_actions: Tuple[str, ...] = ("list", "retrieve")
+
+    def get_validators(self, request: Request) -> Optional[Validators]:
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        if self.action == "list":
+            state = queryset.aggregate(**self.get_list_state())
+            return self.get_list_validators(request, state)
+
+        try:
+            last_modified = next(iter(self.get_last_modified(queryset)), None)
+        except (TypeError, ValueError, ValidationError):
+            last_modified = None
+        return self.get_detail_validators(request, last_modified)
+
+    async def aget_validators(self, request: Request) -> Optional[Validators]:
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        if self.action == "list":
+            state = await queryset.aaggregate(**self.get_list_state())
+            return self.get_list_validators(request, state)
+
+        try:
+            rows = [row async for row in self.get_last_modified(queryset)]
+        except (TypeError, ValueError, ValidationError):
+            rows = []
+        return self.get_detail_validators(request, next(iter(rows), None))
+
+    def get_list_state(self) -> dict:
+        return {"last_modified": Max(self.updated_field), "count": Count("pk")}
+
+    def get_list_validators(self, request: Request, state: dict) -> Validators:
+        etag = make_etag(
+            request.get_full_path(),
+            request.accepted_media_type,
+            state["last_modified"],
+            state["count"],
+        )
+        return etag, state["last_modified"]
+
+    def get_last_modified(self, queryset: QuerySet) -> QuerySet:
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return queryset.filter(**{self.lookup_field: lookup}).values_list(
+            self.updated_field, flat=True
+        )[:1]
+
+    def get_detail_validators(
+        self, request: Request, last_modified: Optional[datetime]
+    ) -> Optional[Validators]:
+        if last_modified is None:
+            # Let the view answer 404.
+            return None
+        # The path tells sparse fieldsets of the same row apart.
+        etag = make_etag(
+            request.get_full_path(), request.accepted_media_type, last_modified
+        )
+        return etag, last_modified
+
+    @staticmethod
+    def get_not_modified(
+        request: Request, validators: Validators
+    ) -> Optional[HttpResponse]:
+        etag, last_modified = validators
+        return get_conditional_response(
+            request, etag=etag, last_modified=get_timestamp(last_modified)
+        )
+
+    @staticmethod
+    def add_validators(response: Response, validators: Validators) -> Response:
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            etag, last_modified = validators
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(get_timestamp(last_modified))
+        return response
+
+    def conditional(
+        self, request: Request, get_response: Callable[[], Response]
+    ) -> Response:
+        if self.action not in self.conditional_actions:
+            return get_response()
+        validators = self.get_validators(request)
+        if validators is None:
+            return get_response()
+        response = self.get_not_modified(request, validators) or get_response()
+        return self.add_validators(response, validators)
+
+    async def aconditional(
+        self, request: Request, get_response: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        if self.action not in self.conditional_actions:
+            return await get_response()
+        validators = await self.aget_validators(request)
+        if validators is None:
+            return await get_response()
+        response = self.get_not_modified(request, validators) or await get_response()
+        return self.add_validators(response, validators)
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        parent = super().list
+        return self.conditional(request, lambda: parent(request, *args, **kwargs))
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        parent = super().retrieve
+        return self.conditional(request, lambda: parent(request, *args, **kwargs))
+
+    async def alist(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        parent = super().alist
+        return await self.aconditional(
+            request, lambda: parent(request, *args, **kwargs)
+        )
+
+    async def aretrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        parent = super().aretrieve
+        return await self.aconditional(
+            request, lambda: parent(request, *args, **kwargs)
+        )
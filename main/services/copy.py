@@ -0,0 +1,48 @@
+from io import StringIO
+from typing import Any, Iterable, List, Type
+
+from django.db import connection, models
+
+# Text-format COPY escapes; other types never contain these characters.
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    return str(value)
+
+
+def copy_rows(table: str, columns: Iterable[str], rows: Iterable[tuple]) -> None:
+    """Load ``rows`` into ``table`` with one ``COPY FROM STDIN``."""
+    buffer = StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def allocate_ids(model: Type[models.Model], count: int) -> List[int]:
+    # Draw primary keys up front so related rows can be copied in the same pass.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return [pk for pk, in cursor.fetchall()]
+
+
+def copy_links(field: models.ManyToManyField, links: List[tuple]) -> None:
+    """Copy ``(source pk, target pk)`` pairs into a many-to-many table."""
+    if links:
+        through = field.remote_field.through
+        copy_rows(
+            through._meta.db_table,
+            [field.m2m_column_name(), field.m2m_reverse_name()],
+            links,
+        )
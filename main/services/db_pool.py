@@ -0,0 +1,250 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from psycopg2 import Error, OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+from main.services.metrics import (
+    DB_POOL_IDLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class PoolClosed(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """A thread-safe pool of psycopg2 connections, after ``psycopg_pool``.
+
+    ``min_size`` connections are opened in the background and kept; more are
+    opened on demand up to ``max_size``, after which :meth:`getconn` waits
+    ``timeout`` seconds for one to be returned. Idle connections above
+    ``min_size`` are closed after ``max_idle`` seconds and any connection
+    after ``max_lifetime``. ``check`` is called on a connection before it is
+    lent and should raise if it is broken.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 4,
+        max_size: Optional[int] = None,
+        timeout: float = 30.0,
+        max_idle: float = 600.0,
+        max_lifetime: float = 3600.0,
+        check: Optional[Callable[[Any], None]] = None,
+        name: str = "default",
+    ) -> None:
+        if max_size is None:
+            max_size = min_size
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"Invalid pool sizes {min_size} and {max_size}.")
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self.name = name
+        self.condition = threading.Condition()
+        # Returned connections and when, most recent last.
+        self.idle: Deque[Tuple[Any, float]] = deque()
+        self.opened_at: Dict[int, float] = {}
+        # Connections lent, idle or being opened.
+        self.size = 0
+        self.closed = False
+        if min_size:
+            threading.Thread(target=self.fill, name=f"pool-{name}", daemon=True).start()
+
+    @staticmethod
+    def check_connection(connection: Any) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        if not connection.autocommit:
+            connection.rollback()
+
+    def fill(self) -> None:
+        while True:
+            with self.condition:
+                if self.closed or self.size >= self.min_size:
+                    return
+                self.size += 1
+                self.report()
+            try:
+                connection = self.open()
+            except Error:
+                logger.exception("Could not fill the %s connection pool.", self.name)
+                return
+            self.putconn(connection)
+
+    def open(self) -> Any:
+        """Opens a connection for a slot the caller reserved in ``size``."""
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.report()
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.opened_at[id(connection)] = time.monotonic()
+        return connection
+
+    def discard(self, connections: List[Any]) -> None:
+        """Closes connections whose slots were already given up."""
+        for connection in connections:
+            with self.condition:
+                self.opened_at.pop(id(connection), None)
+            try:
+                connection.close()
+            except Error:
+                pass
+
+    def report(self) -> None:
+        """Publishes the pool's size to metrics; call with the lock."""
+        labels = {"pool": self.name}
+        DB_POOL_SIZE.set(labels, self.size)
+        DB_POOL_IDLE.set(labels, len(self.idle))
+
+    def is_expired(self, connection: Any, now: float) -> bool:
+        opened_at = self.opened_at.get(id(connection), now)
+        return now - opened_at >= self.max_lifetime
+
+    def prune(self, now: float) -> List[Any]:
+        """Takes idle connections past ``max_idle`` out; call with the lock."""
+        pruned = []
+        while (
+            self.idle
+            and self.size > self.min_size
+            and now - self.idle[0][1] >= self.max_idle
+        ):
+            pruned.append(self.idle.popleft()[0])
+            self.size -= 1
+        return pruned
+
+    def getconn(self, timeout: Optional[float] = None) -> Any:
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        while True:
+            with self.condition:
+                while True:
+                    if self.closed:
+                        raise PoolClosed(f"The {self.name} connection pool is closed.")
+                    if self.idle:
+                        connection = self.idle.pop()[0]
+                        break
+                    if self.size < self.max_size:
+                        self.size += 1
+                        connection = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        DB_POOL_TIMEOUTS.inc({"pool": self.name})
+                        raise PoolTimeout(
+                            f"No connection from the {self.name} pool "
+                            f"in {time.monotonic() - started:.2f}s."
+                        )
+                    self.condition.wait(remaining)
+                self.report()
+
+            if connection is None:
+                connection = self.open()
+            elif not self.is_usable(connection):
+                with self.condition:
+                    self.size -= 1
+                    self.report()
+                    self.condition.notify()
+                self.discard([connection])
+                continue
+            DB_POOL_WAIT.observe({"pool": self.name}, time.monotonic() - started)
+            return connection
+
+    def is_usable(self, connection: Any) -> bool:
+        if connection.closed or self.is_expired(connection, time.monotonic()):
+            return False
+        if self.check is None:
+            return True
+        try:
+            self.check(connection)
+        except Error:
+            logger.warning("Discarding a broken %s pool connection.", self.name)
+            return False
+        return True
+
+    def putconn(self, connection: Any) -> None:
+        now = time.monotonic()
+        usable = not connection.closed and not self.is_expired(connection, now)
+        if usable:
+            status = connection.info.transaction_status
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                usable = False
+            elif status != TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except Error:
+                    usable = False
+
+        with self.condition:
+            if usable and not self.closed:
+                self.idle.append((connection, now))
+                discarded = []
+            else:
+                self.size -= 1
+                discarded = [connection]
+            discarded += self.prune(now)
+            self.report()
+            self.condition.notify()
+        self.discard(discarded)
+
+    def close(self) -> None:
+        """Closes idle connections now and lent ones when they are returned."""
+        with self.condition:
+            self.closed = True
+            discarded = [connection for connection, _ in self.idle]
+            self.size -= len(discarded)
+            self.idle.clear()
+            self.report()
+            self.condition.notify_all()
+        self.discard(discarded)
+
+
+_pools: Dict[Tuple[int, str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    alias: str, params: Dict[str, Any], connect: Callable[[], Any], **options: Any
+) -> ConnectionPool:
+    """This process's pool for ``alias`` connecting with ``params``.
+
+    Forked workers get their own, so each worker holds at most
+    ``max_size`` backends.
+    """
+    key = (os.getpid(), alias, repr(sorted(params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(connect, name=alias, **options)
+        return _pools[key]
+
+
+def close_pools(alias: str) -> None:
+    with _pools_lock:
+        keys = [key for key in _pools if key[:2] == (os.getpid(), alias)]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
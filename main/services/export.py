@@ -0,0 +1,88 @@
+import csv
+from io import StringIO
+from typing import Any, AsyncIterator, Iterable, Iterator, List
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(JSONRenderer):
+    """Selects the NDJSON export; error responses are still one JSON object."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVRenderer(JSONRenderer):
+    """Selects the CSV export; error responses are rendered as JSON."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+
+EXPORT_RENDERERS = (NDJSONRenderer, CSVRenderer)
+
+
+def stream_ndjson(chunks: Iterable[List[dict]]) -> Iterator[str]:
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for chunk in chunks:
+        yield "".join(f"{encoder.encode(item)}\n" for item in chunk)
+
+
+def stream_csv(chunks: Iterable[List[dict]], fields: List[str]) -> Iterator[str]:
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    # The header goes out before the first row is fetched.
+    writer.writerow(fields)
+    yield flush()
+    for chunk in chunks:
+        writer.writerows([csv_value(item[field]) for field in fields] for item in chunk)
+        yield flush()
+
+
+def csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ",".join(str(item) for item in value)
+    return value
+
+
+async def iterate_async(content: Iterator[str]) -> AsyncIterator[str]:
+    """Advance ``content`` in the request's thread, one item per await.
+
+    ASGI would otherwise read a sync iterator into a list before sending it.
+    """
+    done = object()
+    next_item = sync_to_async(next)
+    while (item := await next_item(content, done)) is not done:
+        yield item
+
+
+def export_response(
+    chunks: Iterable[List[dict]], fields: List[str], format: str, asynchronous: bool
+) -> StreamingHttpResponse:
+    """Stream represented rows, one write per chunk, as CSV or NDJSON.
+
+    Pass ``asynchronous`` when serving over ASGI.
+    """
+    if format == CSVRenderer.format:
+        content = stream_csv(chunks, fields)
+        media_type = CSVRenderer.media_type
+    else:
+        content = stream_ndjson(chunks)
+        media_type = NDJSONRenderer.media_type
+    if asynchronous:
+        content = iterate_async(content)
+    response = StreamingHttpResponse(content, content_type=media_type)
+    response["Content-Disposition"] = f'attachment; filename="export.{format}"'
+    return response
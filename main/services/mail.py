@@ -1,14 +1,29 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from itertools import chain
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
 from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
 from django.template.loader import render_to_string
+from django.utils import timezone
+
+from main.models import OutboxMessage, Task
 
-from main.models import Task
+logger = logging.getLogger(__name__)
+
+ASSIGN_SUBJECT = "You've assigned a task."
+DIGEST_SUBJECT = "You've assigned {count} tasks."
 
 
 def send_assign_notification(task_id: int) -> None:
     task = Task.objects.get(pk=task_id)
     assignee = task.executor
     send_html_email(
-        subject="You've assigned a task.",
+        subject=ASSIGN_SUBJECT,
         template="notification.html",
         context={"task": task},
         recipients=[assignee.email],
@@ -26,3 +41,140 @@ def send_html_email(
         recipient_list=recipients,
         html_message=html_message,
     )
+
+
+def build_html_email(
+    subject: str, template: str, context: dict, recipients: list[str]
+) -> mail.EmailMultiAlternatives:
+    message = mail.EmailMultiAlternatives(subject=subject, body="", to=recipients)
+    message.attach_alternative(
+        render_to_string(f"emails/{template}", context), "text/html"
+    )
+    return message
+
+
+def enqueue_assign_notifications(tasks: Iterable[Task]) -> None:
+    # Call inside the transaction that assigns the tasks, so the outbox rows
+    # commit or roll back together with the assignment.
+    OutboxMessage.objects.bulk_create(
+        OutboxMessage(
+            kind=OutboxMessage.Kind.ASSIGN,
+            task_id=task.pk,
+            recipient_id=task.executor_id,
+        )
+        for task in tasks
+    )
+
+
+def build_outbox_email(messages: List[OutboxMessage]) -> mail.EmailMultiAlternatives:
+    recipients = [messages[0].recipient.email]
+    if len(messages) == 1:
+        return build_html_email(
+            subject=ASSIGN_SUBJECT,
+            template="notification.html",
+            context={"task": messages[0].task},
+            recipients=recipients,
+        )
+    return build_html_email(
+        subject=DIGEST_SUBJECT.format(count=len(messages)),
+        template="digest.html",
+        context={"tasks": [message.task for message in messages]},
+        recipients=recipients,
+    )
+
+
+def schedule_retry(message: OutboxMessage, error: Exception) -> None:
+    message.attempts += 1
+    message.last_error = repr(error)
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboxMessage.Status.FAILED
+    else:
+        delay = settings.OUTBOX_RETRY_DELAY * 2 ** (message.attempts - 1)
+        message.available_at = timezone.now() + timedelta(seconds=delay)
+
+
+def claim_outbox_batch(batch_size: int) -> List[OutboxMessage]:
+    queryset = OutboxMessage.objects.due()
+    ordering = ("available_at", "id")
+    window = settings.OUTBOX_DIGEST_WINDOW
+    if window:
+        # Hold a recipient's messages until the oldest one has waited a full
+        # window, then take all of them so they go out as one digest.
+        cutoff = timezone.now() - timedelta(seconds=window)
+        ready = queryset.filter(created_at__lte=cutoff).values("recipient_id")
+        queryset = queryset.filter(recipient_id__in=ready)
+        ordering = ("recipient_id", "id")
+    return list(
+        queryset.select_for_update(skip_locked=True, of=("self",))
+        .select_related("task", "recipient")
+        .order_by(*ordering)[:batch_size]
+    )
+
+
+def group_outbox_batch(batch: List[OutboxMessage]) -> List[List[OutboxMessage]]:
+    if not settings.OUTBOX_DIGEST_WINDOW:
+        return [[message] for message in batch]
+
+    groups: Dict[int, List[OutboxMessage]] = defaultdict(list)
+    for message in batch:
+        if message.task.executor_id != message.recipient_id:
+            # Reassigned again within the window: nothing left to announce.
+            message.status = OutboxMessage.Status.SENT
+            continue
+        group = groups[message.recipient_id]
+        if all(queued.task_id != message.task_id for queued in group):
+            group.append(message)
+        else:
+            message.status = OutboxMessage.Status.SENT
+    return list(groups.values())
+
+
+def send_outbox_batch(batch_size: Optional[int] = None) -> int:
+    """Deliver one batch of due outbox messages over a single SMTP connection.
+
+    Rows are claimed with ``SKIP LOCKED``, so any number of workers can drain
+    the outbox concurrently. With ``OUTBOX_DIGEST_WINDOW`` set, a recipient's
+    assignments are coalesced into one digest email. Returns the number of
+    messages processed.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    with transaction.atomic():
+        batch = claim_outbox_batch(batch_size)
+        if not batch:
+            return 0
+
+        groups = group_outbox_batch(batch)
+        connection = mail.get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            logger.exception("Cannot connect to the mail server")
+            for message in chain.from_iterable(groups):
+                schedule_retry(message, error)
+        else:
+            try:
+                for group in groups:
+                    deliver(connection, group)
+            finally:
+                connection.close()
+
+        now = timezone.now()
+        for message in batch:
+            if message.status == OutboxMessage.Status.SENT:
+                message.sent_at = now
+        OutboxMessage.objects.bulk_update(
+            batch, ["status", "attempts", "available_at", "last_error", "sent_at"]
+        )
+    return len(batch)
+
+
+def deliver(connection: BaseEmailBackend, messages: List[OutboxMessage]) -> None:
+    try:
+        connection.send_messages([build_outbox_email(messages)])
+    except Exception as error:
+        logger.exception("Cannot deliver outbox messages %s", messages)
+        for message in messages:
+            schedule_retry(message, error)
+    else:
+        for message in messages:
+            message.status = OutboxMessage.Status.SENT
@@ -0,0 +1,383 @@
+import glob
+import hmac
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from django.conf import settings
+from django.http import HttpRequest
+
+from main.services.middleware import (
+    Handler,
+    WrappingMiddleware,
+    execute_wrapper,
+)
+from main.services.server_timing import Timings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Entry = Tuple[str, float, int]
+
+
+def padded_length(length: int) -> int:
+    # Pad the key so the value that follows is 8-byte aligned.
+    return length + (8 - (length + 4) % 8) % 8
+
+
+def read_entries(data: bytes, used: int) -> Iterator[Entry]:
+    position = 8
+    while position < used:
+        length = struct.unpack_from("i", data, position)[0]
+        key = bytes(data[position + 4 : position + 4 + length]).decode()
+        value_position = position + 4 + padded_length(length)
+        yield key, struct.unpack_from("d", data, value_position)[0], value_position
+        position = value_position + 8
+
+
+class MmapDict:
+    """Float values by key in a memory-mapped file written by one process.
+
+    The file holds the number of bytes used, then entries of a 4-byte key
+    length, the padded key and an 8-byte double. An entry is written before
+    the used size covers it, so readers in other processes never see a
+    partial one.
+    """
+
+    initial_size = 1 << 16
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "a+b")
+        capacity = os.fstat(self.file.fileno()).st_size
+        if capacity == 0:
+            capacity = self.initial_size
+            self.file.truncate(capacity)
+        self.map = mmap.mmap(self.file.fileno(), capacity)
+        self.used = struct.unpack_from("q", self.map, 0)[0] or 8
+        self.positions = {
+            key: position for key, _, position in read_entries(self.map, self.used)
+        }
+
+    def increment(self, key: str, amount: float) -> None:
+        with self.lock:
+            position = self.positions.get(key) or self.add(key)
+            value = struct.unpack_from("d", self.map, position)[0]
+            struct.pack_into("d", self.map, position, value + amount)
+
+    def set(self, key: str, value: float) -> None:
+        with self.lock:
+            position = self.positions.get(key) or self.add(key)
+            struct.pack_into("d", self.map, position, value)
+
+    def add(self, key: str) -> int:
+        encoded = key.encode()
+        size = 4 + padded_length(len(encoded)) + 8
+        while self.used + size > len(self.map):
+            self.grow()
+        struct.pack_into(
+            f"i{padded_length(len(encoded))}sd",
+            self.map,
+            self.used,
+            len(encoded),
+            encoded,
+            0,
+        )
+        position = self.used + size - 8
+        self.used += size
+        struct.pack_into("q", self.map, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def grow(self) -> None:
+        capacity = len(self.map) * 2
+        self.map.close()
+        self.file.truncate(capacity)
+        self.map = mmap.mmap(self.file.fileno(), capacity)
+
+    @staticmethod
+    def read(path: str) -> Iterator[Tuple[str, float]]:
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) >= 8:
+            used = struct.unpack_from("q", data, 0)[0]
+            for key, value, _ in read_entries(data, min(used, len(data))):
+                yield key, value
+
+
+_stores: Dict[Tuple[int, str, bool], MmapDict] = {}
+_stores_lock = threading.Lock()
+LIVE_PREFIX = "live-"
+
+
+def get_store(live: bool = False) -> MmapDict:
+    """This process's file in ``METRICS_DIR``; forked workers get their own.
+
+    ``live`` values are only collected while this process is running.
+    """
+    key = (os.getpid(), settings.METRICS_DIR, live)
+    with _stores_lock:
+        if key not in _stores:
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            name = f"{LIVE_PREFIX if live else ''}{os.getpid()}.db"
+            _stores[key] = MmapDict(os.path.join(settings.METRICS_DIR, name))
+        return _stores[key]
+
+
+def is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect() -> Dict[str, float]:
+    """Values summed over the files of every process, live or exited.
+
+    Live values of exited processes are dropped, and so are their files.
+    """
+    totals: Dict[str, float] = defaultdict(float)
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, "*.db")):
+        name = os.path.basename(path)
+        if name.startswith(LIVE_PREFIX):
+            if not is_running(int(name[len(LIVE_PREFIX) : -len(".db")])):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+        for key, value in MmapDict.read(path):
+            totals[key] += value
+    return totals
+
+
+def sample_key(name: str, labels: Dict[str, str]) -> str:
+    return json.dumps([name, labels])
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    escaped = (
+        (name, value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+
+    def inc(self, labels: Dict[str, str], amount: float = 1) -> None:
+        get_store().increment(sample_key(self.name, labels), amount)
+
+    def samples(self, values: Dict[str, float]) -> Iterator[str]:
+        for key, value in sorted(values.items()):
+            name, labels = json.loads(key)
+            if name == self.name:
+                yield f"{name}{format_labels(labels)} {format_value(value)}"
+
+
+class Gauge:
+    """The current value in each running process, summed over them."""
+
+    type = "gauge"
+    samples = Counter.samples
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+
+    def set(self, labels: Dict[str, str], value: float) -> None:
+        get_store(live=True).set(sample_key(self.name, labels), value)
+
+
+class Histogram:
+    """Per-bucket counts are stored; cumulative ones are built on collection."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float]) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = [*buckets, float("inf")]
+
+    def observe(self, labels: Dict[str, str], value: float) -> None:
+        store = get_store()
+        bound = self.buckets[bisect_left(self.buckets, value)]
+        bucket = {**labels, "le": format_value(bound)}
+        store.increment(sample_key(f"{self.name}_bucket", bucket), 1)
+        store.increment(sample_key(f"{self.name}_sum", labels), value)
+        store.increment(sample_key(f"{self.name}_count", labels), 1)
+
+    def samples(self, values: Dict[str, float]) -> Iterator[str]:
+        series: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for key, value in values.items():
+            name, labels = json.loads(key)
+            if name == f"{self.name}_bucket":
+                bound = labels.pop("le")
+                series[json.dumps(labels)][bound] = value
+
+        for key in sorted(series):
+            labels = json.loads(key)
+            count = 0.0
+            for bound in map(format_value, self.buckets):
+                count += series[key].get(bound, 0)
+                bucket = format_labels({**labels, "le": bound})
+                yield f"{self.name}_bucket{bucket} {format_value(count)}"
+            for suffix in ("sum", "count"):
+                name = f"{self.name}_{suffix}"
+                value = values.get(sample_key(name, labels), 0)
+                yield f"{name}{format_labels(labels)} {format_value(value)}"
+
+
+REQUESTS = Counter("task_manager_requests_total", "Requests served.")
+LATENCY = Histogram(
+    "task_manager_request_duration_seconds",
+    "Time until the response is returned.",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+QUERIES = Histogram(
+    "task_manager_request_queries",
+    "Database queries per request.",
+    (0, 1, 2, 5, 10, 20, 50, 100),
+)
+DB_TIME = Histogram(
+    "task_manager_request_db_seconds",
+    "Time spent in database queries per request.",
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+RESPONSE_SIZE = Histogram(
+    "task_manager_response_size_bytes",
+    "Response body size.",
+    (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+DB_POOL_WAIT = Histogram(
+    "task_manager_db_pool_wait_seconds",
+    "Time until the pool lends a connection, opening one included.",
+    (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "task_manager_db_pool_timeouts_total",
+    "Requests for a pooled connection that timed out.",
+)
+DB_POOL_SIZE = Gauge(
+    "task_manager_db_pool_connections",
+    "Connections the pools hold, lent or idle, in running workers.",
+)
+DB_POOL_IDLE = Gauge(
+    "task_manager_db_pool_idle_connections",
+    "Connections waiting in the pools of running workers.",
+)
+METRICS: List = [
+    REQUESTS,
+    LATENCY,
+    QUERIES,
+    DB_TIME,
+    RESPONSE_SIZE,
+    DB_POOL_WAIT,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_SIZE,
+    DB_POOL_IDLE,
+]
+
+
+def render(values: Dict[str, float]) -> str:
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.samples(values))
+    return "\n".join(lines) + "\n"
+
+
+def get_view_name(request: HttpRequest) -> str:
+    match = request.resolver_match
+    if match is None:
+        return "unmatched"
+    actions = getattr(match.func, "actions", None) or {}
+    action = actions.get(request.method.lower())
+    if action is not None:
+        return f"{match.func.cls.__name__}.{action}"
+    return match.view_name
+
+
+def count_bytes(content: Iterable[bytes], labels: Dict[str, str]) -> Iterator[bytes]:
+    size = 0
+    for chunk in content:
+        size += len(chunk)
+        yield chunk
+    RESPONSE_SIZE.observe(labels, size)
+
+
+async def count_bytes_async(
+    content: AsyncIterable[bytes], labels: Dict[str, str]
+) -> AsyncIterator[bytes]:
+    size = 0
+    async for chunk in content:
+        size += len(chunk)
+        yield chunk
+    RESPONSE_SIZE.observe(labels, size)
+
+
+class MetricsMiddleware(WrappingMiddleware):
+    """Records every request in this process's file under ``METRICS_DIR``.
+
+    Streaming responses are timed until their headers are returned; their
+    size is recorded once the body has been sent.
+    """
+
+    def handle(self, request: HttpRequest) -> Handler:
+        timings = Timings()
+        started = time.perf_counter()
+        with execute_wrapper(timings):
+            response = yield
+        elapsed = time.perf_counter() - started
+
+        labels = {"view": get_view_name(request)}
+        REQUESTS.inc(
+            {**labels, "method": request.method, "status": str(response.status_code)}
+        )
+        LATENCY.observe(labels, elapsed)
+        QUERIES.observe(labels, timings.queries)
+        DB_TIME.observe(labels, timings.durations.get("db", 0.0))
+        if response.streaming and response.is_async:
+            content = count_bytes_async(response.streaming_content, labels)
+            response.streaming_content = content
+        elif response.streaming:
+            response.streaming_content = count_bytes(response.streaming_content, labels)
+        else:
+            RESPONSE_SIZE.observe(labels, len(response.content))
+        return response
+
+
+def is_authorized(request: HttpRequest, token: Optional[str]) -> bool:
+    """Without a token only the dev environment is let in."""
+    if not token:
+        return settings.DJANGO_ENV == "dev"
+    header = request.headers.get("Authorization", "")
+    return hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
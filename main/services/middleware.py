@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Awaitable, Callable, Generator, Iterator, Tuple, Union
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest, HttpResponse
+
+Handler = Generator[None, HttpResponse, HttpResponse]
+
+query_wrappers: ContextVar[Tuple[Callable, ...]] = ContextVar(
+    "query_wrappers", default=()
+)
+
+
+@contextmanager
+def execute_wrapper(wrapper: Callable) -> Iterator[None]:
+    """``connection.execute_wrapper`` for middleware.
+
+    Connections belong to threads, and an async view runs its queries in
+    other threads than the middleware around it. The wrapper is kept in a
+    context variable instead, which follows the request into those threads.
+    """
+    token = query_wrappers.set((*query_wrappers.get(), wrapper))
+    try:
+        yield
+    finally:
+        query_wrappers.reset(token)
+
+
+def run_query_wrappers(execute, sql, params, many, context):
+    for wrapper in reversed(query_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_wrappers(connection: BaseDatabaseWrapper) -> None:
+    if run_query_wrappers not in connection.execute_wrappers:
+        connection.execute_wrappers.append(run_query_wrappers)
+
+
+def resume(step: Callable[[Any], Any], value: Any) -> HttpResponse:
+    try:
+        step(value)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("handle() must yield exactly once.")
+
+
+class WrappingMiddleware:
+    """Middleware that serves sync and async chains alike.
+
+    Subclasses write :meth:`handle` as a generator: the code before its one
+    ``yield`` runs before the rest of the chain, the ``yield`` evaluates to
+    the chain's response, or raises its exception, and the generator returns
+    the response to pass on. Context managers around the ``yield`` span the
+    whole chain, whether it is sync or async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def handle(self, request: HttpRequest) -> Handler:
+        return (yield)
+
+    def __call__(
+        self, request: HttpRequest
+    ) -> Union[HttpResponse, Awaitable[HttpResponse]]:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        steps = self.handle(request)
+        next(steps)
+        try:
+            response = self.get_response(request)
+        except Exception as exc:
+            return resume(steps.throw, exc)
+        return resume(steps.send, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        steps = self.handle(request)
+        next(steps)
+        try:
+            response = await self.get_response(request)
+        except Exception as exc:
+            return resume(steps.throw, exc)
+        return resume(steps.send, response)
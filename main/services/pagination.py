@@ -0,0 +1,207 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Field, Q, QuerySet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+
+Position = Tuple[Any, int]
+
+
+class KeysetPagination(CursorPagination):
+    """Opaque cursor pagination over ``(sort key, id)``.
+
+    Every page is a single indexed range scan: the cursor carries the sort key
+    value and id of the boundary row, so there is neither ``OFFSET`` nor
+    ``COUNT(*)``. Ascending order is ``key ASC NULLS LAST, id ASC`` and the
+    descending order is its exact mirror, so one ``(key, id)`` btree index
+    serves both directions.
+    """
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering_param = "ordering"
+    ordering_fields: Sequence[str] = ("id",)
+    ordering = "id"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> Optional[List[Any]]:
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> Optional[List[Any]]:
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page([item async for item in queryset])
+
+    def get_page_queryset(
+        self, queryset: QuerySet, request: Request
+    ) -> Optional[QuerySet]:
+        """The page plus one row, to tell whether there are more."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering_key = self.get_ordering_key(request, queryset)
+        self.field = self.ordering_key.lstrip("-")
+        self.descending = self.ordering_key.startswith("-")
+        self.cursor = self.decode_cursor(request, queryset)
+
+        if queryset._fields and self.field not in queryset._fields:
+            # Sparse values() rows still need their sort key for the cursor.
+            queryset = queryset.values(*queryset._fields, self.field)
+        self.reverse = bool(self.cursor and self.cursor["reverse"])
+        if self.cursor:
+            queryset = queryset.filter(
+                self.seek(self.cursor["position"], backwards=self.reverse)
+            )
+        queryset = queryset.order_by(*self.get_order_by(self.reverse))
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results: List[Any]) -> List[Any]:
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_ordering_key(self, request: Request, queryset: QuerySet) -> str:
+        ordering = request.query_params.get(
+            self.ordering_param, self.get_default_ordering(queryset)
+        )
+        field = ordering.lstrip("-")
+        if field not in self.ordering_fields or not self.get_field(queryset, field):
+            raise ValidationError(
+                {self.ordering_param: [f"Unsupported ordering: {ordering}."]}
+            )
+        return ordering
+
+    def get_default_ordering(self, queryset: QuerySet) -> str:
+        # A filter may order the queryset itself, e.g. by search rank.
+        order_by = queryset.query.order_by
+        if order_by and isinstance(order_by[0], str):
+            if order_by[0].lstrip("-") in self.ordering_fields:
+                return order_by[0]
+        return self.ordering
+
+    @staticmethod
+    def get_field(queryset: QuerySet, name: str) -> Optional[Field]:
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        try:
+            return queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def get_order_by(self, reverse: bool) -> Tuple[str, ...]:
+        if self.field == "id":
+            fields: Tuple[str, ...] = ("id",)
+        else:
+            fields = (self.field, "id")
+        if self.descending != reverse:
+            return tuple(f"-{field}" for field in fields)
+        return fields
+
+    def seek(self, position: Position, backwards: bool) -> Q:
+        # Rows strictly after (or before) the cursor in the ascending order.
+        if self.descending != backwards:
+            return self.before(position)
+        return self.after(position)
+
+    def after(self, position: Position) -> Q:
+        value, pk = position
+        if self.field == "id":
+            return Q(pk__gt=pk)
+        if value is None:
+            return Q(**{f"{self.field}__isnull": True, "pk__gt": pk})
+        return (
+            Q(**{f"{self.field}__gt": value})
+            | Q(**{self.field: value, "pk__gt": pk})
+            | Q(**{f"{self.field}__isnull": True})
+        )
+
+    def before(self, position: Position) -> Q:
+        value, pk = position
+        if self.field == "id":
+            return Q(pk__lt=pk)
+        if value is None:
+            return Q(**{f"{self.field}__isnull": False}) | Q(
+                **{f"{self.field}__isnull": True, "pk__lt": pk}
+            )
+        return Q(**{f"{self.field}__lt": value}) | Q(
+            **{self.field: value, "pk__lt": pk}
+        )
+
+    def get_position(self, item: Any) -> Position:
+        if isinstance(item, dict):
+            # values() rows from a ValuesListMixin view.
+            return item[self.field], item["id"]
+        return getattr(item, self.field), item.pk
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(self.get_position(self.page[-1]), False)
+        return self.encode_cursor(self.cursor["position"], False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor(self.get_position(self.page[0]), True)
+        return self.encode_cursor(self.cursor["position"], True)
+
+    def encode_cursor(self, position: Position, reverse: bool) -> str:
+        value, pk = position
+        if isinstance(value, date):
+            value = value.isoformat()
+        payload = {"o": self.ordering_key, "v": value, "id": pk, "r": reverse}
+        token = urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request: Request, queryset: QuerySet) -> Optional[dict]:
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode()))
+            if payload["o"] != self.ordering_key:
+                raise ValueError(payload["o"])
+            value = payload["v"]
+            if value is not None:
+                value = self.get_field(queryset, self.field).to_python(value)
+            pk = int(payload["id"])
+            reverse = bool(payload["r"])
+        except (
+            binascii.Error,
+            DjangoValidationError,
+            KeyError,
+            TypeError,
+            ValueError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return {"position": (value, pk), "reverse": reverse}
@@ -0,0 +1,212 @@
+import cProfile
+import os
+import pstats
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.http import HttpRequest, HttpResponse
+
+from main.models import RequestProfile, User
+from main.services.metrics import get_view_name
+from main.services.middleware import Handler, WrappingMiddleware
+
+TOKEN_SALT = "main.profiling"
+HOTSPOTS = 50
+MAX_DEPTH = 64
+# Calls estimated below this many seconds are folded into their caller.
+MIN_SECONDS = 1e-5
+
+Function = Tuple[str, int, str]
+
+
+def make_token(user: User) -> str:
+    """A value for the ``X-Profile`` header or the ``profile`` query flag."""
+    return signing.dumps(user.pk, salt=TOKEN_SALT)
+
+
+def is_staff_token(token: str) -> bool:
+    try:
+        pk = signing.loads(
+            token, salt=TOKEN_SALT, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return User.objects.filter(pk=pk, is_staff=True, is_active=True).exists()
+
+
+def get_trigger(request: HttpRequest) -> Optional[str]:
+    token = request.headers.get("X-Profile") or request.GET.get("profile")
+    if token:
+        return RequestProfile.Trigger.TOKEN if is_staff_token(token) else None
+    if random.random() < settings.PROFILE_SAMPLE_RATE:
+        return RequestProfile.Trigger.SAMPLE
+    return None
+
+
+def label(function: Function) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name
+    for root in (str(settings.BASE_DIR), *sys.path):
+        if root and filename.startswith(root + os.sep):
+            filename = os.path.relpath(filename, root)
+            break
+    return f"{name} ({filename}:{line})"
+
+
+def get_hotspots(stats: dict) -> List[dict]:
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [
+        {
+            "function": label(function),
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "total_s": round(total, 6),
+            "cumulative_s": round(cumulative, 6),
+        }
+        for function, (primitive_calls, calls, total, cumulative, _) in rows[:HOTSPOTS]
+    ]
+
+
+def collapse(stats: dict) -> str:
+    """Collapsed stacks rebuilt from the caller edges ``cProfile`` records.
+
+    A function's time is split between its callees in proportion to the time
+    each edge took overall, so stacks are estimates: exact for call trees,
+    approximate when one function is reached through several callers.
+    """
+    callees: Dict[Function, List[Tuple[Function, float]]] = defaultdict(list)
+    for function, (*_, callers) in stats.items():
+        for caller, (*_, cumulative) in callers.items():
+            callees[caller].append((function, cumulative))
+
+    samples: Counter = Counter()
+    path: List[str] = []
+    visiting: Set[Function] = set()
+
+    def walk(function: Function, seconds: float) -> None:
+        path.append(label(function))
+        visiting.add(function)
+        cumulative = stats[function][3]
+        share = seconds / cumulative if cumulative else 0.0
+        own = seconds
+        if len(path) < MAX_DEPTH:
+            for callee, edge in callees.get(function, ()):
+                child = edge * share
+                if callee in visiting or child < MIN_SECONDS:
+                    continue
+                own -= child
+                walk(callee, child)
+        samples[";".join(path)] += max(own, 0.0)
+        visiting.discard(function)
+        path.pop()
+
+    for function, (*_, cumulative, callers) in stats.items():
+        if not callers:
+            walk(function, cumulative)
+
+    return "\n".join(
+        f"{stack} {round(seconds * 1_000_000)}"
+        for stack, seconds in sorted(samples.items())
+        if seconds * 1_000_000 >= 1
+    )
+
+
+def get_path(request: HttpRequest) -> str:
+    # The token stays out of the stored path.
+    query = request.GET.copy()
+    query.pop("profile", None)
+    return f"{request.path}?{query.urlencode()}" if query else request.path
+
+
+def save_profile(
+    request: HttpRequest,
+    response: HttpResponse,
+    profiler: cProfile.Profile,
+    trigger: str,
+    seconds: float,
+) -> RequestProfile:
+    stats = pstats.Stats(profiler).stats
+    profile = RequestProfile.objects.create(
+        view=get_view_name(request),
+        method=request.method,
+        path=get_path(request),
+        status=response.status_code,
+        duration_ms=seconds * 1000,
+        trigger=trigger,
+        hotspots=get_hotspots(stats),
+        stacks=collapse(stats),
+    )
+    RequestProfile.objects.filter(
+        id__lte=profile.id - settings.PROFILE_LOG_SIZE
+    ).delete()
+    return profile
+
+
+def stop_profile(request: HttpRequest, response: Optional[HttpResponse]) -> None:
+    profiler, trigger, started = request.profile_run
+    del request.profile_run
+    profiler.disable()
+    if response is not None:
+        save_profile(
+            request, response, profiler, trigger, time.perf_counter() - started
+        )
+
+
+class ProfilingMiddleware(WrappingMiddleware):
+    """Runs views under ``cProfile`` and stores the results.
+
+    A request is profiled when it carries a staff member's signed token in
+    the ``X-Profile`` header or ``profile`` query flag, or when it falls in
+    the ``PROFILE_SAMPLE_RATE`` share. The profiler starts in
+    ``process_view`` and stops once the response returns here, so it covers
+    the view, exception middleware and the rendering of the response, not
+    the middleware chain, whose recursive calls would blur the stacks. Keep
+    it last so the other middleware's ``process_view`` still runs. Streaming
+    bodies are produced after the profile is saved and are not covered.
+    """
+
+    def process_view(
+        self, request: HttpRequest, view: Callable, args: tuple, kwargs: dict
+    ) -> None:
+        trigger = get_trigger(request)
+        if trigger is None:
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this thread.
+            return
+        # Async read views see this and run their sync view in this thread.
+        request.profile_run = (profiler, trigger, time.perf_counter())
+
+    def handle(self, request: HttpRequest) -> Handler:
+        try:
+            response = yield
+        except Exception:
+            if hasattr(request, "profile_run"):
+                stop_profile(request, None)
+            raise
+        if hasattr(request, "profile_run"):
+            stop_profile(request, response)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        # The profiler runs in the request's sync thread, where process_view
+        # and sync views are called, so it is stopped there as well.
+        try:
+            response = await self.get_response(request)
+        except Exception:
+            if hasattr(request, "profile_run"):
+                await sync_to_async(stop_profile)(request, None)
+            raise
+        if hasattr(request, "profile_run"):
+            await sync_to_async(stop_profile)(request, response)
+        return response
@@ -0,0 +1,84 @@
+import logging
+import random
+from typing import Any, Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpRequest
+
+from main.services.middleware import (
+    Handler,
+    WrappingMiddleware,
+    execute_wrapper,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_QUERIES = 20
+
+
+def get_query_budget(
+    view: Callable, method: str
+) -> Tuple[Optional[str], Optional[int]]:
+    """The viewset action routed for ``method`` and its declared budget.
+
+    Viewsets declare budgets per action, e.g.
+    ``query_budgets = {"list": 3, "retrieve": 3}``.
+    """
+    actions = getattr(view, "actions", None) or {}
+    action = actions.get(method.lower())
+    if action is None:
+        return None, None
+    return action, getattr(view.cls, "query_budgets", {}).get(action)
+
+
+def format_queries(queries: List[str], limit: Optional[int] = None) -> str:
+    lines = [f"{number}. {sql}" for number, sql in enumerate(queries[:limit], 1)]
+    if limit is not None and len(queries) > limit:
+        lines.append(f"... {len(queries) - limit} more")
+    return "\n".join(lines)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` hook that records executed SQL."""
+
+    def __init__(self) -> None:
+        self.queries: List[str] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware(WrappingMiddleware):
+    """Logs a warning when a viewset action runs more queries than its budget.
+
+    Only a ``QUERY_BUDGET_SAMPLE_RATE`` share of requests is counted, so the
+    cost in production stays negligible. Set the rate to 1 in development to
+    check every request.
+    """
+
+    def handle(self, request: HttpRequest) -> Handler:
+        if random.random() >= settings.QUERY_BUDGET_SAMPLE_RATE:
+            return (yield)
+
+        recorder = QueryRecorder()
+        with execute_wrapper(recorder):
+            response = yield
+        budget = getattr(request, "query_budget", None)
+        if budget is not None and len(recorder.queries) > budget[1]:
+            action, limit = budget
+            logger.warning(
+                "%s ran %d queries, budget %d:\n%s",
+                action,
+                len(recorder.queries),
+                limit,
+                format_queries(recorder.queries, MAX_LOGGED_QUERIES),
+            )
+        return response
+
+    def process_view(
+        self, request: HttpRequest, view: Callable, *args: Any, **kwargs: Any
+    ) -> None:
+        action, budget = get_query_budget(view, request.method)
+        if budget is not None:
+            request.query_budget = (f"{view.cls.__name__}.{action}", budget)
@@ -0,0 +1,229 @@
+import random
+import time
+from bisect import bisect
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import List, Sequence, Tuple
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from main.models import Tag, Task, User
+from main.services.cache import TAGS_SCOPE, invalidate
+from main.services.copy import allocate_ids, copy_links, copy_rows
+from main.services.task_events import quiet_task_events
+
+# Timestamps are relative to a fixed date so a seed always yields the same rows.
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ROLES = ((User.Roles.DEVELOPER, 80), (User.Roles.MANAGER, 15), (User.Roles.ADMIN, 5))
+STATES = (
+    (Task.State.NEW, 15),
+    (Task.State.IN_DEV, 20),
+    (Task.State.IN_QA, 8),
+    (Task.State.IN_CR, 10),
+    (Task.State.FOR_RELEASE, 5),
+    (Task.State.RELEASED, 32),
+    (Task.State.ARCHIVED, 10),
+)
+FIRST_NAMES = ("Alex", "Maria", "Ivan", "Olga", "Sam", "Nina", "Pavel", "Kate")
+LAST_NAMES = ("Snow", "Groom", "Petrov", "Smith", "Ivanova", "Brown", "Lee")
+WORDS = (
+    "fix add refactor login report export cache search api billing profile "
+    "email upload tests docs deploy"
+).split()
+
+
+@dataclass
+class SeedResult:
+    users: int
+    tags: int
+    tasks: int
+    links: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.users + self.tags + self.tasks + self.links
+        return rows / self.seconds if self.seconds else 0.0
+
+
+class Picker:
+    """Weighted choice over a fixed population via cumulative weights."""
+
+    def __init__(self, rng: random.Random, items: Sequence, weights: Sequence[float]):
+        self.rng = rng
+        self.items = items
+        self.cumulative = list(accumulate(weights))
+        self.total = self.cumulative[-1]
+
+    def __call__(self):
+        return self.items[bisect(self.cumulative, self.rng.random() * self.total)]
+
+
+def zipf_weights(count: int, exponent: float) -> List[float]:
+    return [1 / rank**exponent for rank in range(1, count + 1)]
+
+
+class Seeder:
+    """Generates users, tags and tasks with a deterministic ``random.Random``.
+
+    Executor load and tag popularity are Zipf distributed, the number of tags
+    per task is geometric, and states follow a typical board. Rows are written
+    with ``COPY`` in batches, one transaction each.
+    """
+
+    def __init__(self, seed: int, prefix: str, batch_size: int, skew: float) -> None:
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.skew = skew
+        self.password = make_password(None)
+
+    def users(self, count: int) -> List[Tuple[int, str]]:
+        role = Picker(self.rng, *zip(*ROLES))
+        ids = allocate_ids(User, count)
+        rows = []
+        for number, pk in enumerate(ids):
+            username = f"{self.prefix}{number:07d}"
+            joined = EPOCH - timedelta(days=self.rng.randrange(365))
+            rows.append(
+                (
+                    pk,
+                    username,
+                    f"{username}@example.com",
+                    self.rng.choice(FIRST_NAMES),
+                    self.rng.choice(LAST_NAMES),
+                    role(),
+                    self.password,
+                    False,
+                    False,
+                    True,
+                    joined,
+                    joined,
+                )
+            )
+        for start in range(0, count, self.batch_size):
+            with transaction.atomic():
+                copy_rows(
+                    User._meta.db_table,
+                    (
+                        "id",
+                        "username",
+                        "email",
+                        "first_name",
+                        "last_name",
+                        "role",
+                        "password",
+                        "is_superuser",
+                        "is_staff",
+                        "is_active",
+                        "date_joined",
+                        "updated_at",
+                    ),
+                    rows[start : start + self.batch_size],
+                )
+        return [(row[0], row[5]) for row in rows]
+
+    def tags(self, count: int) -> List[int]:
+        ids = allocate_ids(Tag, count)
+        with transaction.atomic():
+            copy_rows(
+                Tag._meta.db_table,
+                ("id", "name"),
+                ((pk, f"{self.prefix}-tag-{number}") for number, pk in enumerate(ids)),
+            )
+        return ids
+
+    def tasks(self, count: int, users: List[Tuple[int, str]], tags: List[int]) -> int:
+        ids = [pk for pk, _ in users]
+        # A few executors carry most of the work.
+        executor = Picker(self.rng, ids, zipf_weights(len(ids), self.skew))
+        authors = [pk for pk, role in users if role != User.Roles.DEVELOPER] or ids
+        state = Picker(self.rng, *zip(*STATES))
+        tag = (
+            Picker(self.rng, tags, zipf_weights(len(tags), self.skew)) if tags else None
+        )
+
+        links = 0
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            with transaction.atomic():
+                quiet_task_events()
+                links += self.task_batch(size, executor, authors, state, tag)
+        return links
+
+    def task_batch(self, size: int, executor, authors, state, tag) -> int:
+        rng = self.rng
+        ids = allocate_ids(Task, size)
+        rows, links = [], []
+        for pk in ids:
+            created_at = EPOCH - timedelta(seconds=rng.randrange(365 * 86400))
+            updated_at = created_at + timedelta(seconds=rng.randrange(30 * 86400))
+            deadline = (
+                created_at + timedelta(days=rng.randrange(1, 60))
+                if rng.random() < 0.6
+                else None
+            )
+            rows.append(
+                (
+                    pk,
+                    " ".join(rng.choices(WORDS, k=rng.randint(2, 6))),
+                    " ".join(rng.choices(WORDS, k=rng.randint(5, 40))),
+                    rng.choice(authors),
+                    executor(),
+                    created_at,
+                    updated_at,
+                    deadline,
+                    state(),
+                    rng.randrange(6) if rng.random() < 0.7 else None,
+                )
+            )
+            if tag:
+                count = 0
+                while count < 8 and rng.random() < 0.6:
+                    count += 1
+                links.extend((pk, tag_id) for tag_id in {tag() for _ in range(count)})
+        copy_rows(
+            Task._meta.db_table,
+            (
+                "id",
+                "name",
+                "description",
+                "author_id",
+                "executor_id",
+                "created_at",
+                "updated_at",
+                "deadline",
+                "state",
+                "priority",
+            ),
+            rows,
+        )
+        copy_links(Task._meta.get_field("tags"), links)
+        return len(links)
+
+
+def seed(
+    users: int,
+    tags: int,
+    tasks: int,
+    seed: int = 0,
+    prefix: str = "seed",
+    batch_size: int = 10000,
+    skew: float = 1.1,
+) -> SeedResult:
+    started = time.perf_counter()
+    seeder = Seeder(seed, prefix, batch_size, skew)
+    user_rows = seeder.users(users)
+    tag_ids = seeder.tags(tags)
+    links = seeder.tasks(tasks, user_rows, tag_ids) if user_rows else 0
+    if tag_ids:
+        invalidate([TAGS_SCOPE])
+    return SeedResult(
+        users=users,
+        tags=tags,
+        tasks=tasks if user_rows else 0,
+        links=links,
+        seconds=time.perf_counter() - started,
+    )
@@ -0,0 +1,169 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Set, TYPE_CHECKING
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from rest_framework import viewsets
+from rest_framework.request import Request
+
+from main.services.middleware import (
+    Handler,
+    WrappingMiddleware,
+    execute_wrapper,
+)
+
+if TYPE_CHECKING:
+    BaseViewMixinBaseClass = viewsets.GenericViewSet
+else:
+    BaseViewMixinBaseClass = object
+
+logger = logging.getLogger(__name__)
+
+# Header order; phases a request never entered are left out.
+PHASES = ("auth", "db", "serialize", "render", "total")
+
+
+class Timings:
+    """Seconds spent per phase of one sampled request.
+
+    Also the ``execute_wrapper`` hook that times queries, so
+    ``db`` overlaps the phases that run queries.
+    """
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+        self.queries = 0
+        self.active: Set[str] = set()
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add("db", time.perf_counter() - started)
+
+    def header(self) -> str:
+        metrics = []
+        for name in PHASES:
+            if name in self.durations:
+                metric = f"{name};dur={self.durations[name] * 1000:.1f}"
+                if name == "db":
+                    metric += f';desc="{self.queries} queries"'
+                metrics.append(metric)
+        return ", ".join(metrics)
+
+    def record(self, request: HttpRequest, response: HttpResponse) -> dict:
+        return {
+            "method": request.method,
+            "path": request.path,
+            "view": getattr(request, "server_timing_view", None),
+            "status": response.status_code,
+            "queries": self.queries,
+            **{
+                f"{name}_ms": round(self.durations[name] * 1000, 3)
+                for name in PHASES
+                if name in self.durations
+            },
+        }
+
+
+current_timings: ContextVar[Optional[Timings]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+@contextmanager
+def measure(name: str) -> Iterator[None]:
+    """Add the time spent in the block to ``name`` of a sampled request.
+
+    Nested blocks of the same name are counted once.
+    """
+    timings = current_timings.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(name)
+        timings.add(name, time.perf_counter() - started)
+
+
+class ServerTimingMixin(BaseViewMixinBaseClass):
+    """Times DRF authentication, which runs inside the view."""
+
+    def perform_authentication(self, request: Request) -> None:
+        with measure("auth"):
+            super().perform_authentication(request)
+
+    async def aperform_authentication(self, request: Request) -> None:
+        with measure("auth"):
+            await super().aperform_authentication(request)
+
+
+class TimedSerializerMixin:
+    """Times ``to_representation`` of the outermost serializer."""
+
+    def to_representation(self, instance: Any) -> Any:
+        if current_timings.get() is None:
+            return super().to_representation(instance)
+        with measure("serialize"):
+            return super().to_representation(instance)
+
+
+class ServerTimingMiddleware(WrappingMiddleware):
+    """Adds a ``Server-Timing`` header and a JSON log line to sampled requests.
+
+    A ``SERVER_TIMING_SAMPLE_RATE`` share of requests is timed; the rest only
+    pay for one random draw.
+    """
+
+    def handle(self, request: HttpRequest) -> Handler:
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return (yield)
+
+        timings = Timings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with execute_wrapper(timings):
+                response = yield
+        finally:
+            current_timings.reset(token)
+        timings.add("total", time.perf_counter() - started)
+
+        response["Server-Timing"] = timings.header()
+        record = timings.record(request, response)
+        logger.info(json.dumps(record), extra={"server_timing": record})
+        return response
+
+    def process_view(
+        self, request: HttpRequest, view: Callable, *args: Any, **kwargs: Any
+    ) -> None:
+        action = (getattr(view, "actions", None) or {}).get(request.method.lower())
+        if action is not None:
+            request.server_timing_view = f"{view.cls.__name__}.{action}"
+
+    def process_template_response(
+        self, request: HttpRequest, response: SimpleTemplateResponse
+    ) -> SimpleTemplateResponse:
+        # Called right before the response is rendered.
+        timings = current_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda _: timings.add("render", time.perf_counter() - started)
+            )
+        return response
@@ -19,6 +19,7 @@ class BulkRouter(ExtendedSimpleRouter):
         self.routes: List[routers.Route] = copy.deepcopy(self.routes)
         self.routes[0].mapping.update({"patch": "partial_bulk_update"})
         self.routes[0].mapping.update({"put": "bulk_update"})
+        self.routes[0].mapping.update({"delete": "bulk_destroy"})
 
 
 class SingleResourceMixin(BaseViewMixinBaseClass):
@@ -29,6 +30,11 @@ class SingleResourceMixin(BaseViewMixinBaseClass):
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+    async def alist(self, _: Request, *__: Any, **___: Any) -> Response:
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
 
 class SingleResourceUpdateMixin(BaseViewMixinBaseClass):
     def bulk_update(self, request: Request, *_: Any, **kwargs: Any) -> Response:
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, List
+
+from asgiref.local import Local
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Avg, Count, Max, Sum
+from django.http import HttpRequest
+
+from main.models import SlowQuery
+from main.services.metrics import get_view_name
+from main.services.middleware import (
+    Handler,
+    WrappingMiddleware,
+    execute_wrapper,
+)
+
+logger = logging.getLogger(__name__)
+
+# Slow statements kept per request until it finishes.
+MAX_PENDING = 10
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+# Reads that change state or take locks when run, so never analyzed.
+VOLATILE = re.compile(
+    r"\b(?:nextval|setval|pg_notify|pg_advisory_\w*lock\w*)\s*\("
+    r"|\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b|\bFOR\s+KEY\s+SHARE\b",
+    re.IGNORECASE,
+)
+
+
+def normalize(sql: str) -> str:
+    """The statement with literals and placeholder lists collapsed."""
+    sql = LITERALS.sub("?", sql.replace("%s", "?"))
+    sql = PLACEHOLDER_LISTS.sub("(...)", sql)
+    return " ".join(sql.split())
+
+
+def fingerprint(sql: str) -> str:
+    return hashlib.md5(sql.encode()).hexdigest()
+
+
+@dataclass
+class PendingQuery:
+    sql: str
+    params: Any
+    duration_ms: float
+    view: str
+
+
+# Context-local, so async views' queries land with their request.
+_local = Local()
+
+
+def get_pending() -> List[PendingQuery]:
+    if not hasattr(_local, "queries"):
+        _local.queries = []
+    return _local.queries
+
+
+class SlowQueryRecorder:
+    """``execute_wrapper`` hook that keeps a sample of the
+    statements slower than ``SLOW_QUERY_THRESHOLD_MS``."""
+
+    def __init__(self, request: HttpRequest) -> None:
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if (
+                duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS
+                and not many
+                and random.random() < settings.SLOW_QUERY_SAMPLE_RATE
+            ):
+                pending = get_pending()
+                if len(pending) < MAX_PENDING:
+                    view = get_view_name(self.request)
+                    pending.append(PendingQuery(sql, params, duration_ms, view))
+
+
+class SlowQueryMiddleware(WrappingMiddleware):
+    """Records slow statements; they are explained once the response is sent.
+
+    ``SLOW_QUERY_THRESHOLD_MS`` of 0 turns the recorder off.
+    """
+
+    def handle(self, request: HttpRequest) -> Handler:
+        if not settings.SLOW_QUERY_THRESHOLD_MS:
+            return (yield)
+
+        _local.queries = pending = []
+        with execute_wrapper(SlowQueryRecorder(request)):
+            response = yield
+        if pending:
+            # Closers run before request_finished closes the connection.
+            response._resource_closers.append(partial(explain_pending, pending))
+        return response
+
+
+def explain_prefix(sql: str) -> str:
+    words = sql.split(None, 1)
+    keyword = words[0].upper() if words else ""
+    if keyword not in EXPLAINABLE:
+        return ""
+    # ANALYZE runs the statement, so only plain reads get it.
+    if keyword != "SELECT" or VOLATILE.search(sql):
+        return "EXPLAIN "
+    return "EXPLAIN (ANALYZE, BUFFERS) "
+
+
+def get_plan(query: PendingQuery) -> str:
+    prefix = explain_prefix(query.sql)
+    if not prefix:
+        return ""
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SET LOCAL statement_timeout = %s",
+                [settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS],
+            )
+            cursor.execute(prefix + query.sql, query.params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            transaction.set_rollback(True)
+    except DatabaseError as error:
+        return f"EXPLAIN failed: {error}"
+    return plan
+
+
+def explain_pending(pending: List[PendingQuery]) -> None:
+    """Explain and store the slow statements of a request.
+
+    This runs after the response has been sent, on the request's thread and
+    before its connection is closed or returned to the pool.
+    """
+    while pending:
+        query = pending.pop(0)
+        try:
+            plan = get_plan(query)
+            sql = normalize(query.sql)
+            recorded = SlowQuery.objects.create(
+                fingerprint=fingerprint(sql),
+                sql=sql,
+                duration_ms=query.duration_ms,
+                view=query.view,
+                plan=plan,
+            )
+            SlowQuery.objects.filter(
+                id__lte=recorded.id - settings.SLOW_QUERY_LOG_SIZE
+            ).delete()
+        except DatabaseError:
+            logger.exception("Could not record a slow query")
+
+
+def top_offenders(limit: int = 50) -> List[dict]:
+    """Recorded statements grouped by fingerprint, by total time, each with
+    the plan of its slowest run."""
+    offenders = list(
+        SlowQuery.objects.values("fingerprint", "sql")
+        .annotate(
+            calls=Count("id"),
+            total_ms=Sum("duration_ms"),
+            mean_ms=Avg("duration_ms"),
+            max_ms=Max("duration_ms"),
+            views=ArrayAgg("view", distinct=True, ordering="view"),
+        )
+        .order_by("-total_ms")[:limit]
+    )
+    fingerprints = [row["fingerprint"] for row in offenders]
+    plans = dict(
+        SlowQuery.objects.filter(fingerprint__in=fingerprints)
+        .order_by("fingerprint", "-duration_ms")
+        .distinct("fingerprint")
+        .values_list("fingerprint", "plan")
+    )
+    for row in offenders:
+        row["plan"] = plans.get(row["fingerprint"], "")
+    return offenders
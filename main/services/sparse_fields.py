@@ -0,0 +1,97 @@
+from typing import Any, Dict, Iterable, List, Optional, Type, TYPE_CHECKING
+
+from django.db.models import QuerySet
+from rest_framework import serializers, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from main.services.conditional import Validators
+from main.services.values import ValuesRepresentation
+
+if TYPE_CHECKING:
+    BaseViewMixinBaseClass = viewsets.GenericViewSet
+else:
+    BaseViewMixinBaseClass = object
+
+
+class SparseFieldsSerializerMixin:
+    """Accepts ``fields`` to keep and ``expand`` relations to embed.
+
+    An expanded relation is replaced by a read-only instance of its serializer
+    in ``expandable_fields``, nested many times over for many-to-many
+    relations, and is kept even when ``fields`` leaves it out.
+    """
+
+    expandable_fields: Dict[str, Type[serializers.BaseSerializer]] = {}
+
+    def __init__(
+        self,
+        *args: Any,
+        fields: Optional[Iterable[str]] = None,
+        expand: Iterable[str] = (),
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        expand = set(expand)
+        unknown = expand - set(self.expandable_fields)
+        if unknown:
+            raise ValidationError(
+                {"expand": [f"Unknown relations: {', '.join(sorted(unknown))}."]}
+            )
+        for name in expand:
+            many = isinstance(self.fields[name], serializers.ManyRelatedField)
+            self.fields[name] = self.expandable_fields[name](many=many, read_only=True)
+
+        if fields is None:
+            return
+        fields = set(fields)
+        unknown = fields - set(self.fields)
+        if unknown:
+            raise ValidationError(
+                {"fields": [f"Unknown fields: {', '.join(sorted(unknown))}."]}
+            )
+        for name in set(self.fields) - fields - expand:
+            self.fields.pop(name)
+
+
+def get_names(request: Request, param: str) -> Optional[List[str]]:
+    value = request.query_params.get(param)
+    if not value:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+class SparseFieldsMixin(BaseViewMixinBaseClass):
+    """Trims read payloads to ``?fields=`` and embeds ``?expand=`` relations.
+
+    The serializer must use :class:`SparseFieldsSerializerMixin`. Detail
+    querysets load only the columns the serializer reads and join or
+    prefetch only the relations it shows; lists already do so through
+    :class:`~main.services.values.ValuesRepresentation`. Writes always take
+    and return the full payload.
+    """
+
+    sparse_actions = ("list", "retrieve")
+
+    def get_serializer(self, *args: Any, **kwargs: Any) -> serializers.BaseSerializer:
+        if self.action in self.sparse_actions:
+            kwargs.setdefault("fields", get_names(self.request, "fields"))
+            kwargs.setdefault("expand", get_names(self.request, "expand") or ())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+        if self.action not in self.sparse_actions:
+            return queryset
+        return ValuesRepresentation(self.get_serializer()).only(queryset)
+
+    def get_validators(self, request: Request) -> Optional[Validators]:
+        # An expanded payload also changes with the related rows.
+        if get_names(request, "expand"):
+            return None
+        return super().get_validators(request)
+
+    async def aget_validators(self, request: Request) -> Optional[Validators]:
+        if get_names(request, "expand"):
+            return None
+        return await super().aget_validators(request)
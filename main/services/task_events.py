@@ -0,0 +1,427 @@
+import asyncio
+import json
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Set
+from urllib.parse import parse_qs
+
+import psycopg2
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections
+from django.db import connection as db_connection
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from main.models import Task, User
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "task_events"
+EVENTS_PATH = "/api/task-events/"
+DATETIME_FIELDS = ("created_at", "updated_at", "deadline")
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[dict]]
+Send = Callable[[dict], Awaitable[None]]
+
+
+@dataclass
+class TaskEvent:
+    """A decoded ``task_events`` notification.
+
+    ``before`` holds the executor, state or tag the task had before the
+    change, so subscribers whose filter it leaves hear about it too. Events
+    without a task, deletions included, go to every subscriber.
+    """
+
+    kind: str
+    id: int
+    task: Optional[dict] = None
+    before: dict = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        # Encoded once, however many subscribers receive it.
+        data = {"event": self.kind, "id": self.id}
+        if self.task is not None:
+            data["task"] = self.task
+        self.message = json.dumps(data, separators=(",", ":"))
+        self.sse = f"event: {self.kind}\ndata: {self.message}\n\n".encode()
+
+
+RESYNC = TaskEvent("resync", 0)
+
+
+def decode(payload: str) -> List[TaskEvent]:
+    """Events of a notification: one object, or an array of a transaction's."""
+    data = json.loads(payload)
+    return [decode_event(item) for item in (data if isinstance(data, list) else [data])]
+
+
+def decode_event(data: dict) -> TaskEvent:
+    task = data.get("task")
+    if task is not None:
+        # Match the API's rendering of the timestamps Postgres wrote.
+        field = serializers.DateTimeField()
+        for name in DATETIME_FIELDS:
+            if task[name] is not None:
+                task[name] = field.to_representation(parse_datetime(task[name]))
+    return TaskEvent(data["event"], data["id"], task, data.get("before") or {})
+
+
+@dataclass(frozen=True)
+class TaskEventFilter:
+    executor: Optional[int] = None
+    state: Optional[str] = None
+    tags: FrozenSet[int] = frozenset()
+
+    @classmethod
+    def from_query(cls, query: Dict[str, list]) -> "TaskEventFilter":
+        def get(name: str) -> Optional[str]:
+            values = query.get(name)
+            return values[-1] if values else None
+
+        executor, state, tags = get("executor"), get("state"), get("tags")
+        if state is not None and state not in Task.State.values:
+            raise ValueError(f"Unknown state {state!r}.")
+        try:
+            return cls(
+                executor=int(executor) if executor else None,
+                state=state or None,
+                tags=frozenset(int(tag) for tag in (tags or "").split(",") if tag),
+            )
+        except ValueError:
+            raise ValueError("executor and tags take ids.")
+
+    def matches(self, event: TaskEvent) -> bool:
+        task, before = event.task, event.before
+        if task is None:
+            return True
+        if self.executor is not None and self.executor not in (
+            task["executor"],
+            before.get("executor"),
+        ):
+            return False
+        if self.state is not None and self.state not in (
+            task["state"],
+            before.get("state"),
+        ):
+            return False
+        if self.tags and self.tags.isdisjoint([*task["tags"], *before.get("tags", ())]):
+            return False
+        return True
+
+
+class Subscription:
+    def __init__(self, filter: TaskEventFilter) -> None:
+        self.filter = filter
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    def put(self, event: TaskEvent) -> None:
+        if self.closed:
+            return
+        if self.queue.qsize() >= settings.TASK_EVENTS_QUEUE_SIZE:
+            # A client this far behind resyncs through the change feed.
+            self.close(RESYNC)
+        else:
+            self.queue.put_nowait(event)
+
+    def close(self, last: Optional[TaskEvent] = None) -> None:
+        if not self.closed:
+            self.closed = True
+            if last is not None:
+                self.queue.put_nowait(last)
+            self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[TaskEvent]:
+        return await self.queue.get()
+
+
+def quiet_task_events() -> None:
+    """Replace the events of the current transaction's task changes with one
+    ``resync``, for bulk writes that would flood every listener."""
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            "SET LOCAL main.quiet_task_events = 'on'; SELECT pg_notify(%s, %s)",
+            [CHANNEL, RESYNC.message],
+        )
+
+
+def connect() -> Any:
+    wrapper = connections.create_connection("default")
+    with wrapper.wrap_database_errors:
+        # Held for as long as anyone subscribes, so not taken from the pool.
+        connection = wrapper.get_unpooled_connection(wrapper.get_connection_params())
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+    return connection
+
+
+class TaskEventHub:
+    """One ``LISTEN`` connection per event loop, fanned out to subscribers.
+
+    The connection is read from the loop itself, so a notification costs
+    one decode and a filter check per subscriber; subscribers never query.
+    It is opened by the first subscriber and closed with the last. If it
+    breaks, every subscriber gets a ``resync`` event and its stream ends.
+    """
+
+    def __init__(self) -> None:
+        self.subscriptions: Set[Subscription] = set()
+        self.connection: Any = None
+        self.connecting: Optional[asyncio.Future] = None
+
+    async def subscribe(self, filter: TaskEventFilter) -> Subscription:
+        subscription = Subscription(filter)
+        self.subscriptions.add(subscription)
+        try:
+            if self.connection is None:
+                if self.connecting is None:
+                    self.connecting = asyncio.ensure_future(self.listen())
+                await asyncio.shield(self.connecting)
+        except Exception:
+            self.unsubscribe(subscription)
+            raise
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        self.subscriptions.discard(subscription)
+        if not self.subscriptions:
+            self.stop()
+
+    async def listen(self) -> None:
+        try:
+            connection = await asyncio.get_running_loop().run_in_executor(None, connect)
+        finally:
+            self.connecting = None
+        if not self.subscriptions:
+            connection.close()
+            return
+        self.connection = connection
+        asyncio.get_running_loop().add_reader(connection.fileno(), self.receive)
+
+    def stop(self) -> None:
+        if self.connection is not None:
+            asyncio.get_running_loop().remove_reader(self.connection.fileno())
+            self.connection.close()
+            self.connection = None
+
+    def receive(self) -> None:
+        try:
+            self.connection.poll()
+        except psycopg2.Error:
+            logger.exception("Lost the task event listener connection")
+            self.stop()
+            for subscription in list(self.subscriptions):
+                subscription.close(RESYNC)
+            self.subscriptions.clear()
+            return
+        notifies = self.connection.notifies
+        while notifies:
+            for event in decode(notifies.pop(0).payload):
+                self.publish(event)
+
+    def publish(self, event: TaskEvent) -> None:
+        for subscription in list(self.subscriptions):
+            if subscription.filter.matches(event):
+                subscription.put(event)
+            if subscription.closed:
+                self.subscriptions.discard(subscription)
+        if not self.subscriptions:
+            self.stop()
+
+
+_hubs: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TaskEventHub]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_hub() -> TaskEventHub:
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = TaskEventHub()
+    return _hubs[loop]
+
+
+def get_user(raw_token: str) -> Optional[User]:
+    authentication = JWTAuthentication()
+    try:
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    finally:
+        close_old_connections()
+    return user if user.is_active else None
+
+
+async def authenticate(scope: Scope, query: Dict[str, list]) -> Optional[User]:
+    # Browsers cannot set headers on EventSource or WebSocket requests.
+    headers = dict(scope["headers"])
+    authorization = headers.get(b"authorization", b"").decode()
+    if authorization.startswith("Bearer "):
+        raw_token = authorization[len("Bearer ") :]
+    else:
+        raw_token = (query.get("token") or [""])[-1]
+    if not raw_token:
+        return None
+    return await sync_to_async(get_user)(raw_token)
+
+
+async def watch_disconnect(
+    receive: Receive, disconnect: str, subscription: Subscription
+) -> None:
+    while (await receive())["type"] != disconnect:
+        pass
+    subscription.close()
+
+
+async def send_json(send: Send, status: int, data: dict) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": json.dumps(data).encode()})
+
+
+async def serve_events(
+    subscription: Subscription, write: Callable[[Optional[TaskEvent]], Awaitable]
+) -> None:
+    """Write events until the subscription closes, with ``None`` after every
+    ``TASK_EVENTS_KEEPALIVE`` quiet seconds."""
+    while True:
+        try:
+            event = await asyncio.wait_for(
+                subscription.get(), settings.TASK_EVENTS_KEEPALIVE
+            )
+        except asyncio.TimeoutError:
+            event = None
+        else:
+            if event is None:
+                return
+        await write(event)
+
+
+async def serve_sse(scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["method"] != "GET":
+        await send_json(
+            send, 405, {"detail": f'Method "{scope["method"]}" not allowed.'}
+        )
+        return
+    query = parse_qs(scope["query_string"].decode())
+    if await authenticate(scope, query) is None:
+        await send_json(
+            send, 401, {"detail": "Authentication credentials were not provided."}
+        )
+        return
+    try:
+        filter = TaskEventFilter.from_query(query)
+    except ValueError as error:
+        await send_json(send, 400, {"detail": str(error)})
+        return
+
+    hub = get_hub()
+    try:
+        subscription = await hub.subscribe(filter)
+    except DatabaseError:
+        logger.exception("Could not listen for task events")
+        await send_json(send, 503, {"detail": "Task events are unavailable."})
+        return
+    watcher = asyncio.ensure_future(
+        watch_disconnect(receive, "http.disconnect", subscription)
+    )
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+
+    async def write(body: bytes) -> None:
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+
+    try:
+        await write(b"retry: 2000\n\n")
+        await serve_events(
+            subscription,
+            lambda event: write(b": keepalive\n\n" if event is None else event.sse),
+        )
+        if not watcher.done():
+            await send({"type": "http.response.body", "body": b""})
+    finally:
+        watcher.cancel()
+        hub.unsubscribe(subscription)
+
+
+async def serve_websocket(scope: Scope, receive: Receive, send: Send) -> None:
+    if (await receive())["type"] != "websocket.connect":
+        return
+    query = parse_qs(scope["query_string"].decode())
+    try:
+        filter = TaskEventFilter.from_query(query)
+    except ValueError:
+        await send({"type": "websocket.close", "code": 1008})
+        return
+    if await authenticate(scope, query) is None:
+        await send({"type": "websocket.close", "code": 1008})
+        return
+
+    hub = get_hub()
+    try:
+        subscription = await hub.subscribe(filter)
+    except DatabaseError:
+        logger.exception("Could not listen for task events")
+        await send({"type": "websocket.close", "code": 1011})
+        return
+    watcher = asyncio.ensure_future(
+        watch_disconnect(receive, "websocket.disconnect", subscription)
+    )
+    await send({"type": "websocket.accept"})
+
+    async def write(event: Optional[TaskEvent]) -> None:
+        if event is not None:
+            await send({"type": "websocket.send", "text": event.message})
+
+    try:
+        await serve_events(subscription, write)
+        if not watcher.done():
+            await send({"type": "websocket.close", "code": 1000})
+    finally:
+        watcher.cancel()
+        hub.unsubscribe(subscription)
+
+
+class TaskEventsRouter:
+    """ASGI application serving task events at ``EVENTS_PATH`` as
+    server-sent events or over a WebSocket, and the rest through ``app``.
+
+    Streams are served here rather than by a Django view so an open one
+    holds no thread and skips the synchronous middleware chain.
+    """
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] == EVENTS_PATH:
+            await serve_sse(scope, receive, send)
+        elif scope["type"] == "websocket":
+            if scope["path"] == EVENTS_PATH:
+                await serve_websocket(scope, receive, send)
+            else:
+                await send({"type": "websocket.close", "code": 1000})
+        else:
+            await self.app(scope, receive, send)
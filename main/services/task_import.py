@@ -0,0 +1,246 @@
+import csv
+import json
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from main.models import Tag, Task, User
+from main.services.cache import TAGS_SCOPE, invalidate
+from main.services.copy import allocate_ids, copy_links, copy_rows
+from main.services.task_events import quiet_task_events
+
+COLUMNS = (
+    "name",
+    "description",
+    "author",
+    "executor",
+    "state",
+    "priority",
+    "deadline",
+    "created_at",
+    "updated_at",
+    "tags",
+)
+MAX_ERRORS = 100
+STATES = frozenset(Task.State.values)
+
+Line = Tuple[int, Optional[dict]]
+
+
+@dataclass
+class ImportResult:
+    tasks: int
+    tags: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.tasks / self.seconds if self.seconds else 0.0
+
+
+def read_rows(stream: Iterable[str], format: str) -> Iterator[Line]:
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            tags = row.get("tags") or ""
+            row["tags"] = [name.strip() for name in tags.split(",") if name.strip()]
+            yield reader.line_num, row
+    else:
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row
+
+
+class TaskImporter:
+    """Validates rows a batch at a time and loads them with ``COPY``.
+
+    Usernames and tag names are resolved through maps loaded once; unknown
+    tag names are created. Task ids are drawn from the sequence up front so
+    the tag links can be copied in the same pass.
+    """
+
+    def __init__(self) -> None:
+        self.users: Dict[str, int] = dict(User.objects.values_list("username", "id"))
+        # Tag names are not unique; the oldest tag of a name wins.
+        self.tags: Dict[str, int] = dict(
+            Tag.objects.order_by("-id").values_list("name", "id")
+        )
+        self.errors: Dict[int, dict] = {}
+        self.created_tags = 0
+        self.tasks = 0
+        self.links = 0
+        self.now = timezone.now()
+
+    def add(self, lines: List[Line]) -> None:
+        records = self.validate(lines)
+        if self.errors or not records:
+            # Keep validating to report errors, but the import will roll back.
+            return
+        self.create_tags(records)
+        self.copy(records)
+
+    def validate(self, lines: List[Line]) -> List[dict]:
+        records = []
+        for number, row in lines:
+            if not isinstance(row, dict):
+                self.add_error(number, {"non_field_errors": "Not a JSON object."})
+                continue
+            errors: Dict[str, str] = {}
+            record = {
+                "name": self.text(row, "name", Task, errors, required=True),
+                "description": self.text(row, "description", Task, errors),
+                "author_id": self.user(row, "author", errors),
+                "executor_id": self.user(row, "executor", errors),
+                "state": row.get("state") or Task.State.NEW,
+                "priority": self.priority(row, errors),
+                "deadline": self.datetime(row, "deadline", errors),
+                "created_at": self.datetime(row, "created_at", errors) or self.now,
+                "updated_at": self.datetime(row, "updated_at", errors) or self.now,
+                "tags": self.tag_names(row, errors),
+            }
+            if not isinstance(record["state"], str) or record["state"] not in STATES:
+                errors["state"] = f"Unknown state {record['state']!r}."
+            if set(row) - set(COLUMNS):
+                errors["non_field_errors"] = "Unexpected columns."
+            if errors:
+                self.add_error(number, errors)
+            else:
+                records.append(record)
+        return records
+
+    def add_error(self, line: int, errors: dict) -> None:
+        if len(self.errors) < MAX_ERRORS:
+            self.errors[line] = errors
+
+    @staticmethod
+    def text(row: dict, name: str, model: Any, errors: dict, required=False) -> str:
+        value = row.get(name) or ""
+        if not isinstance(value, str):
+            errors[name] = "Must be a string."
+        elif required and not value:
+            errors[name] = "This field is required."
+        elif len(value) > model._meta.get_field(name).max_length:
+            errors[name] = "Too long."
+        return value
+
+    def user(self, row: dict, name: str, errors: dict) -> Optional[int]:
+        username = row.get(name)
+        if not isinstance(username, str) or username not in self.users:
+            errors[name] = f"Unknown user {username!r}."
+        return self.users.get(username)
+
+    @staticmethod
+    def priority(row: dict, errors: dict) -> Optional[int]:
+        value = row.get("priority")
+        if value in (None, ""):
+            return None
+        try:
+            priority = int(value)
+        except (TypeError, ValueError):
+            priority = -1
+        if priority < 0 or isinstance(value, (bool, float)):
+            errors["priority"] = "Must be a non-negative integer."
+        return priority
+
+    @staticmethod
+    def datetime(row: dict, name: str, errors: dict) -> Any:
+        value = row.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            parsed = parse_datetime(value)
+        except (TypeError, ValueError):
+            parsed = None
+        if parsed is None:
+            errors[name] = "Invalid datetime."
+            return None
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    @staticmethod
+    def tag_names(row: dict, errors: dict) -> List[str]:
+        names = row.get("tags") or []
+        max_length = Tag._meta.get_field("name").max_length
+        if not isinstance(names, list) or not all(
+            isinstance(name, str) and 0 < len(name) <= max_length for name in names
+        ):
+            errors["tags"] = "Must be a list of tag names."
+            return []
+        return list(dict.fromkeys(names))
+
+    def create_tags(self, records: List[dict]) -> None:
+        missing = {
+            name for record in records for name in record["tags"]
+        } - self.tags.keys()
+        if missing:
+            tags = Tag.objects.bulk_create(Tag(name=name) for name in sorted(missing))
+            self.tags.update((tag.name, tag.id) for tag in tags)
+            self.created_tags += len(tags)
+
+    def copy(self, records: List[dict]) -> None:
+        ids = allocate_ids(Task, len(records))
+        columns = [column for column in records[0] if column != "tags"]
+        copy_rows(
+            Task._meta.db_table,
+            ["id", *columns],
+            (
+                (pk, *(record[column] for column in columns))
+                for pk, record in zip(ids, records)
+            ),
+        )
+        links = [
+            (pk, self.tags[name])
+            for pk, record in zip(ids, records)
+            for name in record["tags"]
+        ]
+        copy_links(Task._meta.get_field("tags"), links)
+        self.tasks += len(records)
+        self.links += len(links)
+
+
+def batches(lines: Iterable[Line], size: int) -> Iterator[List[Line]]:
+    lines = iter(lines)
+    while batch := list(islice(lines, size)):
+        yield batch
+
+
+def import_tasks(
+    stream: Iterable[str], format: str, batch_size: Optional[int] = None
+) -> ImportResult:
+    """Load NDJSON or CSV tasks in one transaction; any invalid row aborts it.
+
+    Imported tasks do not queue assignment notifications.
+    """
+    started = time.perf_counter()
+    with transaction.atomic():
+        quiet_task_events()
+        importer = TaskImporter()
+        for batch in batches(
+            read_rows(stream, format), batch_size or settings.IMPORT_BATCH_SIZE
+        ):
+            importer.add(batch)
+            if len(importer.errors) >= MAX_ERRORS:
+                break
+        if importer.errors:
+            # Keyed by the line number in the input.
+            raise ValidationError({"errors": importer.errors})
+    if importer.created_tags:
+        invalidate([TAGS_SCOPE])
+    return ImportResult(
+        tasks=importer.tasks,
+        tags=importer.links,
+        seconds=time.perf_counter() - started,
+    )
@@ -0,0 +1,69 @@
+from typing import Iterable, List
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
+
+from main.models import Tag, Task
+from main.services.mail import enqueue_assign_notifications
+
+
+def change_tasks(
+    queryset: QuerySet,
+    changes: dict,
+    add_tags: Iterable[Tag] = (),
+    remove_tags: Iterable[Tag] = (),
+) -> int:
+    add_tags, remove_tags = list(add_tags), list(remove_tags)
+    through = Task.tags.through
+    with transaction.atomic():
+        # Fix the target set first: the changes may touch the filtered columns.
+        # Locking it makes a row that a concurrent transaction moves out of the
+        # filter drop out here, as Postgres rechecks the filter once the row
+        # is free; id order keeps two transitions from deadlocking.
+        ids: List[int] = list(
+            queryset.order_by("id")
+            .select_for_update(of=("self",))
+            .values_list("id", flat=True)
+        )
+        if not ids:
+            return 0
+        reassigned: List[int] = []
+        if "executor" in changes:
+            reassigned = list(
+                Task.objects.filter(pk__in=ids)
+                .exclude(executor=changes["executor"])
+                .values_list("id", flat=True)
+            )
+        Task.objects.filter(pk__in=ids).update(**changes, updated_at=timezone.now())
+        if reassigned:
+            enqueue_assign_notifications(
+                Task.objects.filter(pk__in=reassigned).only("id", "executor_id")
+            )
+        if remove_tags:
+            through.objects.filter(task_id__in=ids, tag__in=remove_tags).delete()
+            send_tags_changed(remove_tags, "post_remove", ids)
+        if add_tags:
+            through.objects.bulk_create(
+                (through(task_id=pk, tag=tag) for pk in ids for tag in add_tags),
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+            send_tags_changed(add_tags, "post_add", ids)
+    return len(ids)
+
+
+def send_tags_changed(tags: List[Tag], action: str, ids: List[int]) -> None:
+    # The through rows bypass the related manager; announce the change from
+    # the tag side so one signal covers every task in the batch.
+    for tag in tags:
+        m2m_changed.send(
+            sender=Task.tags.through,
+            instance=tag,
+            action=action,
+            reverse=True,
+            model=Task,
+            pk_set=set(ids),
+            using=tag._state.db,
+        )
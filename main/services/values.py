@@ -0,0 +1,270 @@
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from django.db.models import QuerySet
+from rest_framework import serializers, viewsets
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from main.services.server_timing import measure
+
+if TYPE_CHECKING:
+    BaseViewMixinBaseClass = viewsets.GenericViewSet
+else:
+    BaseViewMixinBaseClass = object
+
+Converter = Optional[Callable[[Any], Any]]
+
+# Fields whose to_representation() returns database values unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.EmailField,
+    serializers.IntegerField,
+)
+
+
+class ValuesRepresentation:
+    """Serializer output built straight from ``values()`` rows.
+
+    Produces the same data as ``serializer.to_representation`` for plain
+    model fields, primary key relations and many-to-many primary key lists,
+    without model instances or per-row field dispatch. Many-to-many lists
+    come from one ``ARRAY_AGG`` query per relation, ordered by primary key.
+
+    Nested serializers of plain fields stand for expanded relations: a
+    foreign key is joined into the same rows, a many-to-many relation is
+    read through its join table in the query its id list would have taken.
+    """
+
+    def __init__(
+        self, serializer: serializers.BaseSerializer, prefix: str = ""
+    ) -> None:
+        self.model = serializer.Meta.model
+        self.prefix = prefix
+        self.pk = prefix + self.model._meta.pk.attname
+        self.columns: List[Tuple[str, str, Converter]] = []
+        self.many: List[Tuple[str, models.ManyToManyField]] = []
+        self.expanded: Dict[str, ValuesRepresentation] = {}
+        self.nested: List[Tuple[str, ValuesRepresentation]] = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            model_field = self.get_model_field(field)
+            if isinstance(field, serializers.ManyRelatedField):
+                self.check_primary_key(field.child_relation)
+                self.many.append((name, model_field))
+                self.columns.append((name, name, None))
+            elif isinstance(field, serializers.ListSerializer):
+                target = model_field.m2m_reverse_field_name()
+                self.many.append((name, model_field))
+                self.expanded[name] = self.get_nested(field.child, f"{target}__")
+                self.columns.append((name, name, None))
+            elif isinstance(field, serializers.BaseSerializer):
+                # The nested item is put in the row under its own prefix.
+                key = f"{prefix}{model_field.name}"
+                self.nested.append((key, self.get_nested(field, f"{key}__")))
+                self.columns.append((name, key, None))
+            elif isinstance(field, serializers.RelatedField):
+                self.check_primary_key(field)
+                self.columns.append((name, prefix + model_field.attname, None))
+            else:
+                self.columns.append(
+                    (
+                        name,
+                        prefix + model_field.attname,
+                        self.get_converter(field, model_field),
+                    )
+                )
+
+    @classmethod
+    def get_nested(
+        cls, serializer: serializers.BaseSerializer, prefix: str
+    ) -> "ValuesRepresentation":
+        nested = cls(serializer, prefix)
+        if nested.many:
+            raise ImproperlyConfigured(
+                f"{serializer.field_name!r} may not hold many-to-many fields."
+            )
+        return nested
+
+    def get_keys(self) -> List[str]:
+        """The columns to select, including those of joined relations."""
+        related = {name for name, _ in self.many}
+        related.update(key for key, _ in self.nested)
+        keys = [self.pk]
+        keys.extend(key for _, key, _ in self.columns if key not in related)
+        for _, nested in self.nested:
+            keys.extend(nested.get_keys())
+        return keys
+
+    def get_model_field(self, field: serializers.Field) -> models.Field:
+        try:
+            return self.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                f"{field.field_name!r} is not a model field of {self.model.__name__}."
+            )
+
+    @staticmethod
+    def check_primary_key(field: serializers.Field) -> None:
+        if (
+            not isinstance(field, serializers.PrimaryKeyRelatedField)
+            or field.pk_field is not None
+        ):
+            raise ImproperlyConfigured(
+                f"{field.field_name!r} must be a plain PrimaryKeyRelatedField."
+            )
+
+    @staticmethod
+    def get_converter(field: serializers.Field, model_field: models.Field) -> Converter:
+        if type(field) in PASSTHROUGH_FIELDS:
+            return None
+        if isinstance(field, serializers.FileField):
+            return lambda name: field.to_representation(
+                model_field.attr_class(None, model_field, name)
+            )
+        return field.to_representation
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        names = set(self.get_keys())
+        # Annotations such as a search rank are kept for ordering and cursors.
+        names.update(queryset.query.annotation_select)
+        return queryset.prefetch_related(None).values(*names)
+
+    def only(self, queryset: QuerySet) -> QuerySet:
+        """Instances loading just the columns and relations the serializer
+        reads, for the serializer itself rather than :meth:`represent`."""
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .select_related(*(key for key, _ in self.nested))
+            .prefetch_related(*(name for name, _ in self.many))
+            .only(*self.get_keys())
+        )
+
+    def get_related(self, field: models.ManyToManyField, ids: List[Any]) -> QuerySet:
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        return (
+            field.remote_field.through.objects.filter(**{f"{source}__in": ids})
+            .values(source)
+            .annotate(related=ArrayAgg(target, ordering=target))
+            .values_list(source, "related")
+        )
+
+    def get_expanded(
+        self,
+        field: models.ManyToManyField,
+        ids: List[Any],
+        nested: "ValuesRepresentation",
+    ) -> QuerySet:
+        source = field.m2m_field_name()
+        return (
+            field.remote_field.through.objects.filter(**{f"{source}__in": ids})
+            .order_by(source, nested.pk)
+            .values(source, *nested.get_keys())
+        )
+
+    def get_related_rows(
+        self, name: str, field: models.ManyToManyField, ids: List[Any]
+    ) -> QuerySet:
+        if name in self.expanded:
+            return self.get_expanded(field, ids, self.expanded[name])
+        return self.get_related(field, ids)
+
+    def attach(
+        self,
+        rows: List[dict],
+        name: str,
+        field: models.ManyToManyField,
+        related_rows: Iterable[Any],
+    ) -> None:
+        """Put the values of relation ``name`` read by ``get_related_rows``
+        in ``rows``."""
+        if name in self.expanded:
+            source, nested = field.m2m_field_name(), self.expanded[name]
+            related: Dict[Any, List[Any]] = {}
+            for row in related_rows:
+                related.setdefault(row[source], []).append(nested.represent(row))
+        else:
+            related = dict(related_rows)
+        for row in rows:
+            row[name] = related.get(row[self.pk], [])
+
+    def to_representation(self, rows: Iterable[dict]) -> List[dict]:
+        rows = list(rows)
+        ids = [row[self.pk] for row in rows]
+        for name, field in self.many:
+            related_rows = self.get_related_rows(name, field, ids) if ids else ()
+            self.attach(rows, name, field, related_rows)
+
+        with measure("serialize"):
+            return [self.represent(row) for row in rows]
+
+    async def ato_representation(self, rows: Iterable[dict]) -> List[dict]:
+        if isinstance(rows, QuerySet):
+            rows = [row async for row in rows]
+        else:
+            rows = list(rows)
+        ids = [row[self.pk] for row in rows]
+        for name, field in self.many:
+            related_rows = []
+            if ids:
+                related_rows = [
+                    row async for row in self.get_related_rows(name, field, ids)
+                ]
+            self.attach(rows, name, field, related_rows)
+
+        with measure("serialize"):
+            return [self.represent(row) for row in rows]
+
+    def chunks(self, rows: Iterable[dict], chunk_size: int) -> Iterator[List[dict]]:
+        # One related query per chunk, so memory does not grow with the rows.
+        rows = iter(rows)
+        while chunk := list(islice(rows, chunk_size)):
+            yield self.to_representation(chunk)
+
+    def represent(self, row: dict) -> dict:
+        for key, nested in self.nested:
+            row[key] = None if row[nested.pk] is None else nested.represent(row)
+        item = {}
+        for name, key, convert in self.columns:
+            value = row[key]
+            item[name] = value if convert is None or value is None else convert(value)
+        return item
+
+
+class ValuesListMixin(BaseViewMixinBaseClass):
+    """Serve ``list`` and its async twin through :class:`ValuesRepresentation`."""
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        representation = ValuesRepresentation(self.get_serializer())
+        queryset = representation.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(representation.to_representation(page))
+        return Response(representation.to_representation(queryset))
+
+    async def alist(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        representation = ValuesRepresentation(self.get_serializer())
+        queryset = representation.values(self.filter_queryset(self.get_queryset()))
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                await representation.ato_representation(page)
+            )
+        return Response(await representation.ato_representation(queryset))
@@ -0,0 +1,46 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from main.models import Tag, Task
+from main.services.cache import TAGS_SCOPE, invalidate, task_tags_scope
+from main.services.middleware import install_query_wrappers
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tags(sender, **kwargs) -> None:
+    # Every task's tag list renders tag names, so this retires them as well.
+    invalidate([TAGS_SCOPE])
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_tagged_tasks(sender, instance: Tag, **kwargs) -> None:
+    # The links go without saving their tasks; bump updated_at so the task
+    # ETags change with the tag list.
+    Task.objects.filter(tags=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_deleted_task_tags(sender, instance: Task, **kwargs) -> None:
+    invalidate([task_tags_scope(instance.pk)])
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def invalidate_task_tags(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate([task_tags_scope(instance.pk)])
+    elif pk_set is None:
+        # tag.task_set.clear(): the affected tasks are no longer known.
+        invalidate([TAGS_SCOPE])
+    else:
+        invalidate(task_tags_scope(pk) for pk in pk_set)
+
+
+@receiver(connection_created)
+def install_middleware_query_wrappers(sender, connection, **kwargs) -> None:
+    install_query_wrappers(connection)
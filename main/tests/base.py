@@ -2,8 +2,11 @@ import copy
 from http import HTTPStatus
 from typing import List, Union
 
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve, reverse
 from rest_framework.test import APIClient, APITestCase
 from rest_framework.response import Response
 
@@ -11,6 +14,7 @@ from faker.providers import BaseProvider
 
 
 from main.models import User, Task, Tag
+from main.services.query_budget import format_queries, get_query_budget
 
 
 CURRENT_TIME = "2023-06-24T12:00:00Z"
@@ -31,7 +35,31 @@ def merge(base: dict, another_values: dict = None) -> dict:
     return result
 
 
+class QueryBudgetAPIClient(APIClient):
+    """Fails any request whose viewset action exceeds its query budget."""
+
+    def request(self, **kwargs) -> Response:
+        try:
+            view = resolve(kwargs["PATH_INFO"]).func
+        except Resolver404:
+            return super().request(**kwargs)
+
+        action, budget = get_query_budget(view, kwargs["REQUEST_METHOD"])
+        with CaptureQueriesContext(connection) as context:
+            response = super().request(**kwargs)
+        if action is not None:
+            name = f"{view.cls.__name__}.{action}"
+            queries = [query["sql"] for query in context.captured_queries]
+            assert budget is not None, f"{name} declares no query budget."
+            assert len(queries) <= budget, (
+                f"{name} ran {len(queries)} queries, budget {budget}:\n"
+                f"{format_queries(queries)}"
+            )
+        return response
+
+
 class TestViewSetBase(APITestCase):
+    client_class = QueryBudgetAPIClient
     user: User = None
     admin: User = None
     client: APIClient = None
@@ -65,6 +93,11 @@ class TestViewSetBase(APITestCase):
         cls.admin = cls.create_superuser(cls)
         cls.client = APIClient()
 
+    def setUp(self) -> None:
+        super().setUp()
+        # Cached responses would outlive the rolled back test data.
+        cache.clear()
+
     @staticmethod
     def create_api_user(self):
         return User.objects.create(**self.user_atributes)
@@ -120,7 +153,13 @@ class TestViewSetBase(APITestCase):
         self.client.force_login(self.user)
         response = self.client.get(self.list_url(args), data=data)
         assert response.status_code == HTTPStatus.OK, response.content
-        return response.data
+        return self.results(response.data)
+
+    @staticmethod
+    def results(data: Union[dict, list]) -> list:
+        if isinstance(data, dict) and "results" in data:
+            return data["results"]
+        return data
 
     def request_retrieve(self, args: Union[str, int]) -> Response:
         self.client.force_login(self.user)
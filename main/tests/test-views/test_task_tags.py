@@ -1,4 +1,9 @@
-from main.models import Task
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from main.models import Tag, Task
+from main.services.tasks import change_tasks
 from main.tests.base import TestViewSetBase
 
 
@@ -58,3 +63,81 @@ class TestUserTasksViewSet(TestViewSetBase):
         self.delete([self.task.id, self.tag.id])
 
         self.assert_list_ids(expected=[{"id": tag2.id}], args=[self.task.id])
+
+    def tag_names(self) -> list:
+        return [tag["name"] for tag in self.list(args=[self.task.id])]
+
+    def test_list_is_cached(self) -> None:
+        self.add_tags(self.task, [self.tag.id])
+        self.list(args=[self.task.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            tags = self.list(args=[self.task.id])
+
+        assert self.ids(tags) == [self.tag.id]
+        assert not any("main_t" in query["sql"] for query in queries)
+
+    def test_list_is_invalidated_by_relation_changes(self) -> None:
+        tag2 = self.create_tag({"name": "tag2"})
+        other = self.create_task()
+        assert self.tag_names() == []
+
+        self.task.tags.add(self.tag)
+        assert self.tag_names() == ["test tag"]
+
+        tag2.task_set.add(self.task, other)
+        assert self.tag_names() == ["test tag", "tag2"]
+
+        self.task.tags.remove(self.tag)
+        assert self.tag_names() == ["tag2"]
+
+        tag2.name = "renamed"
+        tag2.save()
+        assert self.tag_names() == ["renamed"]
+
+        tag2.task_set.clear()
+        assert self.tag_names() == []
+
+    def test_list_is_invalidated_by_bulk_changes(self) -> None:
+        tag2 = self.create_tag({"name": "tag2"})
+        assert self.tag_names() == []
+
+        change_tasks(Task.objects.filter(pk=self.task.id), {}, add_tags=[self.tag])
+        assert self.tag_names() == ["test tag"]
+
+        change_tasks(Task.objects.filter(pk=self.task.id), {}, remove_tags=[self.tag])
+        assert self.tag_names() == []
+
+        self.client.force_login(self.user)
+        response = self.client.patch(
+            reverse("tasks-list"),
+            data=[{"id": self.task.id, "tags": [self.tag.id, tag2.id]}],
+            format="json",
+        )
+        assert response.status_code == 200, response.content
+        assert self.tag_names() == ["test tag", "tag2"]
+
+    def test_lists_are_cached_per_task(self) -> None:
+        other = self.create_task()
+        self.add_tags(self.task, [self.tag.id])
+
+        assert self.tag_names() == ["test tag"]
+        assert self.list(args=[other.id]) == []
+
+        other.tags.add(Tag.objects.create(name="other"))
+        assert self.tag_names() == ["test tag"]
+        assert self.ids(self.list(args=[other.id])) == [other.tags.get().id]
+
+    def test_list_runs_one_tag_query(self) -> None:
+        self.add_tags(self.task, [self.tag.id])
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url([self.task.id]))
+
+        assert response.status_code == 200, response.content
+        assert response.data == [{"id": self.tag.id, "name": "test tag"}]
+        assert not any('FROM "main_task" ' in query["sql"] for query in queries)
+
+    def test_list_of_missing_task_is_empty(self) -> None:
+        assert self.list(args=[0]) == []
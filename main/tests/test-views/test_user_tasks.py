@@ -45,3 +45,36 @@ class TestUserTasksViewSet(TestViewSetBase):
         retrieved_task = self.retrieve(args=[self.user.id, created_task.id])
 
         assert created_task.id == retrieved_task["id"]
+
+    def test_list_answers_304_while_unchanged(self) -> None:
+        task = self.create_task({"executor": self.user})
+        self.client.force_login(self.user)
+        url = self.list_url([self.user.id])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response["ETag"] == etag
+
+        filtered = self.client.get(url, {"ordering": "-id"}, HTTP_IF_NONE_MATCH=etag)
+        assert filtered.status_code == HTTPStatus.OK
+
+        other = self.create_task({"executor": self.user})
+        added = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert added.status_code == HTTPStatus.OK
+
+        etag = added["ETag"]
+        Task.objects.filter(pk=other.id).delete()
+        removed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert removed.status_code == HTTPStatus.OK
+        assert self.ids(removed.data["results"]) == [task.id]
+
+    def test_retrieve_answers_304_while_unchanged(self) -> None:
+        task = self.create_task({"executor": self.user})
+        self.client.force_login(self.user)
+        url = self.detail_url([self.user.id, task.id])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
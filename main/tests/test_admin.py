@@ -5,7 +5,7 @@ from django.db import models
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 
-from main.models import Tag, Task, User
+from main.models import OutboxMessage, SlowQuery, Tag, Task, User
 
 
 class TestAdmin(APITestCase):
@@ -52,3 +52,25 @@ class TestAdmin(APITestCase):
             executor=self.admin,
         )
         self.assert_forms(Task, task.id)
+
+    def test_outbox_message(self) -> None:
+        task = Task.objects.create(
+            name="Test",
+            description="Some description",
+            author=self.admin,
+            executor=self.admin,
+        )
+        message = OutboxMessage.objects.create(
+            kind=OutboxMessage.Kind.ASSIGN, task=task, recipient=self.admin
+        )
+        self.assert_forms(OutboxMessage, message.id)
+
+    def test_slow_query(self) -> None:
+        query = SlowQuery.objects.create(
+            fingerprint="0" * 32,
+            sql="SELECT ?",
+            duration_ms=750,
+            view="TaskViewSet.list",
+            plan="Result",
+        )
+        self.assert_forms(SlowQuery, query.id, check_actions=("changelist", "change"))
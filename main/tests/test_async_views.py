@@ -0,0 +1,174 @@
+import asyncio
+import json
+import tempfile
+from http import HTTPStatus
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import resolve, reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from main.models import RequestProfile, Tag, Task, User
+from main.views import TaskViewSet
+from main.services.metrics import collect
+from main.services.profiling import make_token
+from .factories import UserFactory
+
+
+class TestAsyncReadViews(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = UserFactory.create(avatar_picture=None)
+        cls.tag = Tag.objects.create(name="urgent")
+        cls.task = Task.objects.create(
+            name="task",
+            description="description",
+            author=cls.user,
+            executor=cls.user,
+        )
+        cls.task.tags.add(cls.tag)
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.headers = {"authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def get(self, path: str, data: dict = None, **headers: str):
+        return await self.async_client.get(
+            path, data, headers={**self.headers, **headers}
+        )
+
+    def test_read_routes_are_coroutines(self) -> None:
+        detail = reverse("tasks-detail", args=[self.task.id])
+
+        assert iscoroutinefunction(resolve(reverse("tasks-list")).func)
+        assert iscoroutinefunction(resolve(detail).func)
+        assert iscoroutinefunction(resolve(reverse("current_user-list")).func)
+        assert not iscoroutinefunction(resolve(reverse("tasks-export")).func)
+
+    async def test_list(self) -> None:
+        response = await self.get(
+            reverse("tasks-list"), {"expand": "author", "fields": "id,tags"}
+        )
+
+        assert response.status_code == HTTPStatus.OK, response.content
+        [item] = response.json()["results"]
+        assert item["id"] == self.task.id
+        assert item["tags"] == [self.tag.id]
+        assert item["author"]["username"] == self.user.username
+
+    async def test_nested_list(self) -> None:
+        url = reverse("user_tasks-list", args=[self.user.id])
+
+        response = await self.get(url)
+
+        assert response.status_code == HTTPStatus.OK, response.content
+        assert [item["id"] for item in response.json()["results"]] == [self.task.id]
+
+    async def test_retrieve(self) -> None:
+        url = reverse("tasks-detail", args=[self.task.id])
+
+        response = await self.get(url)
+        assert response.status_code == HTTPStatus.OK, response.content
+        assert response.json()["tags"] == [self.tag.id]
+
+        response = await self.get(url, if_none_match=response["ETag"])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        missing = reverse("tasks-detail", args=[self.task.id + 1])
+        assert (await self.get(missing)).status_code == 404
+
+    async def test_current_user(self) -> None:
+        response = await self.get(reverse("current_user-list"))
+
+        assert response.status_code == HTTPStatus.OK, response.content
+        assert response.json()["username"] == self.user.username
+        assert response["ETag"]
+
+    async def test_cached_tags(self) -> None:
+        url = reverse("tags-list")
+
+        first = await self.get(url)
+        await Tag.objects.filter(pk=self.tag.pk).aupdate(name="renamed")
+        second = await self.get(url)
+
+        assert first.status_code == HTTPStatus.OK, first.content
+        assert second.json() == first.json() == [{"id": self.tag.id, "name": "urgent"}]
+
+    async def test_writes_still_run(self) -> None:
+        response = await self.async_client.post(
+            reverse("tags-list"),
+            {"name": "new"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+
+        assert response.status_code == HTTPStatus.CREATED, response.content
+        assert await Tag.objects.filter(name="new").aexists()
+
+    async def test_requires_an_active_user(self) -> None:
+        anonymous = await AsyncClient().get(reverse("tasks-list"))
+        assert anonymous.status_code == HTTPStatus.UNAUTHORIZED
+
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        response = await self.get(reverse("tasks-list"))
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response.json()["code"] == "user_inactive"
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    async def test_middleware_sees_the_queries(self) -> None:
+        with self.assertLogs("main.services.server_timing", "INFO"):
+            response = await self.get(reverse("tasks-list"))
+
+        assert response.status_code == HTTPStatus.OK, response.content
+        assert "db;dur=" in response["Server-Timing"]
+        assert '"3 queries"' in response["Server-Timing"]
+
+    async def test_profiled_requests_run_the_sync_view(self) -> None:
+        admin = await User.objects.acreate(username="admin", is_staff=True)
+
+        response = await self.get(reverse("tasks-list"), x_profile=make_token(admin))
+
+        assert response.status_code == HTTPStatus.OK, response.content
+        profile = await RequestProfile.objects.aget()
+        assert profile.view == "TaskViewSet.list"
+        assert "to_representation" in profile.stacks
+
+    @override_settings(ASYNC_VIEW_CONCURRENCY=2)
+    async def test_concurrent_views_are_bounded(self) -> None:
+        running, peak = 0, 0
+        alist = TaskViewSet.alist
+
+        async def slow_alist(view, request, *args, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return await alist(view, request, *args, **kwargs)
+
+        with mock.patch.object(TaskViewSet, "alist", slow_alist):
+            responses = await asyncio.gather(
+                *(self.get(reverse("tasks-list")) for _ in range(5))
+            )
+
+        assert [response.status_code for response in responses] == [200] * 5
+        assert peak == 2
+
+    async def test_export_streams_asynchronously(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        with override_settings(METRICS_DIR=directory.name):
+            response = await self.get(reverse("tasks-export"))
+            assert response.is_async
+            content = b"".join([chunk async for chunk in response.streaming_content])
+            metrics = collect()
+
+        [line] = content.splitlines()
+        assert json.loads(line)["id"] == self.task.id
+        labels = {"view": "TaskViewSet.export"}
+        key = json.dumps(["task_manager_response_size_bytes_sum", labels])
+        assert metrics[key] == len(content)
@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase
+
+from main.services.benchmark import (
+    ConcurrencyBenchmark,
+    EndpointBenchmark,
+    Sample,
+    compare,
+    get_cases,
+    select_cases,
+)
+from main.services.seed import seed
+from task_manager.asgi import application as asgi_application
+from task_manager.urls import router
+from task_manager.wsgi import application as wsgi_application
+
+
+class TestEndpointBenchmark(TransactionTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        seed(users=20, tags=10, tasks=200, seed=1)
+        self.sample = Sample.pick()
+
+    def test_cases_cover_every_get_route(self) -> None:
+        names = {case.name for case in get_cases(router.urls, self.sample)}
+
+        assert {
+            "users-list",
+            "users-detail",
+            "user_tasks-list",
+            "user_tasks-detail",
+            "tags-list",
+            "tags-detail",
+            "tasks-list",
+            "tasks-detail",
+            "tasks-export",
+            "task_tags-list",
+            "task_tags-detail",
+            "current_user-list",
+            "current_user-detail",
+            "tasks-list?state",
+            "tasks-list?search",
+            "users-list?username_similar",
+        } <= names
+        assert "tasks-import" not in names
+
+    def test_run(self) -> None:
+        cases = select_cases(get_cases(router.urls, self.sample), None)
+
+        with EndpointBenchmark(self.sample.user, requests=4, concurrency=2) as bench:
+            results = {case.name: bench.run(case) for case in cases}
+
+        for name, result in results.items():
+            assert result.errors == 0, name
+            assert result.requests == 4
+            assert 0 < result.p50_ms <= result.p95_ms <= result.p99_ms
+            assert result.queries >= 1
+            assert result.peak_memory_kb > 0
+
+    def test_concurrency(self) -> None:
+        benchmark = ConcurrencyBenchmark(
+            self.sample.user, clients=6, delay=0.01, threads=2
+        )
+
+        results = [
+            benchmark.wsgi(wsgi_application, "/api/tasks/"),
+            benchmark.asgi(asgi_application, "/api/tasks/"),
+        ]
+
+        assert [result.server for result in results] == ["wsgi", "asgi"]
+        for result in results:
+            assert result.errors == 0, result
+            assert result.clients == 6
+            assert 0 < result.p50_ms <= result.p95_ms <= result.p99_ms
+            assert result.requests_per_second > 0
+
+    def test_compare(self) -> None:
+        baseline = {
+            "tasks-list": {
+                "p95_ms": 10.0,
+                "peak_memory_kb": 100.0,
+                "queries": 3,
+                "errors": 0,
+            }
+        }
+
+        within = {"tasks-list": {**baseline["tasks-list"], "p95_ms": 12.0}}
+        slower = {"tasks-list": {**baseline["tasks-list"], "p95_ms": 13.0}}
+        more_queries = {"tasks-list": {**baseline["tasks-list"], "queries": 4}}
+        failing = {"tasks-new": {**baseline["tasks-list"], "errors": 1}}
+
+        assert compare(within, baseline, threshold=0.25) == []
+        assert compare(slower, baseline, threshold=0.25) == [
+            "tasks-list: p95_ms 10.0 -> 13.0"
+        ]
+        assert compare(more_queries, baseline, threshold=0.25) == [
+            "tasks-list: queries 3 -> 4"
+        ]
+        assert compare(failing, baseline, threshold=0.25) == [
+            "tasks-new: 1 failed requests"
+        ]
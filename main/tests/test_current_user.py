@@ -1,3 +1,5 @@
+from http import HTTPStatus
+
 from .base import TestViewSetBase
 
 
@@ -27,3 +29,20 @@ class TestUserViewSet(TestViewSetBase):
 
         user = self.single_resource()
         assert user["first_name"] == "TestName"
+
+    def test_answers_304_while_unchanged(self):
+        response = self.request_single_resource()
+        etag = response["ETag"]
+
+        unchanged = self.client.get(self.list_url(), HTTP_IF_NONE_MATCH=etag)
+        assert unchanged.status_code == HTTPStatus.NOT_MODIFIED
+
+        self.patch_single_resource({"first_name": "TestName"})
+        changed = self.client.get(self.list_url(), HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == HTTPStatus.OK
+        assert changed.data["first_name"] == "TestName"
+
+    def test_fields(self):
+        user = self.single_resource({"fields": "id,username"})
+
+        assert user == {"id": self.user.id, "username": self.user.username}
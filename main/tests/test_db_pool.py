@@ -0,0 +1,121 @@
+import json
+import tempfile
+import time
+
+import psycopg2
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from main.db.base import DatabaseWrapper
+from main.services.db_pool import ConnectionPool, PoolTimeout
+from main.services.metrics import collect
+
+
+class TestConnectionPool(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(METRICS_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.opened = []
+
+    def connect(self):
+        self.opened.append(psycopg2.connect(**connection.get_connection_params()))
+        return self.opened[-1]
+
+    def make_pool(self, **options) -> ConnectionPool:
+        pool = ConnectionPool(self.connect, name="test", **options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def metric(self, name: str, **labels: str) -> float:
+        return collect().get(json.dumps([name, {"pool": "test", **labels}]), 0)
+
+    def test_connections_are_reused_up_to_max_size(self) -> None:
+        pool = self.make_pool(min_size=0, max_size=2, timeout=0.05)
+
+        first = pool.getconn()
+        second = pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        pool.putconn(first)
+        assert self.metric("task_manager_db_pool_connections") == 2
+        assert self.metric("task_manager_db_pool_idle_connections") == 1
+
+        assert pool.getconn() is first
+        assert len(self.opened) == 2
+        assert self.metric("task_manager_db_pool_timeouts_total") == 1
+        assert self.metric("task_manager_db_pool_wait_seconds_count") == 3
+        assert self.metric("task_manager_db_pool_idle_connections") == 0
+        pool.putconn(second)
+
+    def test_min_size_is_opened_in_the_background(self) -> None:
+        pool = self.make_pool(min_size=2, max_size=3)
+
+        deadline = time.monotonic() + 5
+        while len(pool.idle) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(pool.idle) == 2
+        assert pool.getconn() in self.opened
+
+    def test_broken_and_old_connections_are_replaced(self) -> None:
+        pool = self.make_pool(
+            min_size=0, max_size=1, check=ConnectionPool.check_connection
+        )
+        broken = pool.getconn()
+        pool.putconn(broken)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_terminate_backend(%s)", [broken.get_backend_pid()]
+            )
+
+        replacement = pool.getconn()
+        assert replacement is not broken
+        assert broken.closed
+
+        pool.max_lifetime = 0
+        pool.putconn(replacement)
+        assert replacement.closed
+        assert pool.size == 0
+        assert self.metric("task_manager_db_pool_connections") == 0
+
+    def test_returned_transactions_are_rolled_back(self) -> None:
+        pool = self.make_pool(min_size=0, max_size=1)
+        lent = pool.getconn()
+        with lent.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE pooled (id int)")
+
+        pool.putconn(lent)
+
+        with pool.getconn().cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pooled')")
+            assert cursor.fetchone() == (None,)
+
+
+class TestPooledBackend(TestCase):
+    def test_closing_returns_the_connection(self) -> None:
+        options = {"application_name": "pooled", "pool": {"min_size": 0, "max_size": 1}}
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, "CONN_MAX_AGE": 0, "OPTIONS": options}
+        )
+
+        wrapper.ensure_connection()
+        first, pool = wrapper.connection, wrapper.connection_pool
+        self.addCleanup(pool.close)
+        wrapper.close()
+        wrapper.ensure_connection()
+
+        assert wrapper.connection is first
+        assert not first.closed
+        wrapper.close()
+        assert wrapper.connection is None
+
+        unpooled = wrapper.get_unpooled_connection(wrapper.get_connection_params())
+        assert unpooled is not first
+        unpooled.close()
+
+        pool.close()
+        assert first.closed
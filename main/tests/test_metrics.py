@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+
+from main.services.metrics import MmapDict, collect, get_store
+from .base import TestViewSetBase
+
+
+class TestMetrics(TestViewSetBase):
+    basename = "tasks"
+
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(METRICS_DIR=self.directory, METRICS_TOKEN="")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def scrape(self, **headers: str) -> str:
+        response = self.client.get(reverse("metrics"), **headers)
+        assert response.status_code == 200, response.content
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        return response.content.decode()
+
+    def test_requests_are_labelled_by_action(self) -> None:
+        self.create_task()
+        self.list()
+        self.list()
+
+        text = self.scrape()
+
+        labels = 'view="TaskViewSet.list"'
+        assert (
+            f'task_manager_requests_total{{{labels},method="GET",status="200"}} 2.0'
+            in text
+        )
+        assert f"task_manager_request_duration_seconds_count{{{labels}}} 2.0" in text
+        assert (
+            f'task_manager_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2.0'
+            in text
+        )
+        assert f'task_manager_request_queries_bucket{{{labels},le="5.0"}} 2.0' in text
+        assert f"task_manager_request_queries_sum{{{labels}}} 8.0" in text
+        assert f"task_manager_request_db_seconds_count{{{labels}}} 2.0" in text
+        assert f"task_manager_response_size_bytes_count{{{labels}}} 2.0" in text
+        assert "# TYPE task_manager_request_duration_seconds histogram" in text
+
+    def test_streamed_size_is_counted(self) -> None:
+        self.create_task()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("tasks-export"), {"format": "csv"})
+        size = len(b"".join(response.streaming_content))
+
+        text = self.scrape()
+
+        assert (
+            f'task_manager_response_size_bytes_sum{{view="TaskViewSet.export"}} '
+            f"{float(size)}" in text
+        )
+
+    def test_files_of_all_processes_are_summed(self) -> None:
+        other = MmapDict(os.path.join(self.directory, "1.db"))
+        other.increment('["task_manager_requests_total", {"view": "x"}]', 3)
+        self.list()
+        other.increment('["task_manager_requests_total", {"view": "x"}]', 4)
+
+        values = collect()
+
+        assert values['["task_manager_requests_total", {"view": "x"}]'] == 7
+        assert any("TaskViewSet.list" in key for key in values)
+
+    def test_gauges_of_exited_processes_are_dropped(self) -> None:
+        exited = subprocess.Popen([sys.executable, "-c", ""])
+        exited.wait()
+        path = os.path.join(self.directory, f"live-{exited.pid}.db")
+        MmapDict(path).set('["gauge", {}]', 3)
+        MmapDict(os.path.join(self.directory, f"{exited.pid}.db")).set("count", 2)
+        get_store(live=True).set('["gauge", {}]', 4)
+
+        values = collect()
+
+        assert values['["gauge", {}]'] == 4
+        assert values["count"] == 2
+        assert not os.path.exists(path)
+
+    def test_file_grows_and_reopens(self) -> None:
+        path = os.path.join(self.directory, "2.db")
+        store = MmapDict(path)
+        for number in range(3000):
+            store.increment(f"key-{number}", number)
+        store.increment("key-7", 0.5)
+
+        values = dict(MmapDict.read(path))
+        reopened = MmapDict(path)
+        reopened.increment("key-2999", 1)
+
+        assert os.path.getsize(path) > MmapDict.initial_size
+        assert len(values) == 3000
+        assert values["key-7"] == 7.5
+        assert dict(MmapDict.read(path))["key-2999"] == 3000
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_is_required_when_set(self) -> None:
+        response = self.client.get(reverse("metrics"))
+        assert response.status_code == 401
+
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer x")
+        assert response.status_code == 401
+
+        assert "task_manager_requests_total" in self.scrape(
+            HTTP_AUTHORIZATION="Bearer secret"
+        )
+
+    @override_settings(DJANGO_ENV="production")
+    def test_token_is_required_outside_dev(self) -> None:
+        response = self.client.get(reverse("metrics"))
+        assert response.status_code == 401
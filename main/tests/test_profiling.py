@@ -0,0 +1,114 @@
+import sys
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from main.models import RequestProfile
+from main.views import TaskViewSet
+from main.services.profiling import collapse, make_token
+from .base import TestViewSetBase
+
+
+class TestProfiling(TestViewSetBase):
+    basename = "tasks"
+    # Saving the profile runs queries inside the profiled request.
+    client_class = APIClient
+
+    def test_staff_token_profiles_the_request(self) -> None:
+        self.create_task()
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            self.list_url(), HTTP_X_PROFILE=make_token(self.admin)
+        )
+
+        assert response.status_code == 200
+        profile = RequestProfile.objects.get()
+        assert profile.view == "TaskViewSet.list"
+        assert profile.trigger == RequestProfile.Trigger.TOKEN
+        assert profile.status == 200
+        totals = [row["total_s"] for row in profile.hotspots]
+        assert totals == sorted(totals, reverse=True)
+        assert "to_representation" in profile.stacks
+        stack, microseconds = profile.stacks.splitlines()[0].rsplit(" ", 1)
+        assert int(microseconds) > 0 and stack
+
+    def test_query_flag_is_accepted(self) -> None:
+        self.client.force_login(self.user)
+        token = make_token(self.admin)
+
+        self.client.get(self.list_url(), {"profile": token, "state": "new_task"})
+
+        assert RequestProfile.objects.get().path == "/api/tasks/?state=new_task"
+
+    def test_token_of_non_staff_or_forged_is_ignored(self) -> None:
+        self.client.force_login(self.user)
+
+        self.client.get(self.list_url(), HTTP_X_PROFILE=make_token(self.user))
+        self.client.get(self.list_url(), HTTP_X_PROFILE="forged")
+
+        assert not RequestProfile.objects.exists()
+
+    @override_settings(PROFILE_SAMPLE_RATE=1, PROFILE_LOG_SIZE=2)
+    def test_sampled_profiles_are_a_ring_buffer(self) -> None:
+        self.client.force_login(self.user)
+        for _ in range(3):
+            self.client.get(self.list_url())
+
+        profiles = RequestProfile.objects.order_by("id")
+        assert [profile.trigger for profile in profiles] == ["sample", "sample"]
+
+    def test_view_errors_reach_the_exception_middleware(self) -> None:
+        self.client.force_login(self.user)
+        self.client.raise_request_exception = False
+        process_exception = mock.patch(
+            "rollbar.contrib.django.middleware."
+            "RollbarNotifierMiddleware.process_exception",
+            return_value=None,
+        )
+
+        with process_exception as reported, mock.patch.object(
+            TaskViewSet, "get_queryset", side_effect=RuntimeError("broken")
+        ):
+            response = self.client.get(
+                self.list_url(), HTTP_X_PROFILE=make_token(self.admin)
+            )
+
+        assert response.status_code == 500
+        [(_, error)] = [call.args for call in reported.call_args_list]
+        assert str(error) == "broken"
+        assert RequestProfile.objects.get().status == 500
+        assert sys.getprofile() is None
+
+    def test_collapse_splits_time_between_callees(self) -> None:
+        root, child, leaf = ("a.py", 1, "root"), ("a.py", 2, "child"), ("~", 0, "len")
+        stats = {
+            root: (1, 1, 0.001, 0.004, {}),
+            child: (2, 2, 0.001, 0.003, {root: (2, 2, 0.001, 0.003)}),
+            leaf: (2, 2, 0.002, 0.002, {child: (2, 2, 0.002, 0.002)}),
+        }
+
+        assert collapse(stats).splitlines() == [
+            "root (a.py:1) 1000",
+            "root (a.py:1);child (a.py:2) 1000",
+            "root (a.py:1);child (a.py:2);len 2000",
+        ]
+
+    def test_admin_pages(self) -> None:
+        self.client.force_login(self.admin)
+        self.client.get(self.list_url(), HTTP_X_PROFILE=make_token(self.admin))
+        profile = RequestProfile.objects.get()
+
+        changelist = self.client.get(reverse("admin:main_requestprofile_changelist"))
+        change = self.client.get(
+            reverse("admin:main_requestprofile_change", args=[profile.id])
+        )
+        stacks = self.client.get(
+            reverse("admin:main_requestprofile_stacks", args=[profile.id])
+        )
+
+        assert "X-Profile: " in changelist.content.decode()
+        assert "Hotspots" in change.content.decode()
+        assert stacks.content.decode() == profile.stacks
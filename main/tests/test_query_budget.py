@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from main.views import TaskViewSet
+from task_manager.urls import router
+from .base import TestViewSetBase
+
+
+class TestQueryBudget(TestViewSetBase):
+    basename = "tasks"
+
+    def test_every_action_declares_a_budget(self) -> None:
+        for pattern in router.urls:
+            view = pattern.callback
+            for action in view.actions.values():
+                assert action in view.cls.query_budgets, (view.cls.__name__, action)
+
+    def test_exceeded_budget_fails_with_queries(self) -> None:
+        self.create_task()
+
+        with mock.patch.object(TaskViewSet, "query_budgets", {"list": 1}):
+            with self.assertRaisesRegex(
+                AssertionError, "TaskViewSet.list ran"
+            ) as error:
+                self.list()
+
+        assert "1. SELECT" in str(error.exception)
+
+    def test_undeclared_action_fails(self) -> None:
+        with mock.patch.object(TaskViewSet, "query_budgets", {}):
+            with self.assertRaisesRegex(AssertionError, "declares no query budget"):
+                self.list()
+
+    @override_settings(QUERY_BUDGET_SAMPLE_RATE=1)
+    def test_middleware_logs_exceeded_budget(self) -> None:
+        task = self.create_task()
+        # A plain client: the budget client would fail the request itself.
+        client = APIClient()
+        client.force_login(self.user)
+
+        with mock.patch.object(TaskViewSet, "query_budgets", {"retrieve": 1}):
+            with self.assertLogs("main.services.query_budget", "WARNING") as logs:
+                response = client.get(self.detail_url(task.id))
+
+        assert response.status_code == 200
+        assert "TaskViewSet.retrieve ran 5 queries, budget 1" in logs.output[0]
+        assert "5. SELECT" in logs.output[0]
+
+    @override_settings(QUERY_BUDGET_SAMPLE_RATE=0)
+    def test_middleware_skips_unsampled_requests(self) -> None:
+        task = self.create_task()
+        client = APIClient()
+        client.force_login(self.user)
+
+        with mock.patch.object(TaskViewSet, "query_budgets", {"retrieve": 1}):
+            with self.assertNoLogs("main.services.query_budget", "WARNING"):
+                client.get(self.detail_url(task.id))
@@ -0,0 +1,175 @@
+import json
+from datetime import timedelta
+from itertools import cycle
+from typing import Iterator, List
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from main.models import Tag, Task, TaskTombstone, User
+from main.services.changes import after
+from main.views import TaskFilter, TaskPagination, UserFilter
+
+
+class TestTaskQueryPlans(TestCase):
+    users_count = 2000
+    tasks_count = 2000
+    executors: List[User]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        super().setUpTestData()
+        users = User.objects.bulk_create(
+            User(username=f"user{i}", email=f"user{i}@test.com")
+            for i in range(cls.users_count)
+        )
+        cls.executors = users[:20]
+        tags = Tag.objects.bulk_create(Tag(name=f"tag{i}") for i in range(20))
+        now = timezone.now()
+        states = cycle(Task.State.values)
+        executors = cycle(cls.executors)
+        tasks = Task.objects.bulk_create(
+            Task(
+                name=f"task {i}",
+                description="Some task description",
+                author=cls.executors[0],
+                executor=next(executors),
+                state=next(states),
+                priority=i % 10,
+                deadline=now + timedelta(hours=i) if i % 2 else None,
+            )
+            for i in range(cls.tasks_count)
+        )
+        Task.tags.through.objects.bulk_create(
+            Task.tags.through(task_id=task.id, tag_id=tags[i % len(tags)].id)
+            for i, task in enumerate(tasks)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE main_user, main_tag, main_task, main_task_tags")
+
+    def setUp(self) -> None:
+        super().setUp()
+        # Seeded tables are small; forbid sequential scans so the planner
+        # only falls back to them when no index can serve the query.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    @classmethod
+    def plan_nodes(cls, plan: dict) -> Iterator[dict]:
+        yield plan
+        for child in plan.get("Plans", ()):
+            yield from cls.plan_nodes(child)
+
+    def explain(self, queryset: QuerySet) -> List[dict]:
+        plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+        return list(self.plan_nodes(plan))
+
+    def assert_no_seq_scan(self, queryset: QuerySet) -> List[dict]:
+        nodes = self.explain(queryset)
+        seq_scans = [
+            node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"
+        ]
+        assert not seq_scans, f"Sequential scan on {seq_scans}"
+        return nodes
+
+    def assert_uses_index(self, queryset: QuerySet, index: str) -> None:
+        nodes = self.assert_no_seq_scan(queryset)
+        used = [node.get("Index Name") for node in nodes]
+        assert index in used, f"{index} is not used: {used}"
+
+    def assert_index_cond(self, queryset: QuerySet, column: str) -> None:
+        nodes = self.assert_no_seq_scan(queryset)
+        conds = [node.get("Index Cond", "") for node in nodes]
+        assert any(column in cond for cond in conds), f"No index lookup: {conds}"
+
+    def assert_index_order(self, queryset: QuerySet) -> None:
+        nodes = self.assert_no_seq_scan(queryset)
+        sorts = [node["Node Type"] for node in nodes if "Sort" in node["Node Type"]]
+        assert not sorts, f"Rows are not read in index order: {sorts}"
+
+    @staticmethod
+    def filtered(query: dict, ordering: tuple = ("id",)) -> QuerySet:
+        return TaskFilter(query, queryset=Task.objects.order_by(*ordering)).qs
+
+    def test_user_tasks(self) -> None:
+        queryset = Task.objects.filter(executor=self.executors[1]).order_by("id")
+
+        self.assert_uses_index(queryset[:100], "task_executor_id_idx")
+
+    def test_filter_state(self) -> None:
+        queryset = self.filtered({"state": "IN_QA"}).order_by()
+
+        self.assert_index_cond(queryset, "state")
+
+    def test_filter_state_by_deadline(self) -> None:
+        queryset = self.filtered({"state": "in_qa"}, ("deadline", "id"))[:100]
+
+        self.assert_index_order(queryset)
+
+    def test_filter_active_by_deadline(self) -> None:
+        queryset = self.filtered({"active": True}, ("deadline", "id"))[:100]
+
+        self.assert_uses_index(queryset, "task_active_deadline_idx")
+
+    def test_executor_board(self) -> None:
+        queryset = Task.objects.filter(
+            executor=self.executors[1], state=Task.State.IN_DEV
+        ).order_by("priority")
+
+        self.assert_uses_index(queryset, "task_executor_state_idx")
+
+    def test_filter_tags(self) -> None:
+        self.assert_no_seq_scan(self.filtered({"tags": "tag3,tag4"})[:100])
+
+    def test_filter_username(self) -> None:
+        queryset = UserFilter({"username": "SER1234"}, queryset=User.objects.all()).qs
+
+        self.assert_index_cond(queryset, "username")
+
+    def test_filter_username_similar(self) -> None:
+        queryset = UserFilter(
+            {"username_similar": "user1234"}, queryset=User.objects.all()
+        ).qs
+
+        self.assert_index_cond(queryset, "username")
+
+    def test_filter_executor(self) -> None:
+        for query in ({"executor": "SER1234"}, {"author": "SER1234"}):
+            with self.subTest(query=query):
+                self.assert_no_seq_scan(self.filtered(query)[:100])
+
+    def test_search(self) -> None:
+        queryset = self.filtered({"search": "task 12"})
+
+        self.assert_index_cond(queryset, "search_vector")
+
+    def test_keyset_page(self) -> None:
+        boundary = Task.objects.exclude(deadline=None).order_by("id")[500]
+        paginator = TaskPagination()
+        for ordering in ("deadline", "-deadline", "priority", "-updated_at"):
+            with self.subTest(ordering=ordering):
+                paginator.field = ordering.lstrip("-")
+                paginator.descending = ordering.startswith("-")
+                position = paginator.get_position(boundary)
+                queryset = Task.objects.filter(
+                    paginator.seek(position, backwards=False)
+                ).order_by(*paginator.get_order_by(reverse=False))
+
+                self.assert_index_order(queryset[:101])
+
+    def test_change_feed(self) -> None:
+        boundary = Task.objects.order_by("updated_at", "id")[500]
+        position = (boundary.updated_at, boundary.id)
+        tasks = Task.objects.filter(
+            after("updated_at", "id", position), updated_at__lt=timezone.now()
+        ).order_by("updated_at", "id")[:101]
+        tombstones = TaskTombstone.objects.filter(
+            after("deleted_at", "task_id", position)
+        ).order_by("deleted_at", "task_id")[:101]
+
+        self.assert_uses_index(tasks, "task_updated_at_id_idx")
+        self.assert_index_cond(tasks, "updated_at")
+        self.assert_index_order(tasks)
+        self.assert_uses_index(tombstones, "task_tombstone_deleted_idx")
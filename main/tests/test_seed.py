@@ -0,0 +1,71 @@
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from main.models import Tag, Task, User
+
+
+class TestSeed(TestCase):
+    def seed(self, prefix: str, seed: int = 7) -> None:
+        call_command(
+            "seed",
+            users=50,
+            tags=20,
+            tasks=1000,
+            seed=seed,
+            prefix=prefix,
+            batch_size=300,
+            stdout=StringIO(),
+        )
+
+    def snapshot(self, prefix: str) -> list:
+        tasks = Task.objects.filter(author__username__startswith=prefix).order_by("id")
+        return [
+            (
+                task.name,
+                task.state,
+                task.priority,
+                task.deadline,
+                task.executor.username.removeprefix(prefix),
+                sorted(tag.name.removeprefix(prefix) for tag in task.tags.all()),
+            )
+            for task in tasks.select_related("executor").prefetch_related("tags")
+        ]
+
+    def test_counts(self) -> None:
+        self.seed("a")
+
+        assert User.objects.filter(username__startswith="a").count() == 50
+        assert Tag.objects.filter(name__startswith="a-tag-").count() == 20
+        assert Task.objects.count() == 1000
+        assert Task.objects.filter(search_vector__isnull=True).count() == 0
+
+    def test_is_repeatable(self) -> None:
+        self.seed("a")
+        self.seed("b")
+        self.seed("c", seed=8)
+
+        assert self.snapshot("a") == self.snapshot("b")
+        assert self.snapshot("a") != self.snapshot("c")
+
+    def test_distributions(self) -> None:
+        self.seed("a")
+
+        load = sorted(
+            User.objects.annotate(tasks=Count("tasks_to_do")).values_list(
+                "tasks", flat=True
+            ),
+            reverse=True,
+        )
+        assert load[0] > 10 * load[len(load) // 2]
+        popularity = sorted(
+            Tag.objects.annotate(tasks=Count("task")).values_list("tasks", flat=True),
+            reverse=True,
+        )
+        assert popularity[0] > 5 * popularity[-1]
+        states = Counter(Task.objects.values_list("state", flat=True))
+        assert set(states) == set(Task.State.values)
+        assert states[Task.State.RELEASED] > states[Task.State.FOR_RELEASE]
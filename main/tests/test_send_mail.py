@@ -1,13 +1,28 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
 from unittest.mock import patch, MagicMock
 
 from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import connection
 from django.template.loader import render_to_string
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from freezegun import freeze_time
 
-from main.models import Task
-from main.services.mail import send_assign_notification
-from main.tests.base import TestViewSetBase, merge
+from main.models import OutboxMessage, Task
+from main.services.mail import (
+    enqueue_assign_notifications,
+    send_assign_notification,
+    send_outbox_batch,
+)
+from main.tests.base import CURRENT_TIME, TestViewSetBase, merge
 
 from .factories import UserFactory
+from .smtp import LocalSMTPServer
 
 
 class TestSendEmail(TestViewSetBase):
@@ -53,3 +68,154 @@ class TestSendEmail(TestViewSetBase):
                 context={"task": Task.objects.get(pk=task["id"])},
             ),
         )
+
+    def outbox_messages(self) -> list:
+        return list(
+            OutboxMessage.objects.order_by("id").values_list("task_id", "recipient_id")
+        )
+
+    def test_assignment_writes_outbox(self) -> None:
+        assignee = self.create_user()
+
+        task = self.create_task({"executor": assignee.id})
+
+        assert self.outbox_messages() == [(task["id"], assignee.id)]
+        assert mail.outbox == []
+
+    def test_reassignment_writes_outbox(self) -> None:
+        assignee = self.create_user()
+        task = self.create_task()
+
+        self.partial_update(task["id"], {"name": "renamed"})
+        self.partial_update(task["id"], {"executor": assignee.id})
+
+        assert self.outbox_messages() == [
+            (task["id"], self.user.id),
+            (task["id"], assignee.id),
+        ]
+
+    def test_send_outbox_batch(self) -> None:
+        assignee = self.create_user()
+        task = self.create_task({"executor": assignee.id})
+
+        assert send_outbox_batch() == 1
+        assert send_outbox_batch() == 0
+
+        message = OutboxMessage.objects.get()
+        assert message.status == OutboxMessage.Status.SENT
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [assignee.email]
+        assert mail.outbox[0].alternatives[0][0] == render_to_string(
+            "emails/notification.html",
+            context={"task": Task.objects.get(pk=task["id"])},
+        )
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_DELAY=60)
+    @patch.object(locmem.EmailBackend, "send_messages")
+    def test_send_outbox_retries(self, fake_sender: MagicMock) -> None:
+        fake_sender.side_effect = SMTPException("unavailable")
+
+        with freeze_time(CURRENT_TIME) as frozen_time:
+            self.create_task()
+            assert send_outbox_batch() == 1
+            message = OutboxMessage.objects.get()
+            assert message.status == OutboxMessage.Status.PENDING
+            assert message.attempts == 1
+            assert message.available_at == timezone.now() + timedelta(seconds=60)
+            assert send_outbox_batch() == 0
+
+            frozen_time.tick(timedelta(seconds=60))
+            assert send_outbox_batch() == 1
+
+        message.refresh_from_db()
+        assert message.status == OutboxMessage.Status.FAILED
+        assert message.attempts == 2
+        assert "unavailable" in message.last_error
+
+    def test_send_outbox_over_smtp(self) -> None:
+        for _ in range(3):
+            self.create_task()
+
+        with LocalSMTPServer() as server, override_settings(**server.email_settings):
+            call_command("send_outbox", workers=1, once=True, stdout=StringIO())
+
+        assert len(server.messages) == 3
+        assert server.connections == 1
+        assert not OutboxMessage.objects.exclude(status=OutboxMessage.Status.SENT)
+
+
+class TestOutboxWorkers(TransactionTestCase):
+    def test_workers_deliver_each_message_once(self) -> None:
+        user = UserFactory.create()
+        for i in range(30):
+            task = Task.objects.create(
+                name=f"task {i}", description="", author=user, executor=user
+            )
+            enqueue_assign_notifications([task])
+
+        with LocalSMTPServer() as server, override_settings(**server.email_settings):
+            call_command(
+                "send_outbox", workers=3, batch_size=5, once=True, stdout=StringIO()
+            )
+
+        assert len(server.messages) == 30
+        sent = OutboxMessage.objects.filter(status=OutboxMessage.Status.SENT)
+        assert sent.count() == 30
+
+
+@override_settings(OUTBOX_DIGEST_WINDOW=300)
+class TestOutboxDigest(TestViewSetBase):
+    def assign(self, executor, count: int = 1) -> list:
+        tasks = [
+            self.create_task({"name": f"task {i}", "executor": executor})
+            for i in range(count)
+        ]
+        enqueue_assign_notifications(tasks)
+        return tasks
+
+    def test_digest(self) -> None:
+        developer = UserFactory.create()
+        with freeze_time(CURRENT_TIME) as frozen_time:
+            tasks = self.assign(developer, 3)
+            self.assign(self.user)
+
+            frozen_time.tick(timedelta(seconds=299))
+            assert send_outbox_batch() == 0
+
+            frozen_time.tick(timedelta(seconds=1))
+            assert send_outbox_batch() == 4
+
+        emails = {email.to[0]: email for email in mail.outbox}
+        digest, single = emails[developer.email], emails[self.user.email]
+        assert digest.subject == "You've assigned 3 tasks."
+        assert digest.alternatives[0][0] == render_to_string(
+            "emails/digest.html", context={"tasks": tasks}
+        )
+        assert single.subject == "You've assigned a task."
+
+    def test_digest_skips_reassigned_tasks(self) -> None:
+        developer = UserFactory.create()
+        with freeze_time(CURRENT_TIME) as frozen_time:
+            task, other = self.assign(developer, 2)
+            task.executor = self.user
+            task.save()
+            enqueue_assign_notifications([task])
+
+            frozen_time.tick(timedelta(seconds=300))
+            assert send_outbox_batch() == 3
+
+        assert sorted(email.to[0] for email in mail.outbox) == sorted(
+            [developer.email, self.user.email]
+        )
+        assert not OutboxMessage.objects.exclude(status=OutboxMessage.Status.SENT)
+
+    def test_digest_queries_do_not_grow(self) -> None:
+        def count_queries(count: int) -> int:
+            with freeze_time(CURRENT_TIME) as frozen_time:
+                self.assign(UserFactory.create(), count)
+                frozen_time.tick(timedelta(seconds=300))
+                with CaptureQueriesContext(connection) as queries:
+                    assert send_outbox_batch() == count
+            return len(queries)
+
+        assert count_queries(2) == count_queries(20)
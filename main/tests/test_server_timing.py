@@ -0,0 +1,52 @@
+import json
+
+from django.test import override_settings
+
+from .base import TestViewSetBase
+
+
+class TestServerTiming(TestViewSetBase):
+    basename = "tasks"
+
+    @staticmethod
+    def metrics(header: str) -> dict:
+        metrics = {}
+        for metric in header.split(", "):
+            name, *params = metric.split(";")
+            metrics[name] = dict(param.split("=", 1) for param in params)
+        return metrics
+
+    def test_header_is_off_by_default(self) -> None:
+        self.client.force_login(self.user)
+        response = self.client.get(self.list_url())
+
+        assert "Server-Timing" not in response
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_list_reports_every_phase(self) -> None:
+        self.create_task()
+        self.client.force_login(self.user)
+
+        with self.assertLogs("main.services.server_timing", "INFO") as logs:
+            response = self.client.get(self.list_url())
+
+        metrics = self.metrics(response["Server-Timing"])
+        assert list(metrics) == ["auth", "db", "serialize", "render", "total"]
+        assert metrics["db"]["desc"] == '"4 queries"'
+        assert all(float(metric["dur"]) >= 0 for metric in metrics.values())
+        record = json.loads(logs.records[0].getMessage())
+        assert record["view"] == "TaskViewSet.list"
+        assert record["status"] == 200
+        assert record["queries"] == 4
+        assert record["total_ms"] >= record["db_ms"]
+        assert logs.records[0].server_timing == record
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_retrieve_times_the_serializer(self) -> None:
+        task = self.create_task()
+        self.client.force_login(self.user)
+
+        with self.assertLogs("main.services.server_timing", "INFO"):
+            response = self.client.get(self.detail_url(task.id))
+
+        assert "serialize" in self.metrics(response["Server-Timing"])
@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from main.models import SlowQuery, Task
+from main.services.slow_queries import PendingQuery, get_plan, normalize
+from .base import TestViewSetBase
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0.001, SLOW_QUERY_SAMPLE_RATE=1)
+class TestSlowQueries(TestViewSetBase):
+    basename = "tasks"
+    # Explaining runs once the request finishes, inside the client call, so
+    # it would count against the query budgets.
+    client_class = APIClient
+
+    def test_normalize(self) -> None:
+        sql = """SELECT * FROM "main_task"
+            WHERE "state" = 'new_task' AND "id" IN (%s, %s, %s) LIMIT 21"""
+
+        assert normalize(sql) == (
+            'SELECT * FROM "main_task" WHERE "state" = ? AND "id" IN (...) LIMIT ?'
+        )
+
+    def test_slow_statements_are_explained(self) -> None:
+        self.create_task()
+        self.list({"state": "new_task"})
+
+        recorded = SlowQuery.objects.get(sql__contains='FROM "main_task"')
+        assert recorded.view == "TaskViewSet.list"
+        assert recorded.duration_ms > 0
+        assert "?" in recorded.sql and "%s" not in recorded.sql
+        assert "actual time=" in recorded.plan
+        assert "Buffers" in recorded.plan or "Planning" in recorded.plan
+
+    def test_writes_are_explained_without_running(self) -> None:
+        task = self.create_task()
+        query = PendingQuery(
+            'UPDATE "main_task" SET "name" = %s WHERE "id" = %s',
+            ("changed", task.id),
+            1.0,
+            "test",
+        )
+
+        plan = get_plan(query)
+
+        assert plan.startswith("Update on main_task")
+        assert "actual time=" not in plan
+        assert Task.objects.get(pk=task.id).name == "test task"
+
+    def test_volatile_reads_are_explained_without_running(self) -> None:
+        sequence = "pg_get_serial_sequence('main_task', 'id')"
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT last_value FROM main_task_id_seq")
+            before = cursor.fetchone()
+
+        for sql in (
+            f"SELECT nextval({sequence})",
+            'SELECT "id" FROM "main_task" FOR UPDATE',
+            'SELECT "id" FROM "main_task" FOR NO KEY UPDATE SKIP LOCKED',
+        ):
+            plan = get_plan(PendingQuery(sql, (), 1.0, "test"))
+
+            assert plan and "actual time=" not in plan, sql
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT last_value FROM main_task_id_seq")
+            assert cursor.fetchone() == before
+
+    @override_settings(SLOW_QUERY_LOG_SIZE=3)
+    def test_log_is_a_ring_buffer(self) -> None:
+        self.list()
+        self.list()
+
+        ids = list(SlowQuery.objects.values_list("id", flat=True))
+        assert len(ids) == 3
+        assert ids == list(range(ids[0], ids[0] + 3))
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_zero_threshold_turns_the_recorder_off(self) -> None:
+        self.list()
+
+        assert not SlowQuery.objects.exists()
+
+    def test_admin_lists_top_offenders(self) -> None:
+        self.create_task()
+        self.list()
+        self.client.force_login(self.admin)
+
+        response = self.client.get("/admin/main/slowquery/")
+
+        assert response.status_code == 200
+        assert response.context["offenders"][0]["calls"] >= 1
+        assert "TaskViewSet.list" in response.content.decode()
@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from main.models import Tag
@@ -84,3 +86,42 @@ class TestTagViewSet(TestViewSetBase):
         assert response.json() == {
             "detail": "You do not have permission to perform this action."
         }
+
+    def tag_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            self.list()
+        return sum("main_tag" in query["sql"] for query in queries)
+
+    def test_list_is_cached(self) -> None:
+        tag = self.create_tag()
+
+        assert self.tag_queries() == 1
+        assert self.tag_queries() == 0
+        assert self.ids(self.list()) == [tag["id"]]
+
+    def test_list_is_invalidated(self) -> None:
+        tag = Tag.objects.create(name="first tag")
+        self.list()
+
+        Tag.objects.filter(pk=tag.pk).update(name="stale")
+        assert self.list() == [{"id": tag.id, "name": "first tag"}]
+
+        tag.name = "renamed"
+        tag.save()
+        assert self.list() == [{"id": tag.id, "name": "renamed"}]
+
+        another = Tag.objects.create(name="second tag")
+        assert self.ids(self.list()) == [tag.id, another.id]
+
+        tag.delete()
+        assert self.ids(self.list()) == [another.id]
+
+    def test_list_is_keyed_by_query_string(self) -> None:
+        tag = self.create_tag()
+        self.list()
+
+        with CaptureQueriesContext(connection) as queries:
+            tags = self.list(data={"page": 1})
+
+        assert self.ids(tags) == [tag["id"]]
+        assert any("main_tag" in query["sql"] for query in queries)
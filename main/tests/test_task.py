@@ -1,9 +1,20 @@
+import csv
+import io
+import json
+import tempfile
 from http import HTTPStatus
 
 from freezegun import freeze_time
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
 
 from main.models import Tag, Task
+from main.serializers import TaskSerializer, UserSerializer
+from .factories import UserFactory
 from .base import CURRENT_TIME, TestViewSetBase, merge
 
 
@@ -121,6 +132,15 @@ class TestTaskViewSet(TestViewSetBase):
         self.assert_list_ids(query={"tags": "t"}, expected=[task])
         self.assert_list_ids(query={"tags": "x"}, expected=[])
         self.assert_list_ids(query={"tags": ["t", "z"]}, expected=[task])
+        self.assert_list_ids(query={"tags": "x,z"}, expected=[task])
+        self.assert_list_ids(query={"tags": "t,z"}, expected=[task])
+
+    def test_filter_active(self) -> None:
+        task = self.create_task()
+        archived = self.create_task({"state": Task.State.ARCHIVED})
+
+        self.assert_list_ids(query={"active": True}, expected=[task])
+        self.assert_list_ids(query={"active": False}, expected=[archived])
 
     def test_filter_executor(self) -> None:
         task = self.create_task()
@@ -133,3 +153,604 @@ class TestTaskViewSet(TestViewSetBase):
 
         self.assert_list_ids(query={"author": "Snow"}, expected=[task])
         self.assert_list_ids(query={"author": "Aleks"}, expected=[])
+
+    def request_page(self, url: str, data: dict = None):
+        self.client.force_login(self.user)
+        response = self.client.get(url, data=data)
+        assert response.status_code == HTTPStatus.OK, response.content
+        return response.data
+
+    def walk_pages(self, query: dict) -> list:
+        page = self.request_page(self.list_url(), query)
+        ids = self.ids(page["results"])
+        while page["next"]:
+            page = self.request_page(page["next"])
+            ids += self.ids(page["results"])
+        return ids
+
+    def test_pagination(self) -> None:
+        tasks = [self.create_task({"name": f"task {i}"}) for i in range(5)]
+
+        page = self.request_page(self.list_url(), {"page_size": 2})
+
+        assert self.ids(page["results"]) == self.ids(tasks[:2])
+        assert page["previous"] is None
+        assert self.walk_pages({"page_size": 2}) == self.ids(tasks)
+
+    def test_pagination_previous(self) -> None:
+        tasks = [self.create_task({"name": f"task {i}"}) for i in range(5)]
+        first = self.request_page(self.list_url(), {"page_size": 2})
+        second = self.request_page(first["next"])
+
+        previous = self.request_page(second["previous"])
+
+        assert self.ids(second["results"]) == self.ids(tasks[2:4])
+        assert self.ids(previous["results"]) == self.ids(tasks[:2])
+        assert previous["previous"] is None
+
+    def test_pagination_ordering(self) -> None:
+        late = self.create_task({"deadline": "2023-07-02T12:00:00Z"})
+        no_deadline = self.create_task()
+        early = self.create_task({"deadline": "2023-07-01T12:00:00Z"})
+        same_early = self.create_task({"deadline": "2023-07-01T12:00:00Z"})
+        ascending = [early, same_early, late, no_deadline]
+
+        assert self.walk_pages({"ordering": "deadline", "page_size": 1}) == (
+            self.ids(ascending)
+        )
+        assert self.walk_pages({"ordering": "-deadline", "page_size": 1}) == (
+            self.ids(ascending[::-1])
+        )
+
+    def test_pagination_has_no_offset_or_count(self) -> None:
+        for i in range(3):
+            self.create_task({"name": f"task {i}", "priority": i})
+        page = self.request_page(
+            self.list_url(), {"ordering": "priority", "page_size": 1}
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.request_page(page["next"])
+
+        sql = " ".join(query["sql"] for query in queries).upper()
+        assert "OFFSET" not in sql
+        assert "COUNT(" not in sql
+
+    def test_pagination_invalid_cursor(self) -> None:
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.list_url(), {"cursor": "garbage"})
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_pagination_invalid_ordering(self) -> None:
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.list_url(), {"ordering": "description"})
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_search(self) -> None:
+        in_description = self.create_task(
+            {"name": "cleanup", "description": "Remove the legacy reports"}
+        )
+        in_name = self.create_task({"name": "Legacy reports export"})
+        self.create_task({"name": "unrelated"})
+
+        self.assert_list_ids(
+            query={"search": "legacy report"}, expected=[in_name, in_description]
+        )
+        self.assert_list_ids(query={"search": "missing"}, expected=[])
+
+    def test_search_follows_updates(self) -> None:
+        task = self.create_task({"name": "draft"})
+
+        self.partial_update(task["id"], {"name": "final"})
+
+        self.assert_list_ids(query={"search": "final"}, expected=[task])
+        self.assert_list_ids(query={"search": "draft"}, expected=[])
+
+    def test_search_pagination(self) -> None:
+        for i in range(1, 6):
+            self.create_task({"name": "report " * (i % 3 + 1), "description": "report"})
+        ranked = self.list({"search": "report"})
+
+        assert self.walk_pages({"search": "report", "page_size": 2}) == (
+            self.ids(ranked)
+        )
+
+    def request_bulk(self, method: str, data: list, user=None):
+        self.client.force_login(user or self.user)
+        return getattr(self.client, method)(self.list_url(), data=data, format="json")
+
+    def test_bulk_create(self) -> None:
+        tag = Tag.objects.create(name="t")
+        items = [
+            merge(self.task_attributes, {"name": f"task {i}", "tags": [tag.id]})
+            for i in range(3)
+        ]
+
+        response = self.request_bulk("post", items)
+
+        assert response.status_code == HTTPStatus.CREATED, response.content
+        assert [task["name"] for task in response.data] == ["task 0", "task 1", "task 2"]
+        assert all(task["tags"] == [tag.id] for task in response.data)
+        self.assert_list_ids(query={"tags": "t"}, expected=response.data)
+
+    def test_bulk_create_queries_do_not_grow(self) -> None:
+        tag = Tag.objects.create(name="t")
+
+        def count_queries(size: int) -> int:
+            items = [merge(self.task_attributes, {"tags": [tag.id]})] * size
+            with CaptureQueriesContext(connection) as queries:
+                response = self.request_bulk("post", items)
+            assert response.status_code == HTTPStatus.CREATED, response.content
+            return len(queries)
+
+        count_queries(1)
+        assert count_queries(2) == count_queries(20)
+
+    def test_bulk_create_invalid(self) -> None:
+        items = [self.task_attributes, merge(self.task_attributes, {"name": ""})]
+
+        response = self.request_bulk("post", items)
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Task.objects.exists()
+
+    def test_bulk_partial_update(self) -> None:
+        tag = Tag.objects.create(name="t")
+        task1 = self.create_task()
+        task2 = self.create_task({"name": "second task"})
+
+        with freeze_time("2023-06-25T12:00:00Z"):
+            response = self.request_bulk(
+                "patch",
+                [
+                    {"id": task1["id"], "state": "in_qa", "tags": [tag.id]},
+                    {"id": task2["id"], "priority": 2},
+                ],
+            )
+
+        assert response.status_code == HTTPStatus.OK, response.content
+        assert response.data[0] == merge(
+            task1,
+            {"state": "in_qa", "tags": [tag.id], "updated_at": "2023-06-25T12:00:00Z"},
+        )
+        assert response.data[1] == merge(
+            task2, {"priority": 2, "updated_at": "2023-06-25T12:00:00Z"}
+        )
+        assert self.retrieve(task1["id"]) == response.data[0]
+
+    def test_bulk_update_missing(self) -> None:
+        task = self.create_task()
+
+        response = self.request_bulk(
+            "patch", [{"id": task["id"], "state": "in_qa"}, {"id": 0, "state": "in_qa"}]
+        )
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert self.retrieve(task["id"])["state"] == "new_task"
+
+    def test_bulk_delete(self) -> None:
+        task1 = self.create_task()
+        task2 = self.create_task({"name": "second task"})
+        task3 = self.create_task({"name": "third task"})
+
+        response = self.request_bulk("delete", [task1["id"], task3["id"]], self.admin)
+
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        self.assert_list_ids(expected=[task2])
+
+    def test_bulk_delete_is_admin_only(self) -> None:
+        task = self.create_task()
+
+        response = self.request_bulk("delete", [task["id"]])
+
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert Task.objects.filter(id=task["id"]).exists()
+
+        response = self.request_bulk("delete", [task["id"]], self.admin)
+
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Task.objects.filter(id=task["id"]).exists()
+
+    def request_transition(self, query: str, changes: dict):
+        self.client.force_login(self.user)
+        url = f"{reverse(f'{self.basename}-transition')}?{query}"
+        return self.client.post(url, data=changes, format="json")
+
+    def test_transition(self) -> None:
+        sprint = Tag.objects.create(name="sprint-42")
+        released = Tag.objects.create(name="released")
+        task1 = self.create_task({"state": Task.State.IN_QA, "tags": [sprint.id]})
+        task2 = self.create_task({"state": Task.State.IN_QA, "tags": [sprint.id]})
+        untagged = self.create_task({"state": Task.State.IN_QA})
+        in_dev = self.create_task({"state": Task.State.IN_DEV, "tags": [sprint.id]})
+
+        with freeze_time("2023-06-25T12:00:00Z"):
+            response = self.request_transition(
+                "state=in_qa&tags=sprint-42",
+                {
+                    "state": "ready_for_release",
+                    "executor": self.admin.id,
+                    "add_tags": [released.id],
+                    "remove_tags": [sprint.id],
+                },
+            )
+
+        assert response.status_code == HTTPStatus.OK, response.content
+        assert response.data == {"updated": 2}
+        for task in (task1, task2):
+            assert self.retrieve(task["id"]) == merge(
+                task,
+                {
+                    "state": "ready_for_release",
+                    "executor": self.admin.id,
+                    "tags": [released.id],
+                    "updated_at": "2023-06-25T12:00:00Z",
+                },
+            )
+        assert self.retrieve(untagged["id"]) == untagged
+        assert self.retrieve(in_dev["id"]) == in_dev
+
+    def test_transition_locks_the_target_tasks(self) -> None:
+        task = self.create_task({"state": Task.State.IN_QA})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.request_transition("state=in_qa", {"state": "archived"})
+
+        assert response.data == {"updated": 1}
+        [select] = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith('SELECT "main_task"."id"')
+        ]
+        assert select.endswith('FOR UPDATE OF "main_task"')
+        assert Task.objects.get(id=task["id"]).state == Task.State.ARCHIVED
+
+    def test_transition_requires_filter(self) -> None:
+        self.create_task()
+
+        response = self.request_transition("", {"state": "archived"})
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Task.objects.filter(state=Task.State.ARCHIVED).exists()
+
+    def test_transition_requires_changes(self) -> None:
+        response = self.request_transition("state=new_task", {})
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @override_settings(TIME_ZONE="Europe/Berlin")
+    def test_list_matches_serializer(self) -> None:
+        tags = [Tag.objects.create(name=f"tag {i}") for i in range(3)]
+        for i in range(5):
+            task = Task.objects.create(
+                name=f"task {i}",
+                description="",
+                author=self.user,
+                executor=self.admin,
+                deadline="2023-07-01T09:30:15.123456+03:00" if i % 2 else None,
+                priority=i if i % 3 else None,
+                state=Task.State.IN_DEV,
+            )
+            task.tags.set(tags[i % 3 :])
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.list_url())
+
+        expected = TaskSerializer(
+            Task.objects.order_by("id"),
+            many=True,
+            context={"request": response.wsgi_request},
+        ).data
+        renderer = JSONRenderer()
+        assert renderer.render(response.data["results"]) == renderer.render(expected)
+
+    def request_export(self, query: str = "", **headers):
+        self.client.force_login(self.user)
+        return self.client.get(f"{reverse('tasks-export')}?{query}", **headers)
+
+    def test_export_ndjson(self) -> None:
+        tag = Tag.objects.create(name="export")
+        tasks = [self.create_task({"name": f"task {i}", "tags": [tag.id]}) for i in range(3)]
+
+        response = self.request_export()
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == tasks
+
+    def test_export_csv(self) -> None:
+        tag1, tag2 = Tag.objects.create(name="a"), Tag.objects.create(name="b")
+        task = self.create_task({"tags": [tag1.id, tag2.id]})
+
+        response = self.request_export("format=csv")
+
+        assert response.status_code == HTTPStatus.OK
+        assert response["Content-Type"] == "text/csv"
+        content = b"".join(response.streaming_content).decode()
+        header, row = csv.reader(content.splitlines())
+        assert header == list(task)
+        assert dict(zip(header, row)) == {
+            **{key: str(value) for key, value in task.items()},
+            "deadline": "",
+            "priority": "",
+            "tags": f"{tag1.id},{tag2.id}",
+        }
+
+    def test_export_is_filtered(self) -> None:
+        self.create_task({"state": "released"})
+        active = self.create_task()
+
+        response = self.request_export("active=true", HTTP_ACCEPT="application/x-ndjson")
+
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [active["id"]]
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_export_looks_tags_up_per_chunk(self) -> None:
+        for i in range(5):
+            self.create_task({"name": f"task {i}"})
+
+        response = self.request_export()
+        with CaptureQueriesContext(connection) as queries:
+            lines = b"".join(response.streaming_content).splitlines()
+
+        assert len(lines) == 5
+        tag_queries = [q for q in queries if "main_task_tags" in q["sql"]]
+        assert len(tag_queries) == 3
+
+    def request_import(self, content: str, content_type: str, user=None):
+        self.client.force_login(user or self.admin)
+        return self.client.post(
+            reverse("tasks-import"), data=content, content_type=content_type
+        )
+
+    def import_row(self, **values) -> dict:
+        return {
+            "name": "imported",
+            "description": "Moved from the old tracker",
+            "author": self.user.username,
+            "executor": self.admin.username,
+            **values,
+        }
+
+    def test_import_ndjson(self) -> None:
+        existing = Tag.objects.create(name="backend")
+        rows = [
+            self.import_row(name="first", tags=["backend", "legacy"], priority=2),
+            self.import_row(
+                name="second",
+                state="released",
+                deadline="2023-07-01T10:00:00Z",
+                created_at="2020-01-01T00:00:00Z",
+            ),
+        ]
+        content = "".join(f"{json.dumps(row)}\n" for row in rows)
+
+        response = self.request_import(content, "application/x-ndjson")
+
+        assert response.status_code == HTTPStatus.CREATED, response.content
+        assert response.data["imported"] == 2
+        assert response.data["tags"] == 2
+        first, second = Task.objects.order_by("id")
+        assert first.author == self.user and first.executor == self.admin
+        assert first.priority == 2 and first.state == "new_task"
+        assert {tag.name for tag in first.tags.all()} == {"backend", "legacy"}
+        assert existing in first.tags.all()
+        assert second.state == "released"
+        assert second.created_at.year == 2020
+        assert second.updated_at.isoformat() == "2023-06-24T12:00:00+00:00"
+        assert sorted(self.ids(self.list({"search": "tracker"}))) == [first.id, second.id]
+
+    def test_import_csv(self) -> None:
+        content = (
+            "name,description,author,executor,state,priority,tags\n"
+            f'csv task,"multi\nline",{self.user.username},{self.user.username},'
+            'in_qa,,"a, b"\n'
+        )
+
+        response = self.request_import(content, "text/csv")
+
+        assert response.status_code == HTTPStatus.CREATED, response.content
+        task = Task.objects.get()
+        assert task.description == "multi\nline"
+        assert task.priority is None and task.state == "in_qa"
+        assert sorted(tag.name for tag in task.tags.all()) == ["a", "b"]
+
+    def test_import_is_rejected_as_a_whole(self) -> None:
+        rows = [
+            self.import_row(),
+            self.import_row(executor="nobody", priority=-1),
+            "not an object",
+        ]
+        content = "\n".join(json.dumps(row) for row in rows)
+
+        response = self.request_import(content, "application/x-ndjson")
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            "errors": {
+                "2": {
+                    "executor": "Unknown user 'nobody'.",
+                    "priority": "Must be a non-negative integer.",
+                },
+                "3": {"non_field_errors": "Not a JSON object."},
+            }
+        }
+        assert not Task.objects.exists()
+
+    def test_import_is_admin_only(self) -> None:
+        response = self.request_import("", "application/x-ndjson", user=self.user)
+
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_import_command(self) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as file:
+            for i in range(5):
+                file.write(f"{json.dumps(self.import_row(name=f'task {i}'))}\n")
+            file.flush()
+
+            call_command("import_tasks", file.name, batch_size=2, stdout=io.StringIO())
+
+        assert sorted(Task.objects.values_list("name", flat=True)) == [
+            f"task {i}" for i in range(5)
+        ]
+
+    def test_retrieve_answers_304_while_unchanged(self) -> None:
+        task = self.create_task()
+        self.client.force_login(self.user)
+        response = self.client.get(self.detail_url(task["id"]))
+        etag = response["ETag"]
+        assert response["Last-Modified"]
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(
+                self.detail_url(task["id"]), HTTP_IF_NONE_MATCH=etag
+            )
+
+        assert cached.status_code == HTTPStatus.NOT_MODIFIED
+        assert cached["ETag"] == etag
+        assert not cached.content
+        assert not any("main_task_tags" in query["sql"] for query in queries)
+
+        with freeze_time("2023-06-25T12:00:00Z"):
+            self.partial_update(task["id"], {"name": "renamed"})
+        changed = self.client.get(self.detail_url(task["id"]), HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == HTTPStatus.OK
+        assert changed["ETag"] != etag
+
+    def test_retrieve_honours_if_modified_since(self) -> None:
+        with freeze_time(CURRENT_TIME):
+            task = self.create_task()
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            self.detail_url(task["id"]),
+            HTTP_IF_MODIFIED_SINCE="Sat, 24 Jun 2023 12:00:00 GMT",
+        )
+
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response["Last-Modified"] == "Sat, 24 Jun 2023 12:00:00 GMT"
+
+    def test_deleting_a_tag_changes_the_task_etag(self) -> None:
+        task = self.create_task()
+        tag = Tag.objects.create(name="doomed")
+        Task.objects.get(pk=task["id"]).tags.add(tag)
+        self.client.force_login(self.user)
+        etag = self.client.get(self.detail_url(task["id"]))["ETag"]
+
+        with freeze_time("2023-06-25T12:00:00Z"):
+            tag.delete()
+
+        response = self.client.get(self.detail_url(task["id"]), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.data["tags"] == []
+
+    def test_list_is_not_conditional(self) -> None:
+        # Counting every task would cost more than the list page itself.
+        self.client.force_login(self.user)
+
+        assert "ETag" not in self.client.get(self.list_url())
+
+    def test_retrieve_of_invalid_id_is_not_found(self) -> None:
+        self.client.force_login(self.user)
+
+        assert self.client.get(self.detail_url("abc")).status_code == 404
+
+    def test_fields_trim_list_and_retrieve(self) -> None:
+        task = self.create_task()
+
+        listed = self.list({"fields": "id,name"})
+        retrieved = self.client.get(
+            self.detail_url(task["id"]), {"fields": "id,name"}
+        ).json()
+
+        assert listed == [{"id": task["id"], "name": "test task"}]
+        assert retrieved == {"id": task["id"], "name": "test task"}
+
+    def test_fields_keep_the_cursor(self) -> None:
+        tasks = [self.create_task({"priority": priority}) for priority in (3, 1, 2)]
+
+        ids = self.walk_pages({"fields": "id", "ordering": "priority", "page_size": 1})
+
+        assert ids == [tasks[1]["id"], tasks[2]["id"], tasks[0]["id"]]
+
+    def test_unknown_fields_are_rejected(self) -> None:
+        self.client.force_login(self.user)
+
+        fields = self.client.get(self.list_url(), {"fields": "id,secret"})
+        expand = self.client.get(self.list_url(), {"expand": "state"})
+
+        assert fields.status_code == HTTPStatus.BAD_REQUEST
+        assert fields.json() == {"fields": ["Unknown fields: secret."]}
+        assert expand.status_code == HTTPStatus.BAD_REQUEST
+        assert expand.json() == {"expand": ["Unknown relations: state."]}
+
+    def test_expand(self) -> None:
+        tag = Tag.objects.create(name="urgent")
+        executor = UserFactory.create(avatar_picture=None)
+        task = self.create_task({"tags": [tag.id], "executor": executor.id})
+        expected = {
+            "id": task["id"],
+            "author": UserSerializer(self.user).data,
+            "executor": UserSerializer(executor).data,
+        }
+        expected["tags"] = [{"id": tag.id, "name": "urgent"}]
+        query = {"fields": "id", "expand": "author,executor,tags"}
+        self.client.force_login(self.user)
+
+        listed = self.client.get(self.list_url(), query).json()
+        retrieved = self.client.get(self.detail_url(task["id"]), query).json()
+
+        assert listed["results"] == [expected]
+        assert retrieved == expected
+
+    def test_expand_takes_no_extra_queries(self) -> None:
+        for _ in range(3):
+            self.create_task({"tags": [Tag.objects.create(name="t").id]})
+        self.client.force_login(self.user)
+
+        def count_queries(query: dict) -> int:
+            with CaptureQueriesContext(connection) as context:
+                assert self.client.get(self.list_url(), query).status_code == 200
+            return len(context)
+
+        assert count_queries({"expand": "author,executor,tags"}) == count_queries({})
+
+    def test_sparse_retrieve_loads_only_what_it_shows(self) -> None:
+        task = self.create_task()
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.detail_url(task["id"]), {"fields": "id,name"})
+
+        select = next(q["sql"] for q in context if 'FROM "main_task"' in q["sql"])
+        assert '"main_task"."description"' not in select
+        assert "JOIN" not in select
+        assert not any('"main_task_tags"' in q["sql"] for q in context)
+
+    def test_sparse_fields_get_their_own_etag(self) -> None:
+        task = self.create_task()
+        self.client.force_login(self.user)
+        etag = self.client.get(self.detail_url(task["id"]))["ETag"]
+
+        response = self.client.get(
+            self.detail_url(task["id"]), {"fields": "id"}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {"id": task["id"]}
+
+    def test_expanded_retrieve_is_not_conditional(self) -> None:
+        # The embedded author may change without the task.
+        task = self.create_task()
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.detail_url(task["id"]), {"expand": "author"})
+
+        assert "ETag" not in response
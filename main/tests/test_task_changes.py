@@ -0,0 +1,158 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import psycopg2
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from freezegun import freeze_time
+
+from main.models import Task, TaskTombstone
+from main.services.changes import encode_cursor
+from .base import TestViewSetBase
+from .factories import UserFactory
+
+
+@override_settings(TASK_CHANGES_DELAY=0)
+class TestTaskChanges(TestViewSetBase):
+    basename = "tasks"
+
+    def request_changes(self, query: dict = None):
+        self.client.force_login(self.user)
+        return self.client.get(reverse("tasks-changes"), query)
+
+    def changes(self, query: dict = None) -> dict:
+        response = self.request_changes(query)
+        assert response.status_code == HTTPStatus.OK, response.content
+        return response.json()
+
+    def test_first_poll_returns_every_task(self) -> None:
+        first, second = self.create_task(), self.create_task({"name": "second"})
+
+        page = self.changes()
+
+        assert [task["id"] for task in page["changes"]] == [first.id, second.id]
+        assert page["changes"][1]["name"] == "second"
+        assert page["deleted"] == []
+        assert page["has_more"] is False
+
+    def test_poll_returns_changes_after_the_cursor(self) -> None:
+        kept, changed, deleted = (self.create_task() for _ in range(3))
+        cursor = self.changes()["cursor"]
+
+        assert self.changes({"cursor": cursor}) == {
+            "changes": [],
+            "deleted": [],
+            "cursor": cursor,
+            "has_more": False,
+        }
+
+        changed.name = "renamed"
+        changed.save()
+        Task.objects.filter(pk=deleted.pk).delete()
+        page = self.changes({"cursor": cursor})
+
+        assert [task["name"] for task in page["changes"]] == ["renamed"]
+        assert page["deleted"] == [deleted.pk]
+        assert self.changes({"cursor": page["cursor"]})["changes"] == []
+
+    def test_pages(self) -> None:
+        tasks = [self.create_task() for _ in range(3)]
+        Task.objects.filter(pk=tasks[0].pk).delete()
+
+        ids, deleted, query = [], [], {"page_size": 1}
+        while True:
+            page = self.changes(query)
+            ids += [task["id"] for task in page["changes"]]
+            deleted += page["deleted"]
+            query["cursor"] = page["cursor"]
+            if not page["has_more"]:
+                break
+
+        assert ids == [tasks[1].pk, tasks[2].pk]
+        assert deleted == [tasks[0].pk]
+
+    def test_sparse_fields(self) -> None:
+        task = self.create_task()
+
+        page = self.changes({"fields": "name"})
+
+        assert page["changes"] == [{"name": task.name}]
+
+    @override_settings(TASK_CHANGES_DELAY=60)
+    def test_recent_changes_are_held_back(self) -> None:
+        self.create_task()
+
+        assert self.changes()["changes"] == []
+        with freeze_time(timezone.now() + timedelta(minutes=2)):
+            assert len(self.changes()["changes"]) == 1
+
+    @override_settings(TASK_TOMBSTONE_RETENTION_DAYS=30)
+    def test_expired_cursor(self) -> None:
+        cursor = encode_cursor((timezone.now() - timedelta(days=31), 1))
+
+        response = self.request_changes({"cursor": cursor})
+
+        assert response.status_code == HTTPStatus.GONE
+        assert response.json() == {
+            "detail": "Cursor expired, download the tasks again."
+        }
+
+    def test_invalid_cursor(self) -> None:
+        response = self.request_changes({"cursor": "garbage"})
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @override_settings(TASK_TOMBSTONE_RETENTION_DAYS=30)
+    def test_prune_tombstones(self) -> None:
+        now = timezone.now()
+        old = TaskTombstone.objects.create(
+            task_id=1, deleted_at=now - timedelta(days=31)
+        )
+        recent = TaskTombstone.objects.create(task_id=2, deleted_at=now)
+
+        call_command("prune_tombstones", stdout=StringIO())
+
+        assert list(TaskTombstone.objects.values_list("id", flat=True)) == [recent.id]
+        assert not TaskTombstone.objects.filter(pk=old.pk).exists()
+
+
+@override_settings(TASK_CHANGES_DELAY=0)
+class TestConcurrentTaskChanges(TransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = UserFactory.create(avatar_picture=None)
+        self.client.force_login(self.user)
+
+    def create_task(self) -> Task:
+        return Task.objects.create(
+            name="task", description="description", author=self.user, executor=self.user
+        )
+
+    def changes(self, query: dict = None) -> dict:
+        response = self.client.get(reverse("tasks-changes"), query)
+        assert response.status_code == HTTPStatus.OK, response.content
+        return response.json()
+
+    def test_transaction_committing_after_a_poll(self) -> None:
+        late = self.create_task()
+        other = psycopg2.connect(**connection.get_connection_params())
+        self.addCleanup(other.close)
+        with other.cursor() as cursor:
+            cursor.execute(
+                "UPDATE main_task SET name = 'late', updated_at = clock_timestamp() "
+                "WHERE id = %s",
+                [late.id],
+            )
+        newer = self.create_task()
+
+        page = self.changes()
+        other.commit()
+
+        assert [task["id"] for task in page["changes"]] == [late.id]
+        page = self.changes({"cursor": page["cursor"]})
+        assert [task["id"] for task in page["changes"]] == [late.id, newer.id]
+        assert page["changes"][0]["name"] == "late"
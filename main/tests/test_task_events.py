@@ -0,0 +1,301 @@
+import asyncio
+import json
+from urllib.parse import urlencode
+
+import psycopg2
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection as db_connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from main.models import Tag, Task
+from main.services.task_events import (
+    CHANNEL,
+    EVENTS_PATH,
+    RESYNC,
+    Subscription,
+    TaskEvent,
+    TaskEventFilter,
+    TaskEventsRouter,
+    decode,
+    get_hub,
+)
+from main.services.seed import seed
+from main.services.task_import import import_tasks
+from main.services.tasks import change_tasks
+from task_manager.asgi import application
+from .factories import UserFactory
+
+
+class Connection:
+    """Both ends of an ASGI connection driven by a test."""
+
+    def __init__(self, scope: dict, *messages: dict) -> None:
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        for message in messages:
+            self.inbox.put_nowait(message)
+        self.app = asyncio.ensure_future(
+            application(scope, self.inbox.get, self.outbox.put)
+        )
+
+    async def next(self) -> dict:
+        return await asyncio.wait_for(self.outbox.get(), 5)
+
+    async def close(self, message: dict) -> None:
+        self.inbox.put_nowait(message)
+        await asyncio.wait_for(self.app, 5)
+
+
+def scope(type: str, query: dict) -> dict:
+    scope = {
+        "type": type,
+        "path": EVENTS_PATH,
+        "query_string": urlencode(query).encode(),
+        "headers": [],
+    }
+    if type == "http":
+        scope["method"] = "GET"
+    return scope
+
+
+def parse_sse(body: bytes) -> tuple:
+    event, data = body.decode().strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+class TestTaskEventFilter(SimpleTestCase):
+    @staticmethod
+    def event(before: dict = None, **task) -> TaskEvent:
+        task = {"executor": 1, "state": "new_task", "tags": [1], **task}
+        return TaskEvent("updated", 1, task, before or {})
+
+    def test_matches(self) -> None:
+        assert TaskEventFilter().matches(self.event())
+        assert TaskEventFilter(executor=1, state="new_task").matches(self.event())
+        assert not TaskEventFilter(executor=2).matches(self.event())
+        assert not TaskEventFilter(tags=frozenset({2})).matches(self.event())
+        assert TaskEventFilter(tags=frozenset({1, 2})).matches(self.event())
+
+    def test_matches_what_the_task_left(self) -> None:
+        moved = self.event({"executor": 2, "state": "in_qa"})
+        untagged = self.event({"tags": [2]}, tags=[])
+
+        assert TaskEventFilter(executor=2).matches(moved)
+        assert TaskEventFilter(state="in_qa").matches(moved)
+        assert TaskEventFilter(tags=frozenset({2})).matches(untagged)
+
+    def test_events_without_a_task_match_everything(self) -> None:
+        assert TaskEventFilter(executor=2).matches(TaskEvent("deleted", 1))
+
+    def test_from_query(self) -> None:
+        query = {"executor": ["3"], "state": ["in_qa"], "tags": ["1,2"]}
+
+        assert TaskEventFilter.from_query(query) == TaskEventFilter(
+            3, "in_qa", frozenset({1, 2})
+        )
+        with self.assertRaises(ValueError):
+            TaskEventFilter.from_query({"state": ["done"]})
+        with self.assertRaises(ValueError):
+            TaskEventFilter.from_query({"executor": ["me"]})
+
+    @override_settings(TASK_EVENTS_QUEUE_SIZE=1)
+    def test_slow_subscriber_is_told_to_resync(self) -> None:
+        subscription = Subscription(TaskEventFilter())
+        event = self.event()
+
+        subscription.put(event)
+        subscription.put(event)
+        subscription.put(event)
+
+        assert subscription.closed
+        queued = [subscription.queue.get_nowait() for _ in range(3)]
+        assert queued == [event, RESYNC, None]
+
+    def test_other_requests_reach_django(self) -> None:
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+
+        router = TaskEventsRouter(app)
+        async_to_sync(router)({"type": "http", "path": "/api/tasks/"}, None, None)
+
+        assert calls == ["/api/tasks/"]
+
+
+class TestTaskEvents(TransactionTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = UserFactory.create(avatar_picture=None)
+        self.token = str(AccessToken.for_user(self.user))
+
+    def create_task(self, **attributes) -> Task:
+        return Task.objects.create(
+            **{
+                "name": "task",
+                "description": "description",
+                "author": self.user,
+                "executor": self.user,
+                **attributes,
+            }
+        )
+
+    def test_sse(self) -> None:
+        other = UserFactory.create(avatar_picture=None)
+
+        async def run() -> None:
+            query = {"token": self.token, "executor": self.user.id}
+            connection = Connection(scope("http", query), {"type": "http.request"})
+            start = await connection.next()
+            assert start["status"] == 200
+            assert dict(start["headers"])[b"content-type"] == b"text/event-stream"
+            assert (await connection.next())["body"] == b"retry: 2000\n\n"
+
+            await sync_to_async(self.create_task)(executor=other)
+            task = await sync_to_async(self.create_task)()
+            event, data = parse_sse((await connection.next())["body"])
+            assert event == "created"
+            assert data["id"] == task.id
+            assert data["task"]["executor"] == self.user.id
+            assert data["task"]["created_at"].endswith("Z")
+
+            await sync_to_async(Task.objects.filter(pk=task.pk).delete)()
+            event, data = parse_sse((await connection.next())["body"])
+            assert (event, data) == ("deleted", {"event": "deleted", "id": task.id})
+
+            await connection.close({"type": "http.disconnect"})
+            assert get_hub().connection is None
+
+        async_to_sync(run)()
+
+    def test_sse_reports_the_final_tags(self) -> None:
+        tag = Tag.objects.create(name="urgent")
+        task = self.create_task()
+
+        async def run() -> None:
+            query = {"token": self.token, "tags": tag.id}
+            connection = Connection(scope("http", query), {"type": "http.request"})
+            await connection.next()
+            await connection.next()
+
+            await sync_to_async(task.tags.add)(tag)
+            event, data = parse_sse((await connection.next())["body"])
+            assert event == "updated"
+            assert data["task"]["tags"] == [tag.id]
+
+            await sync_to_async(task.tags.remove)(tag)
+            event, data = parse_sse((await connection.next())["body"])
+            assert data["task"]["tags"] == []
+
+            await connection.close({"type": "http.disconnect"})
+
+        async_to_sync(run)()
+
+    def test_websocket(self) -> None:
+        task = self.create_task()
+
+        async def run() -> None:
+            query = {"token": self.token, "state": Task.State.IN_QA}
+            connection = Connection(
+                scope("websocket", query), {"type": "websocket.connect"}
+            )
+            assert (await connection.next()) == {"type": "websocket.accept"}
+
+            for state in (Task.State.IN_QA, Task.State.RELEASED):
+                await sync_to_async(Task.objects.filter(pk=task.pk).update)(state=state)
+                message = await connection.next()
+                assert json.loads(message["text"])["task"]["state"] == state
+
+            await connection.close({"type": "websocket.disconnect", "code": 1000})
+
+        async_to_sync(run)()
+
+    def test_requires_a_token(self) -> None:
+        async def run() -> None:
+            sse = Connection(scope("http", {}), {"type": "http.request"})
+            assert (await sse.next())["status"] == 401
+            await asyncio.wait_for(sse.app, 5)
+
+            query = {"token": "garbage"}
+            websocket = Connection(
+                scope("websocket", query), {"type": "websocket.connect"}
+            )
+            assert await websocket.next() == {"type": "websocket.close", "code": 1008}
+
+        async_to_sync(run)()
+
+    def test_rejects_unknown_filters(self) -> None:
+        async def run() -> None:
+            query = {"token": self.token, "state": "done"}
+            connection = Connection(scope("http", query), {"type": "http.request"})
+            assert (await connection.next())["status"] == 400
+
+        async_to_sync(run)()
+
+    def test_bulk_changes_send_one_notification(self) -> None:
+        tag = Tag.objects.create(name="urgent")
+        tasks = [self.create_task() for _ in range(3)]
+        for task in tasks:
+            task.tags.add(tag)
+        listener = psycopg2.connect(**db_connection.get_connection_params())
+        self.addCleanup(listener.close)
+        listener.autocommit = True
+        with listener.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+
+        change_tasks(Task.objects.all(), {"state": Task.State.IN_QA}, remove_tags=[tag])
+        listener.poll()
+
+        [notify] = listener.notifies
+        events = decode(notify.payload)
+        assert [event.id for event in events] == [task.id for task in tasks]
+        assert {event.kind for event in events} == {"updated"}
+        assert events[0].task["state"] == Task.State.IN_QA
+        assert events[0].task["tags"] == []
+        assert events[0].before == {
+            "executor": self.user.id,
+            "state": Task.State.NEW,
+            "tags": [tag.id],
+        }
+
+    def test_import_sends_one_resync(self) -> None:
+        username = self.user.username
+        rows = [
+            {"name": f"task {i}", "author": username, "executor": username}
+            for i in range(3)
+        ]
+
+        async def run() -> None:
+            connection = Connection(
+                scope("http", {"token": self.token}), {"type": "http.request"}
+            )
+            await connection.next()
+            await connection.next()
+
+            lines = [json.dumps(row) + "\n" for row in rows]
+            await sync_to_async(import_tasks)(lines, "ndjson")
+            event, data = parse_sse((await connection.next())["body"])
+            assert (event, data) == ("resync", {"event": "resync", "id": 0})
+            assert connection.outbox.empty()
+
+            await connection.close({"type": "http.disconnect"})
+
+        async_to_sync(run)()
+
+    def test_seed_sends_one_resync(self) -> None:
+        async def run() -> None:
+            connection = Connection(
+                scope("http", {"token": self.token}), {"type": "http.request"}
+            )
+            await connection.next()
+            await connection.next()
+
+            await sync_to_async(seed)(users=5, tags=3, tasks=50)
+            event, data = parse_sse((await connection.next())["body"])
+            assert (event, data) == ("resync", {"event": "resync", "id": 0})
+            assert connection.outbox.empty()
+
+            await connection.close({"type": "http.disconnect"})
+
+        async_to_sync(run)()
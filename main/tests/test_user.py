@@ -3,8 +3,10 @@ from http import HTTPStatus
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.forms import model_to_dict
 from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
 
 from main.models import User
+from main.serializers import UserSerializer
 from main.tests.factories import UserFactory
 from .base import TestViewSetBase, merge
 
@@ -121,3 +123,37 @@ class TestUserViewSet(TestViewSetBase):
                 "File extension “pdf” is not allowed. Allowed extensions are: jpeg, jpg, png."
             ]
         }
+
+    def test_filter_username_similar(self) -> None:
+        johannes = self.create_user({"username": "johannes"})
+        johanna = self.create_user({"username": "johanna"})
+        self.create_user({"username": "maria"})
+
+        self.assert_list_ids(
+            query={"username_similar": "Johannes"}, expected=[johannes, johanna]
+        )
+        self.assert_list_ids(query={"username_similar": "xyz"}, expected=[])
+
+    def test_list_matches_serializer(self) -> None:
+        UserFactory.create_batch(3)
+        UserFactory.create(avatar_picture=None)
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.list_url())
+
+        expected = UserSerializer(
+            User.objects.order_by("id"),
+            many=True,
+            context={"request": response.wsgi_request},
+        ).data
+        renderer = JSONRenderer()
+        assert renderer.render(response.data) == renderer.render(expected)
+
+    def test_fields(self) -> None:
+        user = self.create_user()
+
+        listed = self.list({"fields": "id,username", "username": user["username"]})
+        retrieved = self.client.get(self.detail_url(user["id"]), {"fields": "email"})
+
+        assert listed == [{"id": user["id"], "username": user["username"]}]
+        assert retrieved.json() == {"email": user["email"]}
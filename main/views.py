@@ -1,11 +1,45 @@
-from typing import cast
+import codecs
+from typing import List, cast
 import django_filters
-from rest_framework import permissions, viewsets
-from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import FloatField, QuerySet
+from django.db.models.functions import Cast, Upper
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework_extensions.mixins import NestedViewSetMixin
+from main.services.async_views import AsyncReadMixin
+from main.services.bulk import BulkModelMixin
+from main.services.cache import TAGS_SCOPE, CachedResponseMixin, task_tags_scope
+from main.services.changes import get_changes
+from main.services.conditional import ConditionalGetMixin, Validators, make_etag
+from main.services.export import (
+    CSVRenderer,
+    EXPORT_RENDERERS,
+    NDJSONRenderer,
+    export_response,
+)
+from main.services import metrics as metrics_service
+from main.services.pagination import KeysetPagination
+from main.services.server_timing import ServerTimingMixin
 from main.services.single_resource import SingleResourceMixin, SingleResourceUpdateMixin
+from main.services.sparse_fields import SparseFieldsMixin
+from main.services.task_import import import_tasks
+from main.services.tasks import change_tasks
+from main.services.values import ValuesListMixin, ValuesRepresentation
 from .models import Tag, Task, User
-from .serializers import TagSerializer, TaskSerializer, UserSerializer
+from .serializers import (
+    TagSerializer,
+    TaskChangeSerializer,
+    TaskSerializer,
+    UserSerializer,
+)
 
 
 class DeleteAdminOnly(permissions.BasePermission):
@@ -17,57 +51,157 @@ class DeleteAdminOnly(permissions.BasePermission):
 
 class UserFilter(django_filters.FilterSet):
     username = django_filters.CharFilter(field_name="username", lookup_expr="icontains")
+    username_similar = django_filters.CharFilter(method="filter_username_similar")
 
     class Meta:
         model = User
-        fields = ("username",)
+        fields = ("username", "username_similar")
 
+    def filter_username_similar(
+        self, queryset: QuerySet, _: str, value: str
+    ) -> QuerySet:
+        # Match on the same UPPER(username) expression as the trigram index.
+        value = value.upper()
+        return (
+            queryset.alias(username_upper=Upper("username"))
+            .filter(username_upper__trigram_similar=value)
+            .annotate(similarity=TrigramSimilarity("username_upper", value))
+            .order_by("-similarity", "id")
+        )
 
-class UserViewSet(viewsets.ModelViewSet):
+
+class UserViewSet(
+    ServerTimingMixin,
+    SparseFieldsMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     queryset = User.objects.order_by("id")
     serializer_class = UserSerializer
     filterset_class = UserFilter
+    query_budgets = {
+        "list": 3,
+        "retrieve": 3,
+        "create": 4,
+        "update": 5,
+        "partial_update": 5,
+        "destroy": 10,
+    }
 
 
 class CurrentUserViewSet(
-    SingleResourceMixin, SingleResourceUpdateMixin, viewsets.ModelViewSet
+    ServerTimingMixin,
+    SparseFieldsMixin,
+    ConditionalGetMixin,
+    SingleResourceMixin,
+    SingleResourceUpdateMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
 ):
     serializer_class = UserSerializer
     queryset = User.objects.order_by("id")
+    query_budgets = {
+        "list": 2,
+        "retrieve": 2,
+        "create": 4,
+        "update": 4,
+        "partial_update": 3,
+        "bulk_update": 4,
+        "partial_bulk_update": 3,
+        "destroy": 9,
+    }
 
     def get_object(self) -> User:
         return cast(User, self.request.user)
 
+    async def aget_object(self) -> User:
+        return self.get_object()
+
+    def get_validators(self, request: Request) -> Validators:
+        # The user is already loaded by authentication.
+        user = self.get_object()
+        etag = make_etag(
+            user.pk, request.get_full_path(), request.accepted_media_type, user.updated_at
+        )
+        return etag, user.updated_at
+
+    async def aget_validators(self, request: Request) -> Validators:
+        return self.get_validators(request)
+
+
+class TaskPagination(KeysetPagination):
+    ordering_fields = ("id", "deadline", "priority", "updated_at", "rank")
+
 
-class UserTasksViewSet(NestedViewSetMixin, viewsets.ReadOnlyModelViewSet):
+class UserTasksViewSet(
+    ServerTimingMixin,
+    SparseFieldsMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    NestedViewSetMixin,
+    AsyncReadMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     queryset = (
         Task.objects.order_by("id")
         .select_related("author", "executor")
         .prefetch_related("tags")
+        .defer("search_vector")
     )
     serializer_class = TaskSerializer
+    pagination_class = TaskPagination
+    query_budgets = {"list": 5, "retrieve": 5}
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(
+    ServerTimingMixin, CachedResponseMixin, AsyncReadMixin, viewsets.ModelViewSet
+):
     queryset = Tag.objects.order_by("id")
     serializer_class = TagSerializer
     permission_classes = (
         DeleteAdminOnly,
         IsAuthenticated,
     )
+    query_budgets = {
+        "list": 3,
+        "retrieve": 3,
+        "create": 3,
+        "update": 4,
+        "partial_update": 4,
+        "destroy": 6,
+    }
 
 
-class TaskTagsViewSet(viewsets.ModelViewSet):
+class TaskTagsViewSet(
+    ServerTimingMixin, CachedResponseMixin, AsyncReadMixin, viewsets.ModelViewSet
+):
     serializer_class = TagSerializer
-    
+    query_budgets = {
+        "list": 3,
+        "retrieve": 3,
+        "create": 3,
+        "update": 4,
+        "partial_update": 4,
+        "destroy": 6,
+    }
+
+    def get_cache_scopes(self) -> List[str]:
+        return [TAGS_SCOPE, task_tags_scope(self.kwargs["parent_lookup_task_id"])]
+
     def get_queryset(self):
-        task_id = self.kwargs["parent_lookup_task_id"]
-        return Task.objects.get(pk=task_id).tags.all()
+        return Tag.objects.filter(task=self.kwargs["parent_lookup_task_id"])
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    pass
 
 
 class TaskFilter(django_filters.FilterSet):
-    state = django_filters.CharFilter(lookup_expr="iexact")
-    tags = django_filters.CharFilter(field_name="tags__name", lookup_expr="in")
+    state = django_filters.CharFilter(method="filter_state")
+    active = django_filters.BooleanFilter(method="filter_active")
+    search = django_filters.CharFilter(method="filter_search")
+    tags = CharInFilter(method="filter_tags")
     executor = django_filters.CharFilter(
         field_name="executor__username",
         lookup_expr="icontains",
@@ -79,18 +213,147 @@ class TaskFilter(django_filters.FilterSet):
 
     class Meta:
         model = Task
-        fields = ("state", "tags", "executor", "author")
+        fields = ("state", "active", "search", "tags", "executor", "author")
 
+    def filter_state(self, queryset: QuerySet, _: str, value: str) -> QuerySet:
+        # States are stored lowercase; an exact match keeps the state indexes usable.
+        return queryset.filter(state=value.lower())
 
-class TaskViewSet(viewsets.ModelViewSet):
+    def filter_tags(self, queryset: QuerySet, _: str, value: List[str]) -> QuerySet:
+        # A join would repeat tasks carrying several of the tags.
+        links = Task.tags.through.objects.filter(tag__name__in=value)
+        return queryset.filter(pk__in=links.values("task_id"))
+
+    def filter_active(self, queryset: QuerySet, _: str, value: bool) -> QuerySet:
+        return queryset.active() if value else queryset.closed()
+
+    def filter_search(self, queryset: QuerySet, _: str, value: str) -> QuerySet:
+        query = SearchQuery(value, config=Task.SEARCH_CONFIG, search_type="websearch")
+        # Cast to double so the rank survives the round trip through a cursor.
+        rank = Cast(SearchRank("search_vector", query), FloatField())
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=rank)
+            .order_by("-rank", "id")
+        )
+
+
+class TaskViewSet(
+    ServerTimingMixin,
+    SparseFieldsMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    BulkModelMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     queryset = (
         Task.objects.select_related("author", "executor")
         .prefetch_related("tags")
+        .defer("search_vector")
         .order_by("id")
     )
     serializer_class = TaskSerializer
     filterset_class = TaskFilter
+    pagination_class = TaskPagination
     permission_classes = (
         DeleteAdminOnly,
         IsAuthenticated,
     )
+    # Counting every task costs more than a page, so lists stay unconditional.
+    conditional_actions = ("retrieve",)
+    sparse_actions = ("list", "retrieve", "changes")
+    query_budgets = {
+        "list": 4,
+        "retrieve": 5,
+        "create": 14,
+        "update": 11,
+        "partial_update": 10,
+        "destroy": 7,
+        "bulk_update": 14,
+        "partial_bulk_update": 13,
+        "bulk_destroy": 9,
+        "export": 2,
+        "bulk_import": 11,
+        "transition": 14,
+        "changes": 6,
+    }
+
+    @action(detail=False, methods=["get"], renderer_classes=EXPORT_RENDERERS)
+    def export(self, request: Request) -> StreamingHttpResponse:
+        serializer = self.get_serializer()
+        representation = ValuesRepresentation(serializer)
+        queryset = representation.values(self.filter_queryset(self.get_queryset()))
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        chunks = representation.chunks(queryset.iterator(chunk_size), chunk_size)
+        return export_response(
+            chunks,
+            list(serializer.fields),
+            request.accepted_renderer.format,
+            asynchronous=isinstance(request._request, ASGIRequest),
+        )
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request: Request) -> Response:
+        # Filters are not applied: a task leaving a filter would never be
+        # reported to the client holding it.
+        representation = ValuesRepresentation(self.get_serializer())
+        page = get_changes(
+            representation.values(self.get_queryset()),
+            request.query_params.get("cursor"),
+            self.paginator.get_page_size(request),
+        )
+        return Response(
+            {
+                "changes": representation.to_representation(page.rows),
+                "deleted": page.deleted,
+                "cursor": page.cursor,
+                "has_more": page.has_more,
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        permission_classes=(IsAdminUser,),
+    )
+    def bulk_import(self, request: Request) -> Response:
+        if request.content_type.startswith(CSVRenderer.media_type):
+            format = CSVRenderer.format
+        else:
+            format = NDJSONRenderer.format
+        lines = codecs.iterdecode(request.stream or (), "utf-8")
+        result = import_tasks(lines, format)
+        return Response(
+            {
+                "imported": result.tasks,
+                "tags": result.tags,
+                "seconds": round(result.seconds, 3),
+                "rows_per_second": round(result.rows_per_second),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["post"])
+    def transition(self, request: Request) -> Response:
+        if not set(request.query_params) & set(TaskFilter.base_filters):
+            raise ValidationError({"non_field_errors": ["A task filter is required."]})
+        serializer = TaskChangeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        add_tags = changes.pop("add_tags", ())
+        remove_tags = changes.pop("remove_tags", ())
+        queryset = self.filter_queryset(self.get_queryset())
+        updated = change_tasks(queryset, changes, add_tags, remove_tags)
+        return Response({"updated": updated})
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    if not metrics_service.is_authorized(request, settings.METRICS_TOKEN):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(
+        metrics_service.render(metrics_service.collect()),
+        content_type=metrics_service.CONTENT_TYPE,
+    )
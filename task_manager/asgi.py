@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
+# Request threads are not reused under ASGI, so neither are their connections.
+os.environ.setdefault("DJANGO_ASGI", "1")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up.
+from main.services.task_events import TaskEventsRouter  # noqa: E402
+
+application = TaskEventsRouter(django_application)
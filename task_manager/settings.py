@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from pathlib import Path
 
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "main",
     "rest_framework",
     "django_filters",
@@ -30,6 +32,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "main.services.metrics.MetricsMiddleware",
+    "main.services.slow_queries.SlowQueryMiddleware",
+    "main.services.server_timing.ServerTimingMiddleware",
+    "main.services.query_budget.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -37,6 +43,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "rollbar.contrib.django.middleware.RollbarNotifierMiddleware",
+    "main.services.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "task_manager.urls"
@@ -59,14 +66,48 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "task_manager.wsgi.application"
 
+# task_manager/asgi.py sets this before the settings load.
+DJANGO_ASGI = strtobool(os.environ.get("DJANGO_ASGI", "0"))
+
+# With the pool, each worker process lends requests at most
+# DATABASE_POOL_MAX_SIZE connections, waiting DATABASE_POOL_TIMEOUT seconds
+# for a free one, so Postgres sees at most workers times that many backends.
+DATABASE_POOL = strtobool(os.environ.get("DATABASE_POOL", "1"))
+DATABASE_POOL_OPTIONS = {
+    "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", 4)),
+    "max_size": int(os.environ.get("DATABASE_POOL_MAX_SIZE", 16)),
+    "timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", 30)),
+    "max_idle": float(os.environ.get("DATABASE_POOL_MAX_IDLE", 600)),
+    "max_lifetime": float(os.environ.get("DATABASE_POOL_MAX_LIFETIME", 3600)),
+}
+# Without the pool, a WSGI thread keeps its connection for this many seconds
+# after a request, and health checks replace it if it broke in the meantime.
+DATABASE_CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", 60))
+DATABASE_CONN_HEALTH_CHECKS = strtobool(
+    os.environ.get("DATABASE_CONN_HEALTH_CHECKS", "1")
+)
+
+# Async views of one worker running at once. Each holds a thread and a
+# database connection while it runs, so keep it at most the pool size.
+ASYNC_VIEW_CONCURRENCY = int(
+    os.environ.get("ASYNC_VIEW_CONCURRENCY", DATABASE_POOL_OPTIONS["max_size"])
+)
+
+# Connections come from the pool by default and go back to it after each
+# request. Without the pool they persist only under WSGI: under ASGI every
+# request runs in a new thread, which would never reuse its connection, so
+# it is closed after the request, as Django advises.
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "main.db",
         "NAME": os.environ["DATABASE_NAME"],
         "USER": os.environ["DATABASE_USER"],
         "PASSWORD": os.environ["DATABASE_PASSWORD"],
         "HOST": os.environ["DATABASE_HOST"],
         "PORT": os.environ["DATABASE_PORT"],
+        "CONN_MAX_AGE": 0 if DATABASE_POOL or DJANGO_ASGI else DATABASE_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": bool(DATABASE_CONN_HEALTH_CHECKS),
+        "OPTIONS": {"pool": DATABASE_POOL_OPTIONS} if DATABASE_POOL else {},
     },
 }
 
@@ -102,7 +143,7 @@ AUTH_USER_MODEL = "main.User"
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_AUTHENTICATION_CLASSES":(
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'main.services.authentication.AsyncJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
@@ -123,6 +164,77 @@ EMAIL_HOST_PASSWORD = os.environ["EMAIL_HOST_PASSWORD"]
 EMAIL_PORT = os.environ["EMAIL_PORT"]
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL")
 
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+RESPONSE_CACHE_ALIAS = "default"
+# Local-memory caches are per process: other workers only see a write once
+# their entry expires, so use a shared backend when running several of them.
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 60))
+
+# Rows per server-side cursor fetch and tag lookup in task exports.
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
+# Rows validated and copied together by task imports.
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 5000))
+
+# The task change feed holds back changes made less than this many seconds
+# before the oldest open write transaction started (or before the poll), so a
+# transaction committing after a client polls is not skipped by its cursor.
+TASK_CHANGES_DELAY = float(os.environ.get("TASK_CHANGES_DELAY", 5))
+# Cursors older than this get 410 Gone; prune_tombstones drops deletions
+# past it.
+TASK_TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get("TASK_TOMBSTONE_RETENTION_DAYS", 30)
+)
+
+# Events waiting for one /api/task-events/ client before it is told to
+# resync, and seconds between keepalives on a quiet stream.
+TASK_EVENTS_QUEUE_SIZE = int(os.environ.get("TASK_EVENTS_QUEUE_SIZE", 1000))
+TASK_EVENTS_KEEPALIVE = float(os.environ.get("TASK_EVENTS_KEEPALIVE", 15))
+
+# Share of requests whose queries are counted against the action's budget.
+QUERY_BUDGET_SAMPLE_RATE = float(os.environ.get("QUERY_BUDGET_SAMPLE_RATE", 0.01))
+
+# Share of requests answered with a Server-Timing header and a timing log line.
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get("SERVER_TIMING_SAMPLE_RATE", 0))
+
+# Each worker process writes its metrics to files here and /metrics sums
+# them. Counts of exited workers stay in the totals; gauges only count while
+# their worker runs, and /metrics deletes their files after it exits.
+METRICS_DIR = os.environ.get(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), "task_manager_metrics")
+)
+# /metrics requires an "Authorization: Bearer <token>" header; without a token
+# it is only served when DJANGO_ENV is dev.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Statements slower than this are explained and kept in the SlowQuery table;
+# 0 turns the recorder off. The sample rate applies to slow statements only.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 500))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get("SLOW_QUERY_SAMPLE_RATE", 0.1))
+SLOW_QUERY_LOG_SIZE = int(os.environ.get("SLOW_QUERY_LOG_SIZE", 1000))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(
+    os.environ.get("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", 5000)
+)
+
+# Share of requests run under cProfile; staff can also profile single
+# requests with the signed token from the RequestProfile admin page.
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_TOKEN_MAX_AGE = int(os.environ.get("PROFILE_TOKEN_MAX_AGE", 3600))
+PROFILE_LOG_SIZE = int(os.environ.get("PROFILE_LOG_SIZE", 200))
+
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 5))
+OUTBOX_RETRY_DELAY = int(os.environ.get("OUTBOX_RETRY_DELAY", 60))
+# Seconds to collect a recipient's assignments into one digest; 0 disables.
+OUTBOX_DIGEST_WINDOW = int(os.environ.get("OUTBOX_DIGEST_WINDOW", 0))
+
 if DJANGO_ENV != "dev":
     DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
     PUBLIC_FILE_STORAGE = "core.storage_backends.S3PublicStorage"
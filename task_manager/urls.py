@@ -16,6 +16,7 @@ from main.views import (
     UserTasksViewSet,
     UserViewSet,
     CurrentUserViewSet,
+    metrics,
 )
 from main.services.single_resource import BulkRouter
 
@@ -66,4 +67,5 @@ urlpatterns = [
     path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
     path("admin/", task_manager_admin_site.urls),
     path("api/", include(router.urls)),
+    path("metrics", metrics, name="metrics"),
 ]